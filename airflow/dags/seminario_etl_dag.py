@@ -234,7 +234,7 @@ def step_create_db(**kwargs: Any) -> None:
         return
 
     def _create_db() -> None:
-        from scripts.create_db import main as create_db
+        from scripts.create_db import create_db
 
         create_db()
 
@@ -297,7 +297,7 @@ def step_unify_by_year(**kwargs: Any) -> None:
         return
 
     def _unify() -> None:
-        from scripts.unify_by_year import main as unify_all
+        from scripts.unify_by_year import unify_all
 
         unify_all()
 
@@ -325,9 +325,9 @@ def step_create_facts(**kwargs: Any) -> None:
         return
 
     def _create_facts() -> None:
-        from scripts.create_facts import main as create_all_facts
+        from scripts.create_facts import create_facts
 
-        create_all_facts()
+        create_facts()
 
     _safe_execute("Crear hechos", _create_facts)
 
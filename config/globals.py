@@ -22,6 +22,10 @@ POSTGRES_DB: str = os.getenv("POSTGRES_DB", "seminario")
 POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "postgres")
 POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5433")
 
+PG_POOL_MAX_SIZE: int = int(os.getenv("PG_POOL_MAX_SIZE", "8"))
+PG_POOL_TIMEOUT_S: float = float(os.getenv("PG_POOL_TIMEOUT_S", "60"))
+PG_POOL_HEALTHCHECK_IDLE_S: float = 30.0
+
 _pg_password_encoded = quote_plus(POSTGRES_PASSWORD)
 DATABASE_URL: str = (
     f"postgresql://{POSTGRES_USER}:{_pg_password_encoded}"
@@ -42,11 +46,13 @@ RAW_PND_DIR = RAW_DATA_DIR / "pnd"
 RAW_ICFES_DIR = RAW_DATA_DIR / "icfes"
 
 PROCESSED_SNIES_DIR = PROCESSED_DIR / "snies"
+STAGING_SNIES_DIR = DATA_DIR / "staging" / "snies"
 
 MANIFEST_PATH = RAW_DATA_DIR / "_manifest.json"
 LINEAGE_PATH = PROCESSED_DIR / "_lineage.json"
 QUALITY_REPORTS_DIR = PROCESSED_DIR / "_quality_reports"
 QUALITY_REPORT_PATH = QUALITY_REPORTS_DIR / "quality_report.json"
+INDEX_ADVISOR_REPORT_PATH = PROCESSED_DIR / "_index_advisor.json"
 DATA_DICTIONARY_JSON_PATH = DICTIONARIES_DIR / "data_dictionary.json"
 DATA_DICTIONARY_MD_PATH = DICTIONARIES_DIR / "data_dictionary.md"
 
@@ -132,7 +138,17 @@ GOOGLE_FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
 INPUT_EXTENSION_SNIES = ".xlsx"
 OUTPUT_EXTENSION = ".parquet"
 
-MAX_SNIES_FILE_SIZE_MB: float = 15.0
+MAX_SNIES_FILE_SIZE_MB: float = 100.0
+RAW_LOAD_WORKERS: int = int(os.getenv("RAW_LOAD_WORKERS", "1"))
+TABLE_WORKERS: int = int(os.getenv("TABLE_WORKERS", "4"))
+INDEX_BUILD_WORKERS: int = int(os.getenv("INDEX_BUILD_WORKERS", "4"))
+INDEX_MAINTENANCE_WORK_MEM: str = os.getenv("INDEX_MAINTENANCE_WORK_MEM", "256MB")
+INDEX_PARALLEL_MAINTENANCE_WORKERS: int = int(
+    os.getenv("INDEX_PARALLEL_MAINTENANCE_WORKERS", "2")
+)
+UNIFY_MODE: str = os.getenv("UNIFY_MODE", "pandas")
+TRANSFORM_MODE: str = os.getenv("TRANSFORM_MODE", "update")
+FACTS_REFRESH_MODE: str = os.getenv("FACTS_REFRESH_MODE", "full")
 DRIVE_LIST_PAGE_SIZE: int = 100
 HASH_CHUNK_SIZE: int = 8192
 
@@ -140,6 +156,17 @@ CSV_ENCODINGS = ["utf-8", "latin-1", "cp1252"]
 
 QUALITY_NULL_THRESHOLD_PCT: float = 50.0
 QUALITY_MIN_COLUMNS: int = 2
+# % de filas duplicadas tolerado; en modo approx se compara con la cota
+# inferior del HyperLogLog
+QUALITY_MAX_DUPLICATE_PCT: float = float(os.getenv("QUALITY_MAX_DUPLICATE_PCT", "0"))
+QUALITY_MODE: str = os.getenv("QUALITY_MODE", "exact")
+QUALITY_SAMPLE_PCT: float = float(os.getenv("QUALITY_SAMPLE_PCT", "1.0"))
+QUALITY_APPROX_MIN_ROWS: int = int(os.getenv("QUALITY_APPROX_MIN_ROWS", "1000000"))
+DICTIONARY_MODE: str = os.getenv("DICTIONARY_MODE", "exact")
+# Columnas ("tabla.columna") que el modo catalog perfila siempre con un recorrido
+DICTIONARY_EXACT_COLUMNS: set[str] = {
+    c.strip() for c in os.getenv("DICTIONARY_EXACT_COLUMNS", "").split(",") if c.strip()
+}
 
 YEAR_START = 2018
 YEAR_END = 2024
@@ -155,6 +182,9 @@ def raw_snies_path(category: str, year: int | str) -> Path:
 def processed_snies_path(category: str, year: int | str) -> Path:
     return PROCESSED_SNIES_DIR / category / f"{category}-{year}{OUTPUT_EXTENSION}"
 
+def staging_snies_path(file_hash: str) -> Path:
+    return STAGING_SNIES_DIR / f"{file_hash}{OUTPUT_EXTENSION}"
+
 def raw_csv_path(dataset_key: str) -> Path:
     return RAW_DATA_DIR / f"{dataset_key}.csv"
 
@@ -1,8 +1,11 @@
 import json
 
 import pandas as pd
+import psycopg2
 
 from config.globals import (
+    DICTIONARY_EXACT_COLUMNS,
+    DICTIONARY_MODE,
     PROCESSED_DIR,
     DICTIONARIES_DIR,
     DATA_DICTIONARY_JSON_PATH,
@@ -13,112 +16,157 @@ from config.globals import (
 from utils.db import list_tables, managed_connection, table_exists
 from utils.logger import logger
 
-def _profile_column_sql(
-    schema: str, table: str, column: str, data_type: str, total_rows: int
-) -> dict:
-    profile: dict = {
-        "dtype": data_type,
-        "non_null_count": 0,
-        "null_count": 0,
-        "null_pct": 0.0,
-    }
+DICTIONARY_MODES = ("exact", "catalog")
 
-    if total_rows == 0:
-        return profile
+_NUMERIC_TYPES = (
+    "integer",
+    "bigint",
+    "smallint",
+    "numeric",
+    "real",
+    "double precision",
+    "decimal",
+    "float",
+)
+_TEXT_TYPES = (
+    "text",
+    "character varying",
+    "character",
+    "varchar",
+    "char",
+)
+_TOP_VALUES = 5
 
-    try:
-        with managed_connection(schema=schema) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    f"SELECT "
-                    f'COUNT("{column}") AS non_null, '
-                    f'COUNT(*) - COUNT("{column}") AS nulls '
-                    f'FROM "{table}"'
-                )
-                row = cur.fetchone()
-                non_null = row[0]
-                nulls = row[1]
-                profile["non_null_count"] = non_null
-                profile["null_count"] = nulls
-                profile["null_pct"] = round(nulls / total_rows * 100, 2)
-
-                is_numeric = data_type in (
-                    "integer",
-                    "bigint",
-                    "smallint",
-                    "numeric",
-                    "real",
-                    "double precision",
-                    "decimal",
-                    "float",
-                )
+def _column_aggregates_sql(column: str, data_type: str) -> list[str]:
+    col = f'"{column}"'
+    exprs = [f"COUNT({col})"]
+    if data_type in _NUMERIC_TYPES:
+        exprs += [
+            f"MIN({col})::float",
+            f"MAX({col})::float",
+            f"AVG({col})::float",
+            f"STDDEV({col})::float",
+            f"PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {col})::float",
+        ]
+    elif data_type in _TEXT_TYPES:
+        exprs += [f"MIN(LENGTH({col}))", f"MAX(LENGTH({col}))"]
+    return exprs
 
-                if is_numeric and non_null > 0:
-                    cur.execute(
-                        f"SELECT "
-                        f'MIN("{column}")::float, '
-                        f'MAX("{column}")::float, '
-                        f'AVG("{column}")::float, '
-                        f'STDDEV("{column}")::float, '
-                        f'PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY "{column}")::float '
-                        f'FROM "{table}" WHERE "{column}" IS NOT NULL'
-                    )
-                    stats = cur.fetchone()
-                    profile.update(
-                        {
-                            "min": stats[0] if stats[0] is not None else 0,
-                            "max": stats[1] if stats[1] is not None else 0,
-                            "mean": round(stats[2], 4) if stats[2] is not None else 0,
-                            "std": round(stats[3], 4) if stats[3] is not None else 0,
-                            "median": stats[4],
-                        }
-                    )
-
-                is_text = data_type in (
-                    "text",
-                    "character varying",
-                    "character",
-                    "varchar",
-                    "char",
-                )
+def _top_values_sql(table: str, text_cols: list[str]) -> str:
+    quoted = [f'"{c}"' for c in text_cols]
+    set_id = " ".join(f"WHEN GROUPING({q}) = 0 THEN {i}" for i, q in enumerate(quoted))
+    set_value = " ".join(f"WHEN GROUPING({q}) = 0 THEN {q}::TEXT" for q in quoted)
+    grouping_sets = ", ".join(f"({q})" for q in quoted)
+    return (
+        f"SELECT gid, val, cnt, n_distinct FROM ("
+        f"SELECT gid, val, cnt, "
+        f"ROW_NUMBER() OVER (PARTITION BY gid ORDER BY cnt DESC) AS rn, "
+        f"COUNT(*) OVER (PARTITION BY gid) AS n_distinct "
+        f"FROM ("
+        f"SELECT CASE {set_id} END AS gid, CASE {set_value} END AS val, "
+        f"COUNT(*) AS cnt "
+        f'FROM "{table}" GROUP BY GROUPING SETS ({grouping_sets})'
+        f") s WHERE val IS NOT NULL"
+        f") r WHERE rn <= {_TOP_VALUES} ORDER BY gid, rn"
+    )
 
-                if is_text and non_null > 0:
-                    cur.execute(
-                        f'SELECT COUNT(DISTINCT "{column}") '
-                        f'FROM "{table}" WHERE "{column}" IS NOT NULL'
-                    )
-                    profile["unique_count"] = cur.fetchone()[0]
-
-                    cur.execute(
-                        f'SELECT "{column}", COUNT(*) AS cnt '
-                        f'FROM "{table}" WHERE "{column}" IS NOT NULL '
-                        f'GROUP BY "{column}" ORDER BY cnt DESC LIMIT 5'
-                    )
-                    profile["top_values"] = {
-                        str(r[0]): int(r[1]) for r in cur.fetchall()
+def _profile_columns_batch(
+    cur, table: str, col_info: list[tuple[str, str]]
+) -> tuple[int, dict]:
+    # Conteos y estadísticas en un recorrido; distintos y top por GROUPING SETS
+    select_list = ["COUNT(*)"]
+    for col_name, data_type in col_info:
+        select_list += _column_aggregates_sql(col_name, data_type)
+    cur.execute(f'SELECT {", ".join(select_list)} FROM "{table}"')
+    row = iter(cur.fetchone())
+    total_rows = next(row)
+
+    profiles: dict = {}
+    for col_name, data_type in col_info:
+        profile: dict = {
+            "dtype": data_type,
+            "non_null_count": 0,
+            "null_count": 0,
+            "null_pct": 0.0,
+        }
+        non_null = next(row)
+        if total_rows > 0:
+            profile["non_null_count"] = non_null
+            profile["null_count"] = total_rows - non_null
+            profile["null_pct"] = round((total_rows - non_null) / total_rows * 100, 2)
+        if data_type in _NUMERIC_TYPES:
+            stats = [next(row) for _ in range(5)]
+            if total_rows > 0 and non_null > 0:
+                profile.update(
+                    {
+                        "min": stats[0] if stats[0] is not None else 0,
+                        "max": stats[1] if stats[1] is not None else 0,
+                        "mean": round(stats[2], 4) if stats[2] is not None else 0,
+                        "std": round(stats[3], 4) if stats[3] is not None else 0,
+                        "median": stats[4],
                     }
+                )
+        elif data_type in _TEXT_TYPES:
+            lengths = (next(row), next(row))
+            if total_rows > 0 and non_null > 0:
+                profile["unique_count"] = 0
+                profile["top_values"] = {}
+                profile["min_length"] = lengths[0] if lengths[0] is not None else 0
+                profile["max_length"] = lengths[1] if lengths[1] is not None else 0
+        profiles[col_name] = profile
 
-                    cur.execute(
-                        f"SELECT "
-                        f'MIN(LENGTH("{column}")), '
-                        f'MAX(LENGTH("{column}")) '
-                        f'FROM "{table}" WHERE "{column}" IS NOT NULL'
-                    )
-                    lengths = cur.fetchone()
-                    profile["min_length"] = lengths[0] if lengths[0] is not None else 0
-                    profile["max_length"] = lengths[1] if lengths[1] is not None else 0
+    text_cols = [c for c, _ in col_info if "unique_count" in profiles[c]]
+    if text_cols:
+        cur.execute(_top_values_sql(table, text_cols))
+        for gid, val, cnt, n_distinct in cur.fetchall():
+            profile = profiles[text_cols[gid]]
+            profile["unique_count"] = int(n_distinct)
+            profile["top_values"][str(val)] = int(cnt)
 
-    except Exception as e:
+    return total_rows, profiles
+
+def _profile_columns_sql(
+    cur, table: str, col_info: list[tuple[str, str]]
+) -> tuple[int, dict]:
+    # Si la consulta conjunta falla, se reintenta columna por columna para que
+    # una columna problemática no deje a la tabla sin perfil
+    cur.execute("SAVEPOINT profile_columns")
+    try:
+        result = _profile_columns_batch(cur, table, col_info)
+    except psycopg2.Error as e:
+        cur.execute("ROLLBACK TO SAVEPOINT profile_columns")
         logger.warning(
-            "Error perfilando columna '%s.%s.%s': %s", schema, table, column, e
+            "  %s: falló el perfil conjunto, se perfila por columna: %s",
+            table,
+            str(e).strip(),
         )
+    else:
+        cur.execute("RELEASE SAVEPOINT profile_columns")
+        return result
 
-    return profile
+    total_rows = None
+    profiles: dict = {}
+    for col_name, data_type in col_info:
+        cur.execute("SAVEPOINT profile_columns")
+        try:
+            rows, profile = _profile_columns_batch(cur, table, [(col_name, data_type)])
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT profile_columns")
+            message = str(e).strip().split("\n")[0]
+            logger.warning("  %s.%s: no se pudo perfilar: %s", table, col_name, message)
+            profiles[col_name] = {"dtype": data_type, "error": message}
+            continue
+        cur.execute("RELEASE SAVEPOINT profile_columns")
+        total_rows = rows
+        profiles.update(profile)
+    if total_rows is None:
+        cur.execute(f'SELECT COUNT(*) FROM "{table}"')
+        total_rows = cur.fetchone()[0]
+    return total_rows, profiles
 
 def _generate_dictionary_for_table(schema: str, table: str) -> dict:
-    columns = {}
     try:
-        with managed_connection() as conn:
+        with managed_connection(schema=schema) as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     "SELECT column_name, data_type "
@@ -128,16 +176,7 @@ def _generate_dictionary_for_table(schema: str, table: str) -> dict:
                     (schema, table),
                 )
                 col_info = cur.fetchall()
-
-        with managed_connection(schema=schema) as conn:
-            with conn.cursor() as cur:
-                cur.execute(f'SELECT COUNT(*) FROM "{table}"')
-                total_rows = cur.fetchone()[0]
-
-        for col_name, data_type in col_info:
-            columns[col_name] = _profile_column_sql(
-                schema, table, col_name, data_type, total_rows
-            )
+                total_rows, columns = _profile_columns_sql(cur, table, col_info)
 
         return {
             "dataset": table,
@@ -156,6 +195,105 @@ def _generate_dictionary_for_table(schema: str, table: str) -> dict:
             "columns": {},
         }
 
+def _catalog_rows_estimate(cur, schema: str, table: str) -> float:
+    cur.execute(
+        "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+        (f'{schema}."{table}"',),
+    )
+    row = cur.fetchone()
+    return row[0] if row else -1.0
+
+def _catalog_stats(cur, schema: str, table: str) -> dict[str, tuple]:
+    cur.execute(
+        "SELECT attname, null_frac, n_distinct, avg_width, "
+        "most_common_vals::TEXT::TEXT[], most_common_freqs, "
+        "histogram_bounds::TEXT::TEXT[] "
+        "FROM pg_stats WHERE schemaname = %s AND tablename = %s",
+        (schema, table),
+    )
+    return {row[0]: row[1:] for row in cur.fetchall()}
+
+def _profile_from_stats(data_type: str, stats: tuple, total_rows: int) -> dict:
+    null_frac, n_distinct, avg_width, mcv, mcf, histogram = stats
+    null_count = round(null_frac * total_rows)
+    profile: dict = {
+        "dtype": data_type,
+        "non_null_count": total_rows - null_count,
+        "null_count": null_count,
+        "null_pct": round(null_frac * 100, 2),
+        "source": "pg_stats",
+    }
+    if total_rows == 0 or null_count == total_rows:
+        return profile
+
+    if data_type in _NUMERIC_TYPES:
+        bounds = [float(v) for v in (histogram or [])]
+        values = sorted(bounds + [float(v) for v in (mcv or [])])
+        if values:
+            profile.update(
+                {
+                    "min": values[0],
+                    "max": values[-1],
+                    "median": bounds[len(bounds) // 2] if bounds else None,
+                }
+            )
+    elif data_type in _TEXT_TYPES:
+        # n_distinct negativo = fracción de las filas (escala con la tabla)
+        distinct = n_distinct if n_distinct >= 0 else -n_distinct * total_rows
+        profile["unique_count"] = round(distinct)
+        profile["top_values"] = {
+            str(v): round(f * total_rows)
+            for v, f in list(zip(mcv or [], mcf or []))[:_TOP_VALUES]
+        }
+        profile["avg_width"] = avg_width
+    return profile
+
+def _generate_dictionary_from_catalog(
+    schema: str, table: str, exact_columns: set[str] = DICTIONARY_EXACT_COLUMNS
+) -> dict:
+    # Desde pg_stats sin leer datos; solo se recorren exact_columns y columnas
+    # sin estadísticas
+    with managed_connection(schema=schema) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT column_name, data_type "
+                "FROM information_schema.columns "
+                "WHERE table_schema = %s AND table_name = %s "
+                "ORDER BY ordinal_position",
+                (schema, table),
+            )
+            col_info = cur.fetchall()
+
+            reltuples = _catalog_rows_estimate(cur, schema, table)
+            stats = _catalog_stats(cur, schema, table)
+            if reltuples < 0 or (col_info and not stats):
+                cur.execute(f'ANALYZE "{table}"')
+                reltuples = _catalog_rows_estimate(cur, schema, table)
+                stats = _catalog_stats(cur, schema, table)
+            total_rows = max(0, round(reltuples))
+
+            exact = [
+                (col, dtype)
+                for col, dtype in col_info
+                if f"{table}.{col}" in exact_columns or col not in stats
+            ]
+            exact_profiles: dict = {}
+            if exact:
+                total_rows, exact_profiles = _profile_columns_sql(cur, table, exact)
+
+    columns = {
+        col: exact_profiles.get(col)
+        or _profile_from_stats(dtype, stats[col], total_rows)
+        for col, dtype in col_info
+    }
+    return {
+        "dataset": table,
+        "source_file": f"pg://{schema}.{table}",
+        "total_rows": total_rows,
+        "total_columns": len(col_info),
+        "columns": columns,
+    }
+
 def profile_column(series: pd.Series) -> dict:
     total = len(series)
     nulls = int(series.isna().sum())
@@ -201,8 +339,10 @@ def generate_dictionary_for_dataset(parquet_path) -> dict:
         "columns": columns,
     }
 
-def generate_all_dictionaries():
-    logger.info("=== GENERANDO DICCIONARIO DE DATOS ===")
+def generate_all_dictionaries(mode: str = DICTIONARY_MODE):
+    if mode not in DICTIONARY_MODES:
+        raise ValueError(f"Modo de diccionario desconocido: {mode!r}")
+    logger.info("=== GENERANDO DICCIONARIO DE DATOS (modo: %s) ===", mode)
     DICTIONARIES_DIR.mkdir(parents=True, exist_ok=True)
     all_dicts = {}
 
@@ -217,7 +357,10 @@ def generate_all_dictionaries():
             key = f"{PG_SCHEMA_RAW}__{table_name}"
             logger.info("  Perfilando %s.%s ...", PG_SCHEMA_RAW, table_name)
             try:
-                d = _generate_dictionary_for_table(PG_SCHEMA_RAW, table_name)
+                if mode == "catalog":
+                    d = _generate_dictionary_from_catalog(PG_SCHEMA_RAW, table_name)
+                else:
+                    d = _generate_dictionary_for_table(PG_SCHEMA_RAW, table_name)
                 all_dicts[key] = d
             except Exception as e:
                 logger.warning("  [ERROR] %s.%s: %s", PG_SCHEMA_RAW, table_name, e)
@@ -253,6 +396,12 @@ def _generate_markdown_dictionary(all_dicts: dict):
         lines.append("| Columna | Tipo | No Nulos | % Nulos | Detalle |")
         lines.append("|---------|------|----------|---------|---------|")
         for col_name, col_info in info["columns"].items():
+            if "error" in col_info:
+                lines.append(
+                    f"| {col_name} | {col_info['dtype']} | - | - | "
+                    f"error: {col_info['error']} |"
+                )
+                continue
             detail = ""
             if "mean" in col_info:
                 detail = (
@@ -260,8 +409,15 @@ def _generate_markdown_dictionary(all_dicts: dict):
                     f"max={col_info['max']}, "
                     f"mean={col_info['mean']}"
                 )
+            elif "min" in col_info:
+                detail = (
+                    f"min={col_info['min']}, "
+                    f"max={col_info['max']}, "
+                    f"median~{col_info['median']}"
+                )
             elif "unique_count" in col_info:
-                detail = f"unique={col_info['unique_count']}"
+                approx = "~" if col_info.get("source") == "pg_stats" else "="
+                detail = f"unique{approx}{col_info['unique_count']}"
             lines.append(
                 f"| {col_name} | {col_info['dtype']} | "
                 f"{col_info['non_null_count']:,} | "
@@ -12,14 +12,14 @@ from etl.transform import transform_all
 from etl.upload import upload_databases
 from etl.dictionary import generate_all_dictionaries
 from etl.quality import run_quality_checks
-from scripts.create_db import main as create_db
+from scripts.create_db import create_db
 from scripts.create_indexes import create_indexes
 from scripts.normalize_data import main as normalize_data
-from scripts.unify_by_year import main as unify_all
+from scripts.unify_by_year import unify_all
 from scripts.create_dimensions import main as create_all_dimensions
-from scripts.create_facts import main as create_all_facts
+from scripts.create_facts import create_facts
 
-from utils.db import list_tables
+from utils.db import list_tables, pool_stats
 from utils.logger import logger
 
 TOTAL_STEPS = 11
@@ -31,6 +31,7 @@ class StepResult:
     status: str = "PENDING"
     duration_s: float = 0.0
     error: str = ""
+    pool: dict = field(default_factory=dict)
 
 
 @dataclass
@@ -61,11 +62,19 @@ def _run_step(
     logger.info("=== PASO %d/%d: %s ===", step_num, TOTAL_STEPS, name.upper())
     result = StepResult(name=name)
     start = time.time()
+    pool_before = pool_stats()
     try:
         func()
         result.duration_s = time.time() - start
         result.status = "OK"
+        result.pool = _pool_delta(pool_before, pool_stats())
         logger.info("  Paso %d completado en %.1f s", step_num, result.duration_s)
+        logger.info(
+            "  Pool de conexiones: %d reutilizadas, %d nuevas, %.2f s en espera",
+            result.pool["hits"],
+            result.pool["misses"],
+            result.pool["wait_time_s"],
+        )
     except Exception as exc:
         result.duration_s = time.time() - start
         result.status = "FAIL"
@@ -85,6 +94,13 @@ def _run_step(
     return result.status == "OK"
 
 
+def _pool_delta(before: dict, after: dict) -> dict:
+    return {
+        key: after[key] - before[key]
+        for key in ("hits", "misses", "waits", "wait_time_s", "discarded")
+    }
+
+
 def _skip_step(step_num: int, name: str, reason: str, report: PipelineReport):
     logger.info(
         "=== PASO %d/%d: %s OMITIDO (%s) ===",
@@ -122,6 +138,16 @@ def _log_summary(report: PipelineReport):
         len(report.skipped),
     )
     logger.info("  Duracion total: %.1f s", report.total_duration_s)
+    stats = pool_stats()
+    logger.info(
+        "  Pool de conexiones: %d reutilizadas, %d nuevas, %d descartadas, "
+        "%.2f s en espera (%d esperas)",
+        stats["hits"],
+        stats["misses"],
+        stats["discarded"],
+        stats["wait_time_s"],
+        stats["waits"],
+    )
     logger.info("=" * 60)
 
 
@@ -168,7 +194,7 @@ def run_pipeline(skip_ingest: bool = False, skip_upload: bool = False):
         )
         _run_step(6, "Unificacion por año", unify_all, report)
         _run_step(7, "Creacion de dimensiones", create_all_dimensions, report)
-        _run_step(8, "Creacion de tablas de hechos", create_all_facts, report)
+        _run_step(8, "Creacion de tablas de hechos", create_facts, report)
 
         _run_step(
             9,
@@ -1,4 +1,5 @@
 import json
+import math
 from datetime import datetime, timezone
 
 import pandas as pd
@@ -9,13 +10,29 @@ from config.globals import (
     QUALITY_REPORT_PATH,
     QUALITY_NULL_THRESHOLD_PCT,
     QUALITY_MIN_COLUMNS,
+    QUALITY_MAX_DUPLICATE_PCT,
+    QUALITY_MODE,
+    QUALITY_SAMPLE_PCT,
+    QUALITY_APPROX_MIN_ROWS,
     CSV_DATASETS,
+    PG_SCHEMA_FACTS,
     PG_SCHEMA_RAW,
     SNIES_CATEGORIES,
+    TABLE_WORKERS,
     processed_parquet_path,
 )
-from utils.db import get_engine, list_tables, managed_connection, table_exists
+from etl.quality_rules import FACT_RULES, AggregateRule, QueryRule, rules_by_table
+from utils.db import get_engine, list_tables, managed_connection
 from utils.logger import logger
+from utils.parallel import run_per_table
+
+QUALITY_MODES = ("exact", "approx")
+_Z_95 = 1.959964
+# HyperLogLog con 2^12 registros: error estándar relativo 1.04/sqrt(m) ≈ 1.6%
+_HLL_PRECISION = 12
+_HLL_REGISTERS = 1 << _HLL_PRECISION
+_HLL_REL_ERROR_95 = _Z_95 * 1.04 / math.sqrt(_HLL_REGISTERS)
+_SAMPLE_SEED = 42
 
 class QualityCheck:
     def __init__(self, name: str, dataset: str):
@@ -23,126 +40,207 @@ class QualityCheck:
         self.dataset = dataset
         self.passed = False
         self.details = ""
+        self.estimate: dict | None = None
 
     def to_dict(self) -> dict:
-        return {
+        result = {
             "check": self.name,
             "dataset": self.dataset,
             "passed": bool(self.passed),
             "details": self.details,
         }
+        if self.estimate is not None:
+            result["estimate"] = self.estimate
+        return result
 
-def _sql_check_not_empty(schema: str, table: str, dataset: str) -> QualityCheck:
-    qc = QualityCheck("not_empty", dataset)
-    try:
-        with managed_connection(schema=schema) as conn:
-            with conn.cursor() as cur:
-                cur.execute(f'SELECT COUNT(*) FROM "{table}"')
-                count = cur.fetchone()[0]
-        qc.passed = count > 0
-        qc.details = f"{count} filas"
-    except Exception as e:
-        qc.passed = False
-        qc.details = f"Error: {e}"
-    return qc
+def _profile_select(
+    cur, schema: str, table: str, distinct: bool = True
+) -> tuple[list[str], str]:
+    # Filas, filas distintas (hash de 64 bits de la fila) y nulos por columna
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = %s AND table_name = %s "
+        "ORDER BY ordinal_position",
+        (schema, table),
+    )
+    columns = [row[0] for row in cur.fetchall()]
+    null_expressions = "".join(
+        f', COUNT(*) FILTER (WHERE "{col}" IS NULL)' for col in columns
+    )
+    distinct_expression = (
+        ", COUNT(DISTINCT hashtextextended(t::TEXT, 0))" if distinct else ""
+    )
+    return columns, (
+        f"SELECT COUNT(*){distinct_expression}"
+        f'{null_expressions} FROM {schema}."{table}" AS t'
+    )
 
-def _sql_check_no_duplicate_rows(schema: str, table: str, dataset: str) -> QualityCheck:
-    qc = QualityCheck("no_duplicate_rows", dataset)
-    try:
-        with managed_connection(schema=schema) as conn:
-            with conn.cursor() as cur:
-                cur.execute(f'SELECT COUNT(*) FROM "{table}"')
-                total = cur.fetchone()[0]
-                cur.execute(
-                    f'SELECT COUNT(*) FROM (SELECT DISTINCT * FROM "{table}") AS sub'
-                )
-                distinct_count = cur.fetchone()[0]
-        dupes = total - distinct_count
-        qc.passed = dupes == 0
-        qc.details = f"{dupes} filas duplicadas de {total}"
-    except Exception as e:
-        qc.passed = False
-        qc.details = f"Error: {e}"
-    return qc
+def _sql_table_profile(cur, schema: str, table: str) -> dict:
+    # Perfil exacto en un único recorrido de la tabla
+    columns, select = _profile_select(cur, schema, table)
+    cur.execute(select)
+    row = cur.fetchone()
+    return {
+        "columns": columns,
+        "total": row[0],
+        "distinct": row[1],
+        "nulls": dict(zip(columns, row[2:])),
+    }
+
+def _wilson_interval(hits: int, n: int, z: float = _Z_95) -> tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def _hll_estimate(registers: dict[int, int]) -> float:
+    m = _HLL_REGISTERS
+    alpha = 0.7213 / (1 + 1.079 / m)
+    harmonic = sum(2.0 ** -registers.get(j, 0) for j in range(m))
+    estimate = alpha * m * m / harmonic
+    zeros = m - len(registers)
+    if estimate <= 2.5 * m and zeros > 0:
+        # Corrección de rango pequeño (linear counting)
+        estimate = m * math.log(m / zeros)
+    return estimate
+
+def _approx_profile(
+    columns: list[str],
+    sample: tuple,
+    register_rows: list[tuple[int, int, int]],
+    sample_pct: float,
+) -> dict | None:
+    # sample: (filas, nulos por columna...); register_rows: (registro, rango, filas)
+    sample_rows = sample[0]
+    if sample_rows == 0:
+        return None
 
-def _sql_check_null_threshold(
-    schema: str,
-    table: str,
+    total = sum(row[2] for row in register_rows)
+    registers = {row[0]: row[1] for row in register_rows}
+    distinct = min(float(total), _hll_estimate(registers))
+    return {
+        "columns": columns,
+        "total": total,
+        "distinct": round(distinct),
+        "distinct_bounds": (
+            round(distinct * (1 - _HLL_REL_ERROR_95)),
+            round(min(float(total), distinct * (1 + _HLL_REL_ERROR_95))),
+        ),
+        "nulls": {
+            col: round(n / sample_rows * total) for col, n in zip(columns, sample[1:])
+        },
+        "null_bounds": {
+            col: _wilson_interval(n, sample_rows) for col, n in zip(columns, sample[1:])
+        },
+        "sample_rows": sample_rows,
+        "sample_pct": sample_pct,
+    }
+
+def _sql_table_profile_approx(
+    cur, schema: str, table: str, sample_pct: float = QUALITY_SAMPLE_PCT
+) -> dict | None:
+    # Nulos sobre TABLESAMPLE; filas distintas por HyperLogLog en un recorrido
+    # sin ordenar, que además da el conteo exacto de filas
+    columns, select = _profile_select(cur, schema, table, distinct=False)
+    cur.execute(
+        f"{select} TABLESAMPLE SYSTEM (%s) REPEATABLE (%s)",
+        (sample_pct, _SAMPLE_SEED),
+    )
+    sample = cur.fetchone()
+    if sample[0] == 0:
+        return None
+
+    # Registro = 12 bits altos del hash; rango = posición del primer 1 en el resto
+    rest_bits = 64 - _HLL_PRECISION
+    cur.execute(
+        f"SELECT (h >> {rest_bits}) & {_HLL_REGISTERS - 1}, "
+        f"MAX(COALESCE(NULLIF(position('1' IN substring(h::BIT(64)::TEXT "
+        f"FROM {_HLL_PRECISION + 1})), 0), {rest_bits + 1})), COUNT(*) "
+        f"FROM (SELECT hashtextextended(t::TEXT, 0) AS h "
+        f'FROM {schema}."{table}" AS t) s GROUP BY 1'
+    )
+    return _approx_profile(columns, sample, cur.fetchall(), sample_pct)
+
+def _sql_checks_from_profile(
+    profile: dict,
     dataset: str,
     threshold: float = QUALITY_NULL_THRESHOLD_PCT,
-) -> QualityCheck:
-    qc = QualityCheck("null_threshold", dataset)
-    try:
-        with managed_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT column_name FROM information_schema.columns "
-                    "WHERE table_schema = %s AND table_name = %s "
-                    "ORDER BY ordinal_position",
-                    (schema, table),
-                )
-                columns = [row[0] for row in cur.fetchall()]
+    min_cols: int = QUALITY_MIN_COLUMNS,
+    max_dupes_pct: float = QUALITY_MAX_DUPLICATE_PCT,
+) -> list[QualityCheck]:
+    total = profile["total"]
 
-        if not columns:
-            qc.passed = False
-            qc.details = "Sin columnas"
-            return qc
+    not_empty = QualityCheck("not_empty", dataset)
+    not_empty.passed = total > 0
+    not_empty.details = f"{total} filas"
 
-        null_expressions = ", ".join(
-            f'COUNT(*) FILTER (WHERE "{col}" IS NULL) AS "{col}"' for col in columns
+    no_dupes = QualityCheck("no_duplicate_rows", dataset)
+    dupes = total - profile["distinct"]
+    if "distinct_bounds" in profile:
+        low, high = profile["distinct_bounds"]
+        dupes_low, dupes_high = max(0, total - high), max(0, total - low)
+        # Cotas de ±1.96 errores estándar del HLL, no un IC de muestreo: por
+        # debajo de ~3% de duplicados el sketch no los distingue del cero
+        no_dupes.passed = total == 0 or dupes_low / total * 100 <= max_dupes_pct
+        no_dupes.details = (
+            f"~{max(0, dupes)} filas duplicadas de {total} "
+            f"(HyperLogLog m={_HLL_REGISTERS}, ±1.96 errores estándar: "
+            f"{dupes_low}-{dupes_high})"
         )
-        query = f'SELECT COUNT(*) AS total, {null_expressions} FROM "{table}"'
-
-        with managed_connection(schema=schema) as conn:
-            with conn.cursor() as cur:
-                cur.execute(query)
-                row = cur.fetchone()
-
-        total = row[0]
-        if total == 0:
-            qc.passed = False
-            qc.details = "Dataset vacío"
-            return qc
+        no_dupes.estimate = {
+            "method": f"hyperloglog(m={_HLL_REGISTERS})",
+            "relative_error": round(_HLL_REL_ERROR_95, 4),
+            "value": max(0, dupes),
+            "lower": dupes_low,
+            "upper": dupes_high,
+        }
+    else:
+        no_dupes.passed = total == 0 or dupes / total * 100 <= max_dupes_pct
+        no_dupes.details = f"{dupes} filas duplicadas de {total}"
 
+    nulls = QualityCheck("null_threshold", dataset)
+    if not profile["columns"]:
+        nulls.details = "Sin columnas"
+    elif total == 0:
+        nulls.details = "Dataset vacío"
+    else:
         bad_cols = []
-        for i, col in enumerate(columns):
-            null_count = row[i + 1]
+        for col, null_count in profile["nulls"].items():
             null_pct = null_count / total * 100
             if null_pct > threshold:
                 bad_cols.append(f"{col}({null_pct:.1f}%)")
-
-        qc.passed = len(bad_cols) == 0
-        qc.details = (
+        nulls.passed = len(bad_cols) == 0
+        nulls.details = (
             f"Columnas con >{threshold}% nulos: "
             f"{', '.join(bad_cols) if bad_cols else 'ninguna'}"
         )
-    except Exception as e:
-        qc.passed = False
-        qc.details = f"Error: {e}"
-    return qc
+        if "null_bounds" in profile:
+            nulls.details += (
+                f" (muestra {profile['sample_pct']}%: {profile['sample_rows']} filas)"
+            )
+            nulls.estimate = {
+                "method": f"tablesample_system({profile['sample_pct']})",
+                "confidence": 0.95,
+                "sample_rows": profile["sample_rows"],
+                "null_pct": {
+                    col: {
+                        "value": round(profile["nulls"][col] / total * 100, 2),
+                        "lower": round(low * 100, 2),
+                        "upper": round(high * 100, 2),
+                    }
+                    for col, (low, high) in profile["null_bounds"].items()
+                },
+            }
 
-def _sql_check_column_count(
-    schema: str,
-    table: str,
-    dataset: str,
-    min_cols: int = QUALITY_MIN_COLUMNS,
-) -> QualityCheck:
-    qc = QualityCheck("min_columns", dataset)
-    try:
-        with managed_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT COUNT(*) FROM information_schema.columns "
-                    "WHERE table_schema = %s AND table_name = %s",
-                    (schema, table),
-                )
-                col_count = cur.fetchone()[0]
-        qc.passed = col_count >= min_cols
-        qc.details = f"{col_count} columnas (mínimo: {min_cols})"
-    except Exception as e:
-        qc.passed = False
-        qc.details = f"Error: {e}"
-    return qc
+    col_count = len(profile["columns"])
+    min_columns = QualityCheck("min_columns", dataset)
+    min_columns.passed = col_count >= min_cols
+    min_columns.details = f"{col_count} columnas (mínimo: {min_cols})"
+
+    return [not_empty, no_dupes, nulls, min_columns]
 
 def check_not_empty(df: pd.DataFrame, dataset: str) -> QualityCheck:
     qc = QualityCheck("not_empty", dataset)
@@ -208,20 +306,131 @@ def check_schema_consistency(
         qc.details += f" ({', '.join(sorted(diff)[:10])})"
     return qc
 
-def _run_sql_checks(schema: str, table: str, dataset_name: str) -> list[dict]:
+def _estimated_rows(cur, schema: str, table: str) -> float:
+    cur.execute(
+        "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+        (f'{schema}."{table}"',),
+    )
+    row = cur.fetchone()
+    return row[0] if row else 0.0
+
+def _run_sql_checks(
+    cur, schema: str, table: str, dataset_name: str, mode: str = QUALITY_MODE
+) -> list[dict]:
+    try:
+        profile = None
+        if mode == "approx" and (
+            _estimated_rows(cur, schema, table) >= QUALITY_APPROX_MIN_ROWS
+        ):
+            profile = _sql_table_profile_approx(cur, schema, table)
+        if profile is None:
+            profile = _sql_table_profile(cur, schema, table)
+        checks = _sql_checks_from_profile(profile, dataset_name)
+    except Exception as e:
+        checks = []
+        for name in ("not_empty", "no_duplicate_rows", "null_threshold", "min_columns"):
+            qc = QualityCheck(name, dataset_name)
+            qc.details = f"Error: {e}"
+            checks.append(qc)
+    return _log_checks(checks)
+
+def _log_checks(checks: list[QualityCheck]) -> list[dict]:
     results = []
-    checks = [
-        _sql_check_not_empty(schema, table, dataset_name),
-        _sql_check_no_duplicate_rows(schema, table, dataset_name),
-        _sql_check_null_threshold(schema, table, dataset_name),
-        _sql_check_column_count(schema, table, dataset_name),
-    ]
     for c in checks:
         status = "OK" if c.passed else "FAIL"
-        logger.info("  [%s] %s: %s — %s", status, c.name, dataset_name, c.details)
+        logger.info("  [%s] %s: %s — %s", status, c.name, c.dataset, c.details)
         results.append(c.to_dict())
     return results
 
+def _evaluate_rules(
+    cur, schema: str, table: str, rules: list[AggregateRule | QueryRule]
+) -> list[QualityCheck]:
+    dataset = f"pg/{schema}/{table}"
+    checks = []
+
+    aggregate = [r for r in rules if isinstance(r, AggregateRule)]
+    if aggregate:
+        cur.execute(
+            f"SELECT COUNT(*), {', '.join(r.violations_sql for r in aggregate)} "
+            f"FROM {schema}.{table} AS f"
+        )
+        row = cur.fetchone()
+        total = row[0]
+        for rule, violations in zip(aggregate, row[1:]):
+            qc = QualityCheck(rule.name, dataset)
+            qc.passed = violations == 0
+            qc.details = f"{violations} filas con {rule.description} de {total}"
+            checks.append(qc)
+
+    for rule in rules:
+        if not isinstance(rule, QueryRule):
+            continue
+        cur.execute(rule.sql)
+        offending = [r[0] for r in cur.fetchall()]
+        qc = QualityCheck(rule.name, dataset)
+        qc.passed = not offending
+        qc.details = (
+            f"{rule.description}: "
+            f"{', '.join(str(v) for v in offending) if offending else 'ninguno'}"
+        )
+        checks.append(qc)
+    return checks
+
+def _run_rule_checks(
+    schema: str, table: str, rules: list[AggregateRule | QueryRule]
+) -> list[dict]:
+    try:
+        with managed_connection(schema=schema, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                checks = _evaluate_rules(cur, schema, table, rules)
+    except Exception as e:
+        checks = []
+        for rule in rules:
+            qc = QualityCheck(rule.name, f"pg/{schema}/{table}")
+            qc.details = f"Error: {e}"
+            checks.append(qc)
+    return _log_checks(checks)
+
+def _run_pg_checks_parallel(
+    raw_tables: list[str], mode: str, workers: int
+) -> list[dict]:
+    fact_tables = set(list_tables(PG_SCHEMA_FACTS))
+    fact_rules = {
+        table: rules
+        for table, rules in rules_by_table(FACT_RULES).items()
+        if table in fact_tables
+    }
+    if fact_rules:
+        logger.info(
+            "[PostgreSQL] Reglas del star schema: %d reglas en %d tablas de '%s'",
+            sum(len(r) for r in fact_rules.values()),
+            len(fact_rules),
+            PG_SCHEMA_FACTS,
+        )
+
+    def run_task(task: str) -> list[dict]:
+        schema, table = task.split(".", 1)
+        if schema == PG_SCHEMA_RAW:
+            with managed_connection(schema=schema, autocommit=True) as conn:
+                with conn.cursor() as cur:
+                    return _run_sql_checks(
+                        cur, schema, table, f"pg/{schema}/{table}", mode
+                    )
+        return _run_rule_checks(schema, table, fact_rules[table])
+
+    tasks = [f"{PG_SCHEMA_RAW}.{t}" for t in raw_tables] + [
+        f"{PG_SCHEMA_FACTS}.{t}" for t in fact_rules
+    ]
+    results = []
+    for run in run_per_table(tasks, run_task, workers=workers):
+        if run.error:
+            qc = QualityCheck("execution", f"pg/{run.table.replace('.', '/', 1)}")
+            qc.details = f"Error: {run.error}"
+            results.extend(_log_checks([qc]))
+        else:
+            results.extend(run.result)
+    return results
+
 def _run_checks_on_df(df: pd.DataFrame, dataset_name: str) -> list[dict]:
     results = []
     checks = [
@@ -236,13 +445,16 @@ def _run_checks_on_df(df: pd.DataFrame, dataset_name: str) -> list[dict]:
         results.append(c.to_dict())
     return results
 
-def run_quality_checks():
-    logger.info("=== PRUEBAS DE CALIDAD (PostgreSQL) ===")
+def run_quality_checks(mode: str = QUALITY_MODE, workers: int = TABLE_WORKERS):
+    if mode not in QUALITY_MODES:
+        raise ValueError(f"Modo de calidad desconocido: {mode!r}")
+    logger.info("=== PRUEBAS DE CALIDAD (PostgreSQL, modo: %s) ===", mode)
     QUALITY_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     all_results = []
 
-    pg_tables = list_tables(PG_SCHEMA_RAW)
+    pg_tables = set(list_tables(PG_SCHEMA_RAW))
     has_pg_tables = len(pg_tables) > 0
+    pg_targets: list[str] = []
 
     if has_pg_tables:
         logger.info(
@@ -251,15 +463,14 @@ def run_quality_checks():
             len(pg_tables),
         )
         for category in SNIES_CATEGORIES:
-            if not table_exists(PG_SCHEMA_RAW, category):
+            if category not in pg_tables:
                 logger.info(
                     "  [SKIP] Tabla '%s' no encontrada en '%s'",
                     category,
                     PG_SCHEMA_RAW,
                 )
                 continue
-            dataset_name = f"pg/{PG_SCHEMA_RAW}/{category}"
-            all_results.extend(_run_sql_checks(PG_SCHEMA_RAW, category, dataset_name))
+            pg_targets.append(category)
     else:
         logger.info(
             "[Parquet] PostgreSQL sin tablas, leyendo desde archivos procesados"
@@ -294,9 +505,8 @@ def run_quality_checks():
 
     for csv_dataset in CSV_DATASETS:
         table_name = csv_dataset.split("/")[-1]
-        if has_pg_tables and table_exists(PG_SCHEMA_RAW, table_name):
-            dataset_name = f"pg/{PG_SCHEMA_RAW}/{table_name}"
-            all_results.extend(_run_sql_checks(PG_SCHEMA_RAW, table_name, dataset_name))
+        if table_name in pg_tables:
+            pg_targets.append(table_name)
             continue
         pq_path = processed_parquet_path(csv_dataset)
         if pq_path.exists():
@@ -306,8 +516,13 @@ def run_quality_checks():
             except Exception as e:
                 logger.warning("Error leyendo %s: %s", pq_path, e)
 
+    # Una conexión en autocommit por tabla: solo lecturas, y un error en una
+    # tabla no aborta las demás
+    all_results.extend(_run_pg_checks_parallel(pg_targets, mode, workers))
+
     report = {
         "run_at": datetime.now(timezone.utc).isoformat(),
+        "mode": mode,
         "total_checks": len(all_results),
         "passed": sum(1 for r in all_results if r["passed"]),
         "failed": sum(1 for r in all_results if not r["passed"]),
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+from scripts.create_facts import FACT_FOREIGN_KEYS, STUDENT_CATEGORIES
+
+MAX_CANTIDAD_POR_FILA = 1_000_000
+
+
+# Las AggregateRule de una misma tabla se evalúan juntas en un solo SELECT
+# sobre la tabla (alias f); las QueryRule corren aparte y devuelven una fila
+# por valor que incumple.
+@dataclass(frozen=True)
+class AggregateRule:
+    name: str
+    table: str
+    # Expresión agregada que cuenta las filas que incumplen la regla
+    violations_sql: str
+    description: str
+
+
+@dataclass(frozen=True)
+class QueryRule:
+    name: str
+    table: str
+    sql: str
+    description: str
+
+
+def _fk_rules() -> list[AggregateRule]:
+    # Anti-join NOT EXISTS dentro del FILTER: todas las FKs de una tabla se
+    # validan en el mismo recorrido y, como en validate_star_schema, un NULL
+    # cuenta como huérfano
+    return [
+        AggregateRule(
+            name=f"fk_{fk_col}",
+            table=fact,
+            violations_sql=(
+                "COUNT(*) FILTER (WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {dim} d WHERE d.{pk} = f.{fk_col}))"
+            ),
+            description=f"huérfanos {fk_col} -> {dim}",
+        )
+        for fact, fk_col, dim, pk in FACT_FOREIGN_KEYS
+    ]
+
+
+def _range_rule(table: str, column: str) -> AggregateRule:
+    return AggregateRule(
+        name=f"range_{column}",
+        table=table,
+        violations_sql=(
+            f"COUNT(*) FILTER (WHERE f.{column} NOT BETWEEN 0 "
+            f"AND {MAX_CANTIDAD_POR_FILA})"
+        ),
+        description=f"{column} fuera de [0, {MAX_CANTIDAD_POR_FILA}]",
+    )
+
+
+def _completeness_rule(table: str, tipo_evento: str | None = None) -> QueryRule:
+    extra = f" AND f.tipo_evento = '{tipo_evento}'" if tipo_evento else ""
+    suffix = f"_{tipo_evento}" if tipo_evento else ""
+    return QueryRule(
+        name=f"period_completeness{suffix}",
+        table=table,
+        # Sondeos por índice sobre tiempo_id: no recorre la tabla de hechos
+        sql=(
+            "SELECT t.ano FROM dim_tiempo t GROUP BY t.ano "
+            "HAVING NOT bool_or(EXISTS ("
+            f"SELECT 1 FROM {table} f WHERE f.tiempo_id = t.id{extra})) "
+            "ORDER BY t.ano"
+        ),
+        description="años de dim_tiempo sin registros",
+    )
+
+
+FACT_RULES: list[AggregateRule | QueryRule] = [
+    *_fk_rules(),
+    _range_rule("fact_estudiantes", "cantidad"),
+    _range_rule("fact_docentes", "cantidad_docentes"),
+    *(
+        _range_rule("fact_administrativos", column)
+        for column in ("auxiliar", "tecnico", "profesional", "directivo", "total")
+    ),
+    *(
+        _completeness_rule("fact_estudiantes", config["tipo_evento"])
+        for config in STUDENT_CATEGORIES.values()
+    ),
+    _completeness_rule("fact_docentes"),
+    _completeness_rule("fact_administrativos"),
+]
+
+
+def rules_by_table(
+    rules: list[AggregateRule | QueryRule],
+) -> dict[str, list[AggregateRule | QueryRule]]:
+    grouped: dict[str, list[AggregateRule | QueryRule]] = {}
+    for rule in rules:
+        grouped.setdefault(rule.table, []).append(rule)
+    return grouped
@@ -1,4 +1,7 @@
+import hashlib
 import json
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -9,16 +12,25 @@ from config.globals import (
     PG_SCHEMA_RAW,
     PROCESSED_SNIES_DIR,
     OUTPUT_EXTENSION,
+    TABLE_WORKERS,
+    TRANSFORM_MODE,
 )
 from utils.db import get_engine, list_tables, managed_connection
 from utils.logger import logger
+from utils.parallel import effective_workers, run_per_table
 from utils.text import (
     create_pg_normalize_function,
     normalize_column_name,
     normalize_columns,
 )
 
-_INTERNAL_TABLES = {"_import_log"}
+_IMPORT_LOG_TABLE = "_import_log"
+FINGERPRINT_TABLE = "_transform_log"
+INTERNAL_TABLES = {_IMPORT_LOG_TABLE, FINGERPRINT_TABLE}
+TRANSFORM_MODES = ("ctas", "update")
+_CTAS_SUFFIX = "__ctas"
+# transform_all procesa tablas en hilos: el JSON de linaje es read-modify-write
+_lineage_lock = threading.Lock()
 
 def load_lineage() -> list:
     if LINEAGE_PATH.exists():
@@ -32,19 +44,20 @@ def save_lineage(lineage: list):
 def record_lineage(
     source: str, dest: str, operation: str, rows_in: int, rows_out: int, cols: int
 ):
-    lineage = load_lineage()
-    lineage.append(
-        {
-            "source": source,
-            "destination": dest,
-            "operation": operation,
-            "rows_input": rows_in,
-            "rows_output": rows_out,
-            "columns": cols,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-    )
-    save_lineage(lineage)
+    with _lineage_lock:
+        lineage = load_lineage()
+        lineage.append(
+            {
+                "source": source,
+                "destination": dest,
+                "operation": operation,
+                "rows_input": rows_in,
+                "rows_output": rows_out,
+                "columns": cols,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        save_lineage(lineage)
 
 def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df = normalize_columns(df)
@@ -170,6 +183,137 @@ def _delete_empty_rows_sql(cur, schema: str, table: str) -> int:
     cur.execute(f'DELETE FROM {schema}."{table}" WHERE {all_null_condition}')
     return cur.rowcount
 
+def _column_types(cur, schema: str, table: str) -> list[tuple[str, str]]:
+    cur.execute(
+        "SELECT a.attname, format_type(a.atttypid, a.atttypmod) "
+        "FROM pg_attribute a "
+        "WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped "
+        "ORDER BY a.attnum",
+        (f'{schema}."{table}"',),
+    )
+    return [(row[0], row[1]) for row in cur.fetchall()]
+
+def _has_dependent_views(cur, schema: str, table: str) -> bool:
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_depend d "
+        "JOIN pg_rewrite r ON r.oid = d.objid "
+        "WHERE d.classid = 'pg_rewrite'::regclass "
+        "AND d.refobjid = to_regclass(%s) AND r.ev_class <> d.refobjid)",
+        (f'{schema}."{table}"',),
+    )
+    return cur.fetchone()[0]
+
+def _owned_sequences(cur, schema: str, table: str) -> list[tuple[str, str]]:
+    # Secuencias SERIAL (id) ligadas a columnas de la tabla
+    cur.execute(
+        "SELECT d.objid::regclass::text, a.attname FROM pg_depend d "
+        "JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S' "
+        "JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid "
+        "WHERE d.classid = 'pg_class'::regclass "
+        "AND d.refobjid = to_regclass(%s) AND d.deptype = 'a'",
+        (f'{schema}."{table}"',),
+    )
+    return [(row[0], row[1]) for row in cur.fetchall()]
+
+def _index_definitions(cur, schema: str, table: str) -> list[tuple[str, list[str]]]:
+    # (DDL, columnas) de constraints PK/UNIQUE/EXCLUDE, índices sueltos y FKs,
+    # en el orden en que deben recrearse
+    regclass = f'{schema}."{table}"'
+    cur.execute(
+        "SELECT conname, pg_get_constraintdef(oid), contype = 'f', "
+        "ARRAY(SELECT attname::TEXT FROM pg_attribute "
+        "WHERE attrelid = conrelid AND attnum = ANY(conkey)) "
+        "FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'x', 'f')",
+        (regclass,),
+    )
+    constraints = [
+        (f'ALTER TABLE {regclass} ADD CONSTRAINT "{name}" {definition}', cols, fk)
+        for name, definition, fk, cols in cur.fetchall()
+    ]
+    cur.execute(
+        "SELECT pg_get_indexdef(i.indexrelid), "
+        "ARRAY(SELECT attname::TEXT FROM pg_attribute "
+        "WHERE attrelid = i.indrelid AND attnum = ANY(i.indkey)) "
+        "FROM pg_index i WHERE i.indrelid = to_regclass(%s) "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c "
+        "WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid "
+        "AND c.contype IN ('p', 'u', 'x'))",
+        (regclass,),
+    )
+    indexes = [(row[0], row[1]) for row in cur.fetchall()]
+    return (
+        [(ddl, cols) for ddl, cols, fk in constraints if not fk]
+        + indexes
+        + [(ddl, cols) for ddl, cols, fk in constraints if fk]
+    )
+
+def _transform_table_ctas(
+    cur, schema: str, table: str
+) -> tuple[list[str], list[str], int]:
+    # Copia sin índices llenada con un solo INSERT ... SELECT; índices y
+    # constraints se recrean con sus nombres tras el intercambio
+    cur.execute(f'LOCK TABLE {schema}."{table}" IN EXCLUSIVE MODE')
+    # Renombrar y descartar columnas unnamed es solo catálogo
+    renamed = _rename_columns_sql(cur, schema, table)
+    columns = _column_types(cur, schema, table)
+    unnamed = [col for col, _ in columns if col.startswith("unnamed")]
+    if unnamed:
+        drops = ", ".join(f'DROP COLUMN "{col}"' for col in unnamed)
+        cur.execute(f'ALTER TABLE {schema}."{table}" {drops}')
+        columns = [(col, t) for col, t in columns if col not in unnamed]
+    if not columns:
+        cur.execute(f'SELECT COUNT(*) FROM {schema}."{table}"')
+        return renamed, unnamed, cur.fetchone()[0]
+    definitions = _index_definitions(cur, schema, table)
+
+    tmp = f"{table}{_CTAS_SUFFIX}"
+    cur.execute(f'DROP TABLE IF EXISTS {schema}."{tmp}"')
+    cur.execute(
+        f'CREATE TABLE {schema}."{tmp}" '
+        f'(LIKE {schema}."{table}" INCLUDING ALL EXCLUDING INDEXES)'
+    )
+
+    select_exprs = []
+    for col, col_type in columns:
+        if col_type == "text" or col_type.startswith("character varying"):
+            select_exprs.append(f'pg_normalize_text("{col}")::{col_type}')
+        else:
+            select_exprs.append(f'"{col}"')
+    col_list = ", ".join(f'"{col}"' for col, _ in columns)
+    # Las columnas sin ningún valor salen del mismo recorrido (RETURNING)
+    flags = ", ".join(
+        f'"{col}" IS NOT NULL AS f{i}' for i, (col, _) in enumerate(columns)
+    )
+    any_flags = ", ".join(f"bool_or(f{i})" for i in range(len(columns)))
+    cur.execute(
+        f'WITH ins AS (INSERT INTO {schema}."{tmp}" ({col_list}) '
+        f'SELECT * FROM (SELECT {", ".join(select_exprs)} FROM {schema}."{table}") '
+        f"s({col_list}) WHERE NOT ROW({col_list}) IS NULL RETURNING {flags}) "
+        f"SELECT COUNT(*), {any_flags} FROM ins"
+    )
+    rows_out, *has_values = cur.fetchone()
+    all_null_cols = []
+    if rows_out:
+        all_null_cols = [col for (col, _), seen in zip(columns, has_values) if not seen]
+    if all_null_cols:
+        drops = ", ".join(f'DROP COLUMN "{col}"' for col in all_null_cols)
+        cur.execute(f'ALTER TABLE {schema}."{tmp}" {drops}')
+
+    # El default de id apunta a la secuencia de la original: se transfiere
+    # para que no desaparezca con el DROP
+    for seq, col in _owned_sequences(cur, schema, table):
+        if col not in all_null_cols:
+            cur.execute(f'ALTER SEQUENCE {seq} OWNED BY {schema}."{tmp}"."{col}"')
+
+    cur.execute(f'DROP TABLE {schema}."{table}"')
+    cur.execute(f'ALTER TABLE {schema}."{tmp}" RENAME TO "{table}"')
+    for ddl, cols in definitions:
+        if not set(cols) & set(all_null_cols):
+            cur.execute(ddl)
+    cur.execute(f'ANALYZE {schema}."{table}"')
+    return renamed, unnamed + all_null_cols, rows_out
+
 def _ensure_pg_normalize_function(schema: str):
     with managed_connection(schema=schema) as conn:
         create_pg_normalize_function(conn)
@@ -186,37 +330,165 @@ def _get_table_meta(cur, schema: str, table: str) -> tuple[int, list[str]]:
     columns = [row[0] for row in cur.fetchall()]
     return row_count, columns
 
-def transform_table(table: str, engine) -> dict | None:
+DDL_FINGERPRINT_LOG = f"""
+CREATE TABLE IF NOT EXISTS "{FINGERPRINT_TABLE}" (
+    stage            TEXT      NOT NULL,
+    table_name       TEXT      NOT NULL,
+    row_count        BIGINT    NOT NULL,
+    columns          TEXT[]    NOT NULL,
+    import_watermark TEXT      NOT NULL,
+    fingerprint      TEXT      NOT NULL,
+    recorded_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (stage, table_name)
+)
+"""
+
+def ensure_fingerprint_table(schema: str = PG_SCHEMA_RAW) -> None:
+    with managed_connection(schema=schema) as conn:
+        with conn.cursor() as cur:
+            cur.execute(DDL_FINGERPRINT_LOG)
+
+def _import_watermark(cur, schema: str, table: str) -> str:
+    # Cambia con cada archivo nuevo o reimportado de la categoría en _import_log
+    cur.execute(
+        "SELECT to_regclass(%s) IS NOT NULL", (f'{schema}."{_IMPORT_LOG_TABLE}"',)
+    )
+    if not cur.fetchone()[0]:
+        return ""
+    cur.execute(
+        f"SELECT COALESCE(md5("
+        f"string_agg(file_hash, ',' ORDER BY file_hash) "
+        f"|| '|' || MAX(imported_at)::TEXT), '') "
+        f'FROM {schema}."{_IMPORT_LOG_TABLE}" WHERE category = %s',
+        (table,),
+    )
+    return cur.fetchone()[0]
+
+def table_fingerprint(
+    cur, schema: str, table: str, meta: tuple[int, list[str]] | None = None
+) -> dict:
+    """Huella de una tabla: filas, columnas y marca de agua de _import_log."""
+    row_count, columns = meta or _get_table_meta(cur, schema, table)
+    watermark = _import_watermark(cur, schema, table)
+    digest = hashlib.md5(
+        f"{row_count}|{','.join(columns)}|{watermark}".encode()
+    ).hexdigest()
+    return {
+        "row_count": row_count,
+        "columns": columns,
+        "import_watermark": watermark,
+        "fingerprint": digest,
+    }
+
+def stored_fingerprint(cur, schema: str, stage: str, table: str) -> str | None:
+    cur.execute(
+        f'SELECT fingerprint FROM {schema}."{FINGERPRINT_TABLE}" '
+        "WHERE stage = %s AND table_name = %s",
+        (stage, table),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def record_fingerprint(cur, schema: str, stage: str, table: str, fp: dict) -> None:
+    # Las etapas ya completadas adoptan la huella nueva: normalize_data quita
+    # columnas después de transform y si no transform vería la tabla cambiada
+    values = (
+        fp["row_count"],
+        fp["columns"],
+        fp["import_watermark"],
+        fp["fingerprint"],
+    )
+    cur.execute(
+        f'INSERT INTO {schema}."{FINGERPRINT_TABLE}" '
+        "(stage, table_name, row_count, columns, import_watermark, fingerprint) "
+        "VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (stage, table_name) DO UPDATE SET "
+        "row_count = EXCLUDED.row_count, columns = EXCLUDED.columns, "
+        "import_watermark = EXCLUDED.import_watermark, "
+        "fingerprint = EXCLUDED.fingerprint, recorded_at = NOW()",
+        (stage, table, *values),
+    )
+    cur.execute(
+        f'UPDATE {schema}."{FINGERPRINT_TABLE}" '
+        "SET row_count = %s, columns = %s, fingerprint = %s, recorded_at = NOW() "
+        "WHERE table_name = %s AND stage <> %s AND import_watermark = %s",
+        (values[0], values[1], values[3], table, stage, values[2]),
+    )
+
+def transform_table(
+    table: str, engine, mode: str = TRANSFORM_MODE, force: bool = False
+) -> dict | None:
     schema = PG_SCHEMA_RAW
 
     with managed_connection(schema=schema) as conn:
         with conn.cursor() as cur:
-            cur.execute(f'SELECT COUNT(*) FROM {schema}."{table}"')
-            rows_in = cur.fetchone()[0]
+            meta_in = _get_table_meta(cur, schema, table)
+            rows_in = meta_in[0]
 
             if rows_in == 0:
                 logger.info("  %s: tabla vacía, omitiendo", table)
                 return None
 
-            logger.info("  %s: %d filas leídas", table, rows_in)
+            fp_in = table_fingerprint(cur, schema, table, meta_in)
+            if not force and fp_in["fingerprint"] == stored_fingerprint(
+                cur, schema, "transform", table
+            ):
+                logger.info("  %s: sin cambios desde la última corrida", table)
+                return {
+                    "rows": rows_in,
+                    "cols": len(meta_in[1]),
+                    "columns": meta_in[1],
+                    "skipped": True,
+                }
 
-            renamed = _rename_columns_sql(cur, schema, table)
-            if renamed:
-                logger.info("  %s: columnas renombradas: %s", table, renamed)
-
-            dropped = _drop_junk_columns_sql(cur, schema, table)
-            if dropped:
-                logger.info("  %s: columnas eliminadas: %s", table, dropped)
-
-            updated = _clean_text_columns_sql(cur, schema, table)
-            if updated:
-                logger.info("  %s: %d filas actualizadas (texto)", table, updated)
+            logger.info("  %s: %d filas leídas", table, rows_in)
 
-            deleted = _delete_empty_rows_sql(cur, schema, table)
-            if deleted:
-                logger.info("  %s: %d filas vacías eliminadas", table, deleted)
+            if mode == "ctas" and _has_dependent_views(cur, schema, table):
+                logger.warning(
+                    "  %s: tiene vistas dependientes, se transforma en modo update",
+                    table,
+                )
+                mode = "update"
+
+            if mode == "ctas":
+                renamed, dropped, rows_ctas = _transform_table_ctas(
+                    cur, schema, table
+                )
+                if renamed:
+                    logger.info("  %s: columnas renombradas: %s", table, renamed)
+                if dropped:
+                    logger.info("  %s: columnas eliminadas: %s", table, dropped)
+                if rows_in - rows_ctas:
+                    logger.info(
+                        "  %s: %d filas vacías descartadas",
+                        table,
+                        rows_in - rows_ctas,
+                    )
+            else:
+                renamed = _rename_columns_sql(cur, schema, table)
+                if renamed:
+                    logger.info("  %s: columnas renombradas: %s", table, renamed)
+
+                dropped = _drop_junk_columns_sql(cur, schema, table)
+                if dropped:
+                    logger.info("  %s: columnas eliminadas: %s", table, dropped)
+
+                updated = _clean_text_columns_sql(cur, schema, table)
+                if updated:
+                    logger.info("  %s: %d filas actualizadas (texto)", table, updated)
+
+                deleted = _delete_empty_rows_sql(cur, schema, table)
+                if deleted:
+                    logger.info("  %s: %d filas vacías eliminadas", table, deleted)
 
             rows_out, final_columns = _get_table_meta(cur, schema, table)
+            record_fingerprint(
+                cur,
+                schema,
+                "transform",
+                table,
+                table_fingerprint(cur, schema, table, (rows_out, final_columns)),
+            )
 
     record_lineage(
         f"pg:{schema}.{table}",
@@ -241,14 +513,54 @@ def transform_table(table: str, engine) -> dict | None:
         "columns": final_columns,
     }
 
-def transform_all():
+def _log_transform_timing(runs: list, wall_clock_s: float) -> None:
+    logger.info("-" * 50)
+    logger.info("  %-32s %10s %6s %9s", "tabla", "filas", "cols", "tiempo(s)")
+    for run in runs:
+        if run.error:
+            logger.info("  %-32s ERROR: %s", run.table, run.error)
+        elif run.result is None:
+            logger.info(
+                "  %-32s %10s %6s %9.2f", run.table, "vacía", "-", run.elapsed_s
+            )
+        elif run.result.get("skipped"):
+            logger.info(
+                "  %-32s %10d %6d %9.2f  (sin cambios)",
+                run.table,
+                run.result["rows"],
+                run.result["cols"],
+                run.elapsed_s,
+            )
+        else:
+            logger.info(
+                "  %-32s %10d %6d %9.2f",
+                run.table,
+                run.result["rows"],
+                run.result["cols"],
+                run.elapsed_s,
+            )
+    logger.info(
+        "  Tiempo de pared: %.2f s | suma por tabla: %.2f s",
+        wall_clock_s,
+        sum(run.elapsed_s for run in runs),
+    )
+
+def transform_all(
+    mode: str = TRANSFORM_MODE, workers: int = TABLE_WORKERS, force: bool = False
+):
+    if mode not in TRANSFORM_MODES:
+        raise ValueError(f"Modo de transformación desconocido: {mode!r}")
     logger.info("=" * 50)
-    logger.info("TRANSFORMACIÓN Y LIMPIEZA (PostgreSQL)")
+    logger.info("TRANSFORMACIÓN Y LIMPIEZA (PostgreSQL, modo: %s)", mode)
     logger.info("Schema objetivo: %s", PG_SCHEMA_RAW)
     logger.info("=" * 50)
 
     raw_tables = list_tables(PG_SCHEMA_RAW)
-    tables_to_process = sorted(t for t in raw_tables if t not in _INTERNAL_TABLES)
+    tables_to_process = sorted(
+        t
+        for t in raw_tables
+        if t not in INTERNAL_TABLES and not t.endswith(_CTAS_SUFFIX)
+    )
 
     if not tables_to_process:
         logger.warning("Schema '%s' no tiene tablas para transformar", PG_SCHEMA_RAW)
@@ -262,16 +574,36 @@ def transform_all():
     )
 
     _ensure_pg_normalize_function(PG_SCHEMA_RAW)
+    ensure_fingerprint_table(PG_SCHEMA_RAW)
 
     engine = get_engine(schema=PG_SCHEMA_RAW)
-    results: dict[str, dict] = {}
+    logger.info(
+        "Transformando con %d hilo(s)",
+        effective_workers(workers, len(tables_to_process)),
+    )
+
+    start = time.perf_counter()
+    runs = run_per_table(
+        tables_to_process,
+        lambda table: transform_table(table, engine, mode=mode, force=force),
+        workers=workers,
+    )
+    _log_transform_timing(runs, time.perf_counter() - start)
 
-    for table in tables_to_process:
-        result = transform_table(table, engine)
-        if result is not None:
-            results[table] = result
+    failed = [run.table for run in runs if run.error]
+    if failed:
+        raise RuntimeError(f"Tablas con error en la transformación: {failed}")
+
+    results: dict[str, dict] = {
+        run.table: run.result for run in runs if run.result is not None
+    }
+    skipped = sum(1 for r in results.values() if r.get("skipped"))
 
     logger.info("=" * 50)
-    logger.info("TRANSFORMACIÓN COMPLETA: %d datasets procesados", len(results))
+    logger.info(
+        "TRANSFORMACIÓN COMPLETA: %d datasets procesados (%d sin cambios)",
+        len(results),
+        skipped,
+    )
     logger.info("=" * 50)
     return results
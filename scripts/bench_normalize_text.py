@@ -0,0 +1,150 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config.globals import PG_SCHEMA_RAW
+from utils.db import managed_connection
+from utils.logger import logger
+from utils.text import (
+    create_pg_normalize_function,
+    create_pg_normalize_plpgsql_function,
+)
+
+BENCH_TABLE = "_bench_normalize_text"
+DEFAULT_ROWS = 1_000_000
+DEFAULT_REPEAT = 3
+FUNCTIONS = ("pg_normalize_text", "pg_normalize_text_plpgsql")
+
+_SAMPLE_VALUES = [
+    "  Bogotá D.C. ",
+    "MEDELLÍN",
+    "Ingeniería   de  Sistemas",
+    "Año  Académico",
+    "CÚCUTA - Norte de Santander",
+    "\tUniversidad Nacional de Colombia\n",
+    "Pregrado",
+    "  ",
+]
+
+
+def _create_bench_table(cur, rows: int) -> None:
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE {BENCH_TABLE} ON COMMIT DROP AS
+        SELECT
+            CASE
+                WHEN g %% 50 = 0 THEN NULL
+                ELSE (%(samples)s::TEXT[])[1 + g %% %(n_samples)s] || ' ' || g::TEXT
+            END AS valor
+        FROM generate_series(1, %(rows)s) AS g
+        """,
+        {"samples": _SAMPLE_VALUES, "n_samples": len(_SAMPLE_VALUES), "rows": rows},
+    )
+    cur.execute(f"ANALYZE {BENCH_TABLE}")
+
+
+def _is_inlined(cur, function: str) -> bool:
+    cur.execute(f"EXPLAIN (VERBOSE) SELECT {function}(valor) FROM {BENCH_TABLE}")
+    plan = "\n".join(row[0] for row in cur.fetchall())
+    return function not in plan
+
+
+def _time_function(cur, function: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        cur.execute(f"SELECT count({function}(valor)) FROM {BENCH_TABLE}")
+        cur.fetchone()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _count_mismatches(cur) -> int:
+    cur.execute(
+        f"""
+        SELECT count(*) FROM {BENCH_TABLE}
+        WHERE {FUNCTIONS[0]}(valor) IS DISTINCT FROM {FUNCTIONS[1]}(valor)
+        """
+    )
+    return cur.fetchone()[0]
+
+
+def run_benchmark(rows: int = DEFAULT_ROWS, repeat: int = DEFAULT_REPEAT) -> dict:
+    results: dict = {"rows": rows, "repeat": repeat, "functions": {}}
+
+    with managed_connection(schema=PG_SCHEMA_RAW) as conn:
+        create_pg_normalize_function(conn)
+        create_pg_normalize_plpgsql_function(conn)
+
+        with conn.cursor() as cur:
+            t0 = time.perf_counter()
+            _create_bench_table(cur, rows)
+            logger.info(
+                "Tabla sintética %s: %d filas (%.2fs)",
+                BENCH_TABLE,
+                rows,
+                time.perf_counter() - t0,
+            )
+
+            for function in FUNCTIONS:
+                elapsed = _time_function(cur, function, repeat)
+                inlined = _is_inlined(cur, function)
+                results["functions"][function] = {
+                    "seconds": elapsed,
+                    "inlined": inlined,
+                }
+                logger.info(
+                    "  %-28s %.3fs (mejor de %d)  inline=%s",
+                    function,
+                    elapsed,
+                    repeat,
+                    "sí" if inlined else "no",
+                )
+
+            results["mismatches"] = _count_mismatches(cur)
+            cur.execute(f"DROP FUNCTION IF EXISTS {FUNCTIONS[1]}(TEXT)")
+
+    sql_s = results["functions"][FUNCTIONS[0]]["seconds"]
+    plpgsql_s = results["functions"][FUNCTIONS[1]]["seconds"]
+    if sql_s > 0:
+        logger.info("Speedup SQL vs PL/pgSQL: %.2fx", plpgsql_s / sql_s)
+    if results["mismatches"]:
+        logger.warning(
+            "%d filas difieren entre %s y %s",
+            results["mismatches"],
+            *FUNCTIONS,
+        )
+    else:
+        logger.info("Ambas variantes producen el mismo resultado")
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compara pg_normalize_text (SQL inlineable) contra la variante "
+            "PL/pgSQL sobre una tabla sintética."
+        )
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=DEFAULT_ROWS,
+        help=f"Filas de la tabla sintética (default: {DEFAULT_ROWS}).",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Repeticiones por función; se reporta la mejor (default: {DEFAULT_REPEAT}).",
+    )
+    args = parser.parse_args()
+    run_benchmark(rows=args.rows, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
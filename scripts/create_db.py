@@ -1,10 +1,17 @@
-import csv
 import hashlib
-import io
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import chain, islice
 from pathlib import Path
+from typing import Generator, Iterable, Iterator
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
@@ -14,12 +21,17 @@ from config.globals import (
     SNIES_CATEGORIES,
     PG_SCHEMA_RAW,
     INPUT_EXTENSION_SNIES,
+    RAW_LOAD_WORKERS,
+    staging_snies_path,
 )
 from utils.db import (
+    close_pool,
+    copy_rows,
     ensure_schemas,
     get_column_names,
     get_row_count,
     managed_connection,
+    table_exists,
 )
 from utils.logger import logger
 from utils.text import normalize_column_name
@@ -29,6 +41,7 @@ _IMPORT_LOG_TABLE = "_import_log"
 HEADER_SEARCH_ROWS = 15
 MIN_HEADER_COLUMNS = 5
 HEADER_KEYWORDS = ("código", "codigo", "ies", "institución", "institucion")
+STAGING_BATCH_ROWS = 50_000
 
 _BASE_COLUMNS = [
     "codigo_de_la_institucion",
@@ -139,6 +152,12 @@ def _ensure_import_log_table() -> None:
                 "  UNIQUE(category, file_name, file_hash)"
                 ")"
             )
+            cur.execute(
+                f'ALTER TABLE "{_IMPORT_LOG_TABLE}" '
+                "ADD COLUMN IF NOT EXISTS sheet_name TEXT, "
+                "ADD COLUMN IF NOT EXISTS header_row INTEGER, "
+                "ADD COLUMN IF NOT EXISTS parse_time_s REAL"
+            )
 
 def _is_file_already_imported(category: str, file_name: str, file_hash: str) -> bool:
     with managed_connection(schema=PG_SCHEMA_RAW) as conn:
@@ -153,83 +172,190 @@ def _is_file_already_imported(category: str, file_name: str, file_hash: str) ->
             result = cur.fetchone()
             return bool(result and result[0])
 
-def _register_imported_file(
-    category: str, file_name: str, file_hash: str, rows: int
-) -> None:
-    with managed_connection(schema=PG_SCHEMA_RAW) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                f'INSERT INTO "{_IMPORT_LOG_TABLE}" '
-                f"(category, file_name, file_hash, rows_imported) "
-                f"VALUES (%s, %s, %s, %s) "
-                f"ON CONFLICT (category, file_name, file_hash) DO NOTHING",
-                (category, file_name, file_hash, rows),
-            )
-
-def detect_header_row(path: Path, sheet_name: str | int = 0) -> int | None:
-    df_raw = pd.read_excel(
-        path,
-        sheet_name=sheet_name,
-        engine="openpyxl",
-        header=None,
-        nrows=HEADER_SEARCH_ROWS,
-    )
-    for idx, row in df_raw.iterrows():
-        non_null = row.dropna()
-        if len(non_null) < MIN_HEADER_COLUMNS:
-            continue
-        values_lower = " ".join(str(v).lower() for v in non_null.values)
-        if any(kw in values_lower for kw in HEADER_KEYWORDS):
-            return int(str(idx))
+@dataclass
+class WorkbookStream:
+    path: Path
+    sheet_name: str
+    header_row: int
+    columns: list[str]
+    rows: Iterator[tuple]
+
+def _cell_value(value: object) -> object:
+    # Mismas conversiones que aplica pandas.read_excel sobre openpyxl
+    if isinstance(value, str) and value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _is_header_row(row: tuple) -> bool:
+    non_null = [v for v in row if v is not None and v != ""]
+    if len(non_null) < MIN_HEADER_COLUMNS:
+        return False
+    values_lower = " ".join(str(v).lower() for v in non_null)
+    return any(kw in values_lower for kw in HEADER_KEYWORDS)
+
+def detect_header_in_rows(rows: list[tuple]) -> int | None:
+    for idx, row in enumerate(rows[:HEADER_SEARCH_ROWS]):
+        if _is_header_row(row):
+            return idx
     return None
 
-def _clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    df.columns = [normalize_column_name(str(c)) for c in df.columns]
-    df = df.dropna(how="all").reset_index(drop=True)
-    unnamed = [c for c in df.columns if c.startswith("unnamed")]
-    if unnamed:
-        df = df.drop(columns=unnamed)
-    return df
-
-def _find_best_sheet(path: Path) -> tuple[str | int, int]:
-    xls = pd.ExcelFile(path, engine="openpyxl")
-    for sheet_name in xls.sheet_names:
-        header_row = detect_header_row(path, sheet_name=sheet_name)
-        if header_row is not None:
-            return sheet_name, header_row
-    return xls.sheet_names[0], 0
-
-def read_excel_with_header(path: Path) -> pd.DataFrame | None:
-    xls = pd.ExcelFile(path, engine="openpyxl")
-
-    for sheet_name in xls.sheet_names:
-        header_row = detect_header_row(path, sheet_name=sheet_name)
-        if header_row is not None:
-            df = pd.read_excel(xls, sheet_name=sheet_name, header=header_row)
-            df = _clean_dataframe(df)
-            if not df.empty:
-                logger.debug(
-                    "    Usando hoja '%s' (header en fila %d)", sheet_name, header_row
-                )
-                return df
-
-    for sheet_name in xls.sheet_names:
-        try:
-            df = pd.read_excel(xls, sheet_name=sheet_name, header=0)
-            df = _clean_dataframe(df)
-            if not df.empty:
-                logger.warning(
-                    "No se detectó header con keywords en %s, usando hoja '%s' fila 0",
-                    path.name,
-                    sheet_name,
-                )
-                return df
-        except Exception:
+def _header_labels(header: tuple) -> list[str]:
+    labels: list[str] = []
+    seen: dict[str, int] = {}
+    for i, value in enumerate(header):
+        label = f"Unnamed: {i}" if value is None or value == "" else str(value)
+        if label in seen:
+            seen[label] += 1
+            label = f"{label}.{seen[label]}"
+        else:
+            seen[label] = 0
+        labels.append(label)
+    return labels
+
+def _normalized_header(header: tuple) -> tuple[list[str], list[int]]:
+    columns: list[str] = []
+    positions: list[int] = []
+    for i, label in enumerate(_header_labels(header)):
+        col = normalize_column_name(label)
+        if col and not col.startswith("unnamed"):
+            columns.append(col)
+            positions.append(i)
+    return columns, positions
+
+def _normalize_rows(rows: Iterable[tuple], positions: list[int]) -> Iterator[tuple]:
+    for row in rows:
+        width = len(row)
+        values = tuple(_cell_value(row[i]) if i < width else None for i in positions)
+        if any(v is not None for v in values):
+            yield values
+
+def _stream_from_sheet(
+    path: Path, ws, head: list[tuple], row_iter: Iterator[tuple], header_row: int
+) -> WorkbookStream | None:
+    columns, positions = _normalized_header(head[header_row])
+    if not columns:
+        return None
+    rows = _normalize_rows(chain(head[header_row + 1 :], row_iter), positions)
+    first = next(rows, None)
+    if first is None:
+        return None
+    return WorkbookStream(path, ws.title, header_row, columns, chain([first], rows))
+
+def _locate_data(wb, path: Path) -> WorkbookStream | None:
+    for ws in wb.worksheets:
+        row_iter = ws.iter_rows(values_only=True)
+        head = list(islice(row_iter, HEADER_SEARCH_ROWS))
+        header_row = detect_header_in_rows(head)
+        if header_row is None:
             continue
+        stream = _stream_from_sheet(path, ws, head, row_iter, header_row)
+        if stream is not None:
+            logger.debug("    Usando hoja '%s' (header en fila %d)", ws.title, header_row)
+            return stream
+
+    for ws in wb.worksheets:
+        row_iter = ws.iter_rows(values_only=True)
+        head = list(islice(row_iter, 1))
+        if not head:
+            continue
+        stream = _stream_from_sheet(path, ws, head, row_iter, 0)
+        if stream is not None:
+            logger.warning(
+                "No se detectó header con keywords en %s, usando hoja '%s' fila 0",
+                path.name,
+                ws.title,
+            )
+            return stream
 
     logger.warning("No se pudo leer ningún dato válido de %s", path.name)
     return None
 
+@contextmanager
+def open_workbook_stream(path: Path) -> Generator[WorkbookStream | None, None, None]:
+    wb = load_workbook(path, read_only=True, data_only=True)
+    # Igual que pandas: en modo read_only la <dimension> guardada puede estar
+    # desactualizada y cortar las filas
+    for ws in wb.worksheets:
+        ws.reset_dimensions()
+    try:
+        yield _locate_data(wb, path)
+    finally:
+        wb.close()
+
+def _staging_metadata(stream: WorkbookStream) -> dict[bytes, bytes]:
+    return {
+        b"source_file": stream.path.name.encode(),
+        b"sheet_name": stream.sheet_name.encode(),
+        b"header_row": str(stream.header_row).encode(),
+    }
+
+def _tee_to_staging(stream: WorkbookStream, dest: Path) -> Iterator[tuple]:
+    # Escribe las filas a Parquet mientras se consumen; el archivo solo se
+    # publica (os.replace) si el stream se agota completo.
+    schema = pa.schema(
+        [pa.field(c, pa.string()) for c in stream.columns],
+        metadata=_staging_metadata(stream),
+    )
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(f".{os.getpid()}.tmp")
+    writer = pq.ParquetWriter(tmp, schema)
+    completed = False
+    try:
+        batch: list[tuple] = []
+        for row in stream.rows:
+            yield row
+            batch.append(tuple(None if v is None else str(v) for v in row))
+            if len(batch) >= STAGING_BATCH_ROWS:
+                writer.write_table(_rows_to_arrow(batch, schema))
+                batch = []
+        if batch:
+            writer.write_table(_rows_to_arrow(batch, schema))
+        completed = True
+    finally:
+        writer.close()
+        if completed:
+            os.replace(tmp, dest)
+        else:
+            tmp.unlink(missing_ok=True)
+
+def _rows_to_arrow(batch: list[tuple], schema: pa.Schema) -> pa.Table:
+    return pa.Table.from_arrays(
+        [pa.array(col, type=pa.string()) for col in zip(*batch)], schema=schema
+    )
+
+def _iter_staged_rows(parquet: pq.ParquetFile) -> Iterator[tuple]:
+    for record_batch in parquet.iter_batches(batch_size=STAGING_BATCH_ROWS):
+        yield from zip(*(col.to_pylist() for col in record_batch.columns))
+
+def open_staged_stream(path: Path, file_hash: str) -> WorkbookStream | None:
+    staged = staging_snies_path(file_hash)
+    if not staged.exists():
+        return None
+    parquet = pq.ParquetFile(staged)
+    metadata = parquet.schema_arrow.metadata or {}
+    return WorkbookStream(
+        path,
+        metadata.get(b"sheet_name", b"").decode(),
+        int(metadata.get(b"header_row", b"0")),
+        list(parquet.schema_arrow.names),
+        _iter_staged_rows(parquet),
+    )
+
+@contextmanager
+def open_source_stream(
+    path: Path, file_hash: str
+) -> Generator[tuple[WorkbookStream | None, bool], None, None]:
+    staged = open_staged_stream(path, file_hash)
+    if staged is not None:
+        yield staged, True
+        return
+    with open_workbook_stream(path) as stream:
+        if stream is not None:
+            stream.rows = _tee_to_staging(stream, staging_snies_path(file_hash))
+        yield stream, False
+
 def create_empty_table(table_name: str, columns: list[str]):
     cols_sql = ", ".join(f'"{c}" TEXT' for c in columns)
     with managed_connection(schema=PG_SCHEMA_RAW) as conn:
@@ -239,104 +365,159 @@ def create_empty_table(table_name: str, columns: list[str]):
                 f"(id SERIAL PRIMARY KEY, {cols_sql})"
             )
 
-def _bulk_insert_copy(conn, table_name: str, df: pd.DataFrame) -> None:
-    if df.empty:
-        return
-    columns = list(df.columns)
-    cols_quoted = ", ".join(f'"{c}"' for c in columns)
-    buf = io.StringIO()
-    df.to_csv(
-        buf,
-        index=False,
-        header=False,
-        sep="\t",
-        na_rep="\\N",
-        quoting=csv.QUOTE_NONE,
-        escapechar="\\",
-    )
-    buf.seek(0)
-    with conn.cursor() as cur:
-        cur.copy_expert(
-            f"COPY \"{table_name}\" ({cols_quoted}) FROM STDIN WITH (FORMAT text, NULL '\\N')",
-            buf,
-        )
-
 def collect_xlsx_files(category: str) -> list[Path]:
     category_dir = RAW_SNIES_DIR / category
     if not category_dir.exists():
         return []
     return sorted(category_dir.glob(f"*{INPUT_EXTENSION_SNIES}"))
 
-def build_unified_schema(files: list[Path]) -> list[str]:
+def build_unified_schema(column_lists: list[list[str]]) -> list[str]:
     all_columns: list[str] = []
     seen: set[str] = set()
-    for path in files:
-        sheet_name, header_row = _find_best_sheet(path)
-        df = pd.read_excel(
-            path, sheet_name=sheet_name, engine="openpyxl", header=header_row, nrows=0
-        )
-        for col in df.columns:
-            normalized = normalize_column_name(str(col))
-            if (
-                normalized
-                and not normalized.startswith("unnamed")
-                and normalized not in seen
-            ):
-                all_columns.append(normalized)
-                seen.add(normalized)
+    for columns in column_lists:
+        for col in columns:
+            if col and not col.startswith("unnamed") and col not in seen:
+                all_columns.append(col)
+                seen.add(col)
     return all_columns
 
-def process_category(category: str):
+@dataclass
+class ImportRecord:
+    category: str
+    file_name: str
+    file_hash: str
+    rows: int
+    sheet_name: str
+    header_row: int
+    parse_time_s: float
+
+@dataclass
+class CategoryResult:
+    category: str
+    imported: list[ImportRecord] = field(default_factory=list)
+    skipped: int = 0
+    elapsed_s: float = 0.0
+    error: str = ""
+
+    @property
+    def rows_imported(self) -> int:
+        return sum(r.rows for r in self.imported)
+
+    @property
+    def parse_time_s(self) -> float:
+        return sum(r.parse_time_s for r in self.imported)
+
+def _register_import(cur, record: ImportRecord) -> None:
+    cur.execute(
+        f'INSERT INTO "{_IMPORT_LOG_TABLE}" '
+        f"(category, file_name, file_hash, rows_imported, "
+        f"sheet_name, header_row, parse_time_s) "
+        f"VALUES (%s, %s, %s, %s, %s, %s, %s) "
+        f"ON CONFLICT (category, file_name, file_hash) DO UPDATE SET "
+        f"rows_imported = EXCLUDED.rows_imported, "
+        f"imported_at = NOW(), "
+        f"sheet_name = EXCLUDED.sheet_name, "
+        f"header_row = EXCLUDED.header_row, "
+        f"parse_time_s = EXCLUDED.parse_time_s",
+        (
+            record.category,
+            record.file_name,
+            record.file_hash,
+            record.rows,
+            record.sheet_name,
+            record.header_row,
+            record.parse_time_s,
+        ),
+    )
+
+def process_category(category: str) -> CategoryResult:
     logger.info("[%s] Procesando categoría", category)
+    result = CategoryResult(category)
+    start = time.perf_counter()
     files = collect_xlsx_files(category)
 
     if files:
         logger.info("[%s] Encontrados %d archivos Excel", category, len(files))
-        schema = build_unified_schema(files)
-        create_empty_table(category, schema)
 
-        imported_count = 0
-        skipped_count = 0
+        column_lists: list[list[str]] = []
+        reload_all = not table_exists(PG_SCHEMA_RAW, category) or (
+            get_row_count(PG_SCHEMA_RAW, category) == 0
+        )
+        if reload_all:
+            logger.info("[%s] Tabla vacía o inexistente: se ignora _import_log", category)
 
         for path in files:
             file_hash = _file_md5(path)
 
-            if _is_file_already_imported(category, path.name, file_hash):
+            if not reload_all and _is_file_already_imported(
+                category, path.name, file_hash
+            ):
                 logger.info(
                     "[%s] SKIP %s (ya importado, hash: %s...)",
                     category,
                     path.name,
                     file_hash[:8],
                 )
-                skipped_count += 1
+                # La tabla ya existe con sus columnas: no hace falta abrir el archivo
+                result.skipped += 1
                 continue
 
             logger.info("[%s] Importando %s...", category, path.name)
-            df = read_excel_with_header(path)
-            if df is not None and not df.empty:
+            with open_source_stream(path, file_hash) as (stream, from_staging):
+                if stream is None:
+                    logger.warning("[%s] Sin datos válidos en %s", category, path.name)
+                    continue
+                column_lists.append(stream.columns)
+                create_empty_table(category, build_unified_schema(column_lists))
+
                 existing_cols = set(get_column_names(PG_SCHEMA_RAW, category))
                 with managed_connection(schema=PG_SCHEMA_RAW) as conn:
                     with conn.cursor() as cur:
-                        new_cols = [c for c in df.columns if c not in existing_cols]
+                        new_cols = [c for c in stream.columns if c not in existing_cols]
                         for col in new_cols:
                             cur.execute(
                                 f'ALTER TABLE "{category}" ADD COLUMN "{col}" TEXT'
                             )
-                    _bulk_insert_copy(conn, category, df)
-                _register_imported_file(category, path.name, file_hash, len(df))
-                imported_count += 1
-                logger.info(
-                    "[%s] %d filas importadas de %s", category, len(df), path.name
-                )
-            else:
-                logger.warning("[%s] Sin datos válidos en %s", category, path.name)
+                    with conn.cursor() as cur:
+                        copied = copy_rows(cur, category, stream.columns, stream.rows)
+                        record = ImportRecord(
+                            category,
+                            path.name,
+                            file_hash,
+                            copied.rows,
+                            stream.sheet_name,
+                            stream.header_row,
+                            round(copied.source_time_s, 3),
+                        )
+                        # Misma transacción que el COPY: un fallo posterior no
+                        # deja filas cargadas sin registrar
+                        _register_import(cur, record)
+
+            logger.info(
+                "[%s] %s leído en %.2f s desde %s (hoja '%s', header fila %d)",
+                category,
+                path.name,
+                copied.source_time_s,
+                "caché Parquet" if from_staging else "Excel",
+                stream.sheet_name,
+                stream.header_row,
+            )
+            result.imported.append(record)
+            logger.info(
+                "[%s] %d filas importadas de %s", category, copied.rows, path.name
+            )
+
+        schema = build_unified_schema(column_lists)
+        create_empty_table(
+            category, schema or FALLBACK_SCHEMAS.get(category, ["ano", "semestre"])
+        )
 
-        if skipped_count > 0:
+        if result.skipped > 0:
             logger.info(
                 "[%s] Resumen: %d importados, %d omitidos (ya existían)",
                 category,
-                imported_count,
-                skipped_count,
+                len(result.imported),
+                result.skipped,
             )
     else:
         logger.info(
@@ -350,8 +531,62 @@ def process_category(category: str):
     logger.info(
         "[%s] Tabla lista: %d filas, %d columnas", category, row_count, col_count
     )
+    result.elapsed_s = time.perf_counter() - start
+    return result
+
+def _process_category_worker(category: str) -> CategoryResult:
+    try:
+        return process_category(category)
+    finally:
+        close_pool()
+
+def _load_categories_parallel(workers: int) -> list[CategoryResult]:
+    results: list[CategoryResult] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            category: executor.submit(_process_category_worker, category)
+            for category in SNIES_CATEGORIES
+        }
+        for category in SNIES_CATEGORIES:
+            try:
+                result = futures[category].result()
+            except Exception as exc:
+                logger.error("[%s] Carga fallida: %s", category, exc)
+                results.append(CategoryResult(category, error=str(exc)))
+                continue
+            results.append(result)
+    return results
 
-def create_db():
+def _log_timing_table(results: list[CategoryResult], wall_clock_s: float) -> None:
+    logger.info("-" * 60)
+    logger.info(
+        "  %-28s %8s %8s %10s %9s",
+        "categoria",
+        "archivos",
+        "filas",
+        "parseo(s)",
+        "total(s)",
+    )
+    for r in results:
+        if r.error:
+            logger.info("  %-28s ERROR: %s", r.category, r.error)
+            continue
+        logger.info(
+            "  %-28s %8d %8d %10.2f %9.2f",
+            r.category,
+            len(r.imported),
+            r.rows_imported,
+            r.parse_time_s,
+            r.elapsed_s,
+        )
+    serial_s = sum(r.elapsed_s for r in results)
+    logger.info(
+        "  Tiempo de pared: %.2f s | suma por categoría: %.2f s",
+        wall_clock_s,
+        serial_s,
+    )
+
+def create_db(workers: int = RAW_LOAD_WORKERS):
     logger.info("=" * 60)
     logger.info("Cargando tablas en PostgreSQL (schema: %s)", PG_SCHEMA_RAW)
     logger.info("=" * 60)
@@ -377,8 +612,13 @@ def create_db():
         else:
             logger.info("Tabla '%s' no existe — se creará", table_name)
 
-    for category in SNIES_CATEGORIES:
-        process_category(category)
+    start = time.perf_counter()
+    if workers > 1:
+        logger.info("Carga paralela con %d procesos", workers)
+        results = _load_categories_parallel(workers)
+    else:
+        results = [process_category(category) for category in SNIES_CATEGORIES]
+    wall_clock_s = time.perf_counter() - start
 
     logger.info("=" * 60)
     logger.info("Resumen final")
@@ -388,11 +628,28 @@ def create_db():
         col_count = len(get_column_names(PG_SCHEMA_RAW, category))
         status = f"{row_count:>8} filas" if row_count > 0 else "    vacía"
         logger.info("  %-30s %s | %d cols", category, status, col_count)
+    _log_timing_table(results, wall_clock_s)
+
+    failed = [r.category for r in results if r.error]
+    if failed:
+        raise RuntimeError(f"Categorías con error en la carga: {failed}")
 
     logger.info("Carga completada en schema '%s'", PG_SCHEMA_RAW)
 
 def main():
-    create_db()
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Carga los Excel SNIES en PostgreSQL (schema raw)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=RAW_LOAD_WORKERS,
+        help="Procesos para cargar categorías en paralelo (default: %(default)s).",
+    )
+    args = parser.parse_args()
+    create_db(workers=args.workers)
 
 if __name__ == "__main__":
     main()
@@ -1,23 +1,26 @@
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pandas as pd
-from psycopg2.extras import execute_values
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from config.globals import PG_SCHEMA_UNIFIED, PG_SCHEMA_FACTS
+from scripts.create_indexes import build_indexes_after_load
 from utils.db import (
+    copy_rows,
     get_column_names,
-    get_engine,
     get_row_count as db_get_row_count,
     managed_connection,
 )
 from utils.logger import logger
 from utils.schema_helpers import (
     safe_int,
+    safe_int_series,
     safe_str,
+    safe_str_series,
     unified_table_exists,
 )
 
@@ -127,6 +130,17 @@ CREATE TABLE IF NOT EXISTS dim_dedicacion_docente (
 )
 """
 
+# Llave natural de cada dimensión (columnas de su índice único uq_dim_*)
+DIMENSION_KEYS: dict[str, list[str]] = {
+    "dim_institucion": ["codigo_ies"],
+    "dim_geografia": ["codigo_municipio"],
+    "dim_programa": ["codigo_snies_programa"],
+    "dim_tiempo": ["ano", "semestre"],
+    "dim_sexo": ["id_sexo"],
+    "dim_nivel_formacion_docente": ["id_nivel_formacion_docente"],
+    "dim_dedicacion_docente": ["id_tiempo_dedicacion", "id_tipo_contrato"],
+}
+
 INDEXES = {
     "dim_institucion": [
         "CREATE UNIQUE INDEX IF NOT EXISTS uq_dim_institucion_codigo ON dim_institucion (codigo_ies)",
@@ -201,92 +215,272 @@ CONTRATO_CANONICAL: dict[str, str] = {
 }
 
 
-def normalize_text(value: object) -> str | None:
-    text = safe_str(value)
-    if text is None:
-        return None
-    if text.isupper():
-        return text.title()
-    return text
+def normalize_text_series(values: pd.Series) -> pd.Series:
+    text = safe_str_series(values)
+    upper = text.str.isupper().fillna(False).astype(bool)
+    return text.where(~upper, text.str.title())
+
+
+# Proyección de cada dimensión sobre las tablas unificadas: alias -> columnas
+# candidatas. El primer alias es la llave natural; su columna debe ser
+# exclusiva de la dimensión para identificar el grouping set con GROUPING().
+DIMENSION_SOURCES: dict[str, dict] = {
+    "institucion": {
+        "tables": ALL_UNIFIED_TABLES,
+        "columns": {
+            "codigo_ies": ["codigo_de_la_institucion"],
+            "codigo_ies_padre": ["ies_padre"],
+            "nombre_ies": ["institucion_de_educacion_superior_ies"],
+            "principal_o_seccional": ["principal_o_seccional"],
+            "id_sector_ies": ["id_sector_ies"],
+            "sector_ies": ["sector_ies"],
+            "id_caracter": ["id_caracter", "id_caracter_ies"],
+            "caracter_ies": ["caracter_ies"],
+        },
+    },
+    "geografia_ies": {
+        "tables": ALL_UNIFIED_TABLES,
+        "columns": {
+            "codigo_municipio": ["codigo_del_municipio_ies", "codigo_del_municipio"],
+            "codigo_departamento": ["codigo_del_departamento_ies"],
+            "nombre_departamento": ["departamento_de_domicilio_de_la_ies"],
+            "nombre_municipio": ["municipio_de_domicilio_de_la_ies"],
+        },
+    },
+    "geografia_programa": {
+        "tables": STUDENT_TABLES,
+        "columns": {
+            "codigo_municipio": ["codigo_del_municipio_programa"],
+            "codigo_departamento": ["codigo_del_departamento_programa"],
+            "nombre_departamento": ["departamento_de_oferta_del_programa"],
+            "nombre_municipio": ["municipio_de_oferta_del_programa"],
+        },
+        "required": ["codigo_departamento"],
+    },
+    "programa": {
+        "tables": STUDENT_TABLES,
+        "columns": {
+            "codigo_snies_programa": ["codigo_snies_del_programa"],
+            "nombre_programa": ["programa_academico"],
+            "id_nivel_academico": ["id_nivel_academico"],
+            "nivel_academico": ["nivel_academico"],
+            "id_nivel_formacion": ["id_nivel_de_formacion"],
+            "nivel_formacion": ["nivel_de_formacion"],
+            "id_metodologia": ["id_metodologia"],
+            "metodologia": ["metodologia"],
+            "id_area": ["id_area"],
+            "area_conocimiento": ["area_de_conocimiento"],
+            "id_nucleo": ["id_nucleo"],
+            "nucleo_basico": ["nucleo_basico_del_conocimiento_nbc"],
+        },
+    },
+    "tiempo": {
+        "tables": ALL_UNIFIED_TABLES,
+        "columns": {"ano": ["ano"], "semestre": ["semestre"]},
+    },
+    "sexo": {
+        "tables": ALL_UNIFIED_TABLES,
+        "columns": {
+            "id_sexo": ["id_sexo"],
+            "sexo": ["sexo", "sexo_del_docente"],
+        },
+        "required": ["sexo"],
+    },
+    "nivel_formacion_docente": {
+        "tables": ["docentes_unified"],
+        "columns": {
+            "id_nivel_formacion_docente": ["id_maximo_nivel_de_formacion_del_docente"],
+            "nivel_formacion_docente": ["maximo_nivel_de_formacion_del_docente"],
+        },
+    },
+    "dedicacion_docente": {
+        "tables": ["docentes_unified"],
+        "columns": {
+            "id_tiempo_dedicacion": ["id_tiempo_de_dedicacion"],
+            "tiempo_dedicacion": ["tiempo_de_dedicacion_del_docente"],
+            "id_tipo_contrato": ["id_tipo_de_contrato"],
+            "tipo_contrato": ["tipo_de_contrato_del_docente", "tipo_de_contrato"],
+        },
+    },
+}
 
 
-def read_table(table_name: str) -> pd.DataFrame:
-    engine = get_engine(schema=PG_SCHEMA_UNIFIED)
-    return pd.read_sql_query(f'SELECT * FROM "{table_name}"', engine)
+def _resolve_projection(
+    columns: dict[str, list[str]], available: set[str]
+) -> dict[str, str | None]:
+    return {
+        alias: next((c for c in candidates if c in available), None)
+        for alias, candidates in columns.items()
+    }
 
 
-def get_col(df: pd.DataFrame, *candidates: str) -> pd.Series:
-    for col in candidates:
-        if col in df.columns:
-            return df[col]
-    return pd.Series([None] * len(df), name=candidates[0])
+def _scan_distinct(
+    table_name: str, projections: dict[str, dict[str, str | None]]
+) -> dict[str, pd.DataFrame]:
+    # Un grouping set por dimensión; GROUPING() de la llave asigna cada fila
+    names = list(projections)
+    keys = [next(iter(projections[n].values())) for n in names]
+    source_cols = list(
+        dict.fromkeys(c for p in projections.values() for c in p.values() if c)
+    )
+    grouping_sets = ", ".join(
+        "(" + ", ".join(f'"{c}"' for c in dict.fromkeys(p.values()) if c) + ")"
+        for p in projections.values()
+    )
+    key_list = ", ".join(f'"{k}"' for k in keys)
+    select_list = ", ".join(f'"{c}"' for c in source_cols)
+    query = (
+        f"SELECT GROUPING({key_list}) AS _grouping, {select_list} "
+        f'FROM "{table_name}" '
+        f"GROUP BY GROUPING SETS ({grouping_sets})"
+    )
 
+    with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            rows = cur.fetchall()
 
-def _sanitize_val(v: object) -> object:
-    """Convierte float NaN/Inf a None para que psycopg2 envíe NULL."""
-    if isinstance(v, float) and (v != v or v == float("inf") or v == float("-inf")):
-        return None
-    return v
+    raw = pd.DataFrame(rows, columns=["_grouping", *source_cols])
+    all_bits = (1 << len(keys)) - 1
+    frames: dict[str, pd.DataFrame] = {}
+    for i, name in enumerate(names):
+        part = raw[raw["_grouping"] == all_bits ^ (1 << (len(keys) - 1 - i))]
+        frames[name] = pd.DataFrame(
+            {
+                alias: part[col].to_numpy() if col else [None] * len(part)
+                for alias, col in projections[name].items()
+            }
+        )
+    return frames
+
+
+def extract_dimension_sources() -> dict[str, list[pd.DataFrame]]:
+    """Valores distintos de cada dimensión, leyendo cada tabla unificada una vez."""
+    sources: dict[str, list[pd.DataFrame]] = {name: [] for name in DIMENSION_SOURCES}
+
+    for table_name in ALL_UNIFIED_TABLES:
+        if not unified_table_exists(table_name):
+            logger.warning("[dimensiones] Tabla %s no encontrada, saltando", table_name)
+            continue
+
+        available = set(get_column_names(PG_SCHEMA_UNIFIED, table_name))
+        projections: dict[str, dict[str, str | None]] = {}
+        for name, spec in DIMENSION_SOURCES.items():
+            if table_name not in spec["tables"]:
+                continue
+            resolved = _resolve_projection(spec["columns"], available)
+            required = [next(iter(resolved)), *spec.get("required", [])]
+            if any(resolved[alias] is None for alias in required):
+                continue
+            projections[name] = resolved
+
+        if not projections:
+            continue
+
+        start = time.perf_counter()
+        for name, df in _scan_distinct(table_name, projections).items():
+            sources[name].append(df)
+        logger.info(
+            "[dimensiones] %s: %d proyecciones en un recorrido (%.2fs)",
+            table_name,
+            len(projections),
+            time.perf_counter() - start,
+        )
+
+    return sources
 
 
 def _bulk_insert(cur, table_name: str, columns: list[str], df: pd.DataFrame) -> None:
     if df.empty:
         return
-    values = [
-        tuple(_sanitize_val(v) for v in row)
-        for row in df[columns].itertuples(index=False, name=None)
-    ]
-    cols_str = ", ".join(columns)
-    template = f"({', '.join(['%s'] * len(columns))})"
-    execute_values(
-        cur,
-        f'INSERT INTO "{table_name}" ({cols_str}) VALUES %s',
-        values,
-        template=template,
-        page_size=1000,
-    )
+    copy_rows(cur, table_name, columns, df)
 
 
-def _ensure_table_and_truncate(cur, table_name: str, ddl: str) -> None:
+def _upsert_dimension(
+    cur, table_name: str, ddl: str, columns: list[str], df: pd.DataFrame
+) -> None:
+    # SCD tipo 1 sobre la llave natural: los ids existentes no cambian y las
+    # filas que ya no vienen en la fuente se conservan (hechos las referencian)
     cur.execute(ddl)
-    cur.execute(f'TRUNCATE TABLE "{table_name}" RESTART IDENTITY CASCADE')
+    _create_indexes(cur, table_name, unique=True)
+    if df.empty:
+        return
+
+    key = DIMENSION_KEYS[table_name]
+    attrs = [c for c in columns if c not in key and c != "created_at"]
+    compared = [c for c in attrs if c != "updated_at"]
+    stage = f"_stage_{table_name}"
+    col_list = ", ".join(f'"{c}"' for c in columns)
+
+    cur.execute(
+        f'CREATE TEMP TABLE "{stage}" ON COMMIT DROP AS '
+        f'SELECT {col_list} FROM "{table_name}" WITH NO DATA'
+    )
+    _bulk_insert(cur, stage, columns, df)
+    cur.execute(
+        f"""
+        WITH upserted AS (
+            INSERT INTO "{table_name}" AS d ({col_list})
+            SELECT {col_list} FROM "{stage}"
+            ON CONFLICT ({", ".join(f'"{c}"' for c in key)}) DO UPDATE SET
+                {", ".join(f'"{c}" = EXCLUDED."{c}"' for c in attrs)}
+            WHERE ({", ".join(f'd."{c}"' for c in compared)})
+                IS DISTINCT FROM ({", ".join(f'EXCLUDED."{c}"' for c in compared)})
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE inserted),
+            COUNT(*) FILTER (WHERE NOT inserted)
+        FROM upserted
+        """
+    )
+    inserted, updated = cur.fetchone()
+    logger.info(
+        "[%s] Upsert: %d nuevas, %d actualizadas, %d sin cambios",
+        table_name,
+        inserted,
+        updated,
+        len(df) - inserted - updated,
+    )
+
 
+def _is_unique_index(idx_sql: str) -> bool:
+    return idx_sql.startswith("CREATE UNIQUE INDEX")
 
-def _create_indexes(cur, table_name: str) -> None:
+
+def _create_indexes(cur, table_name: str, unique: bool) -> None:
+    # Los únicos son la llave natural del ON CONFLICT y deben existir antes del
+    # upsert; los secundarios se construyen después de cargar todas las tablas
     for idx_sql in INDEXES.get(table_name, []):
-        cur.execute(idx_sql)
+        if _is_unique_index(idx_sql) == unique:
+            cur.execute(idx_sql)
 
 
-def create_dim_institucion() -> int:
-    logger.info("[dim_institucion] Extrayendo instituciones unicas...")
+def secondary_indexes_by_table(tables: list[str]) -> dict[str, list[str]]:
+    return {
+        table: [sql for sql in INDEXES.get(table, []) if not _is_unique_index(sql)]
+        for table in tables
+    }
 
-    frames: list[pd.DataFrame] = []
 
-    for table_name in ALL_UNIFIED_TABLES:
-        if not unified_table_exists(table_name):
-            logger.warning(
-                "[dim_institucion] Tabla %s no encontrada, saltando", table_name
-            )
-            continue
+def create_dim_institucion(sources: list[pd.DataFrame]) -> int:
+    logger.info("[dim_institucion] Extrayendo instituciones unicas...")
 
-        df = read_table(table_name)
+    frames: list[pd.DataFrame] = []
 
+    for df in sources:
         chunk = pd.DataFrame(
             {
-                "codigo_ies": get_col(df, "codigo_de_la_institucion").apply(safe_int),
-                "codigo_ies_padre": get_col(df, "ies_padre").apply(safe_int),
-                "nombre_ies": get_col(
-                    df, "institucion_de_educacion_superior_ies"
-                ).apply(normalize_text),
-                "principal_o_seccional": get_col(df, "principal_o_seccional").apply(
-                    normalize_text
+                "codigo_ies": safe_int_series(df["codigo_ies"]),
+                "codigo_ies_padre": safe_int_series(df["codigo_ies_padre"]),
+                "nombre_ies": normalize_text_series(df["nombre_ies"]),
+                "principal_o_seccional": normalize_text_series(
+                    df["principal_o_seccional"]
                 ),
-                "id_sector_ies": get_col(df, "id_sector_ies").apply(safe_int),
-                "sector_ies": get_col(df, "sector_ies").apply(normalize_text),
-                "id_caracter": get_col(df, "id_caracter", "id_caracter_ies").apply(
-                    safe_int
-                ),
-                "caracter_ies": get_col(df, "caracter_ies").apply(normalize_text),
+                "id_sector_ies": safe_int_series(df["id_sector_ies"]),
+                "sector_ies": normalize_text_series(df["sector_ies"]),
+                "id_caracter": safe_int_series(df["id_caracter"]),
+                "caracter_ies": normalize_text_series(df["caracter_ies"]),
             }
         )
 
@@ -321,73 +515,33 @@ def create_dim_institucion() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(cur, "dim_institucion", DDL_DIM_INSTITUCION)
-            _bulk_insert(cur, "dim_institucion", insert_cols, dim)
-            _create_indexes(cur, "dim_institucion")
+            _upsert_dimension(
+                cur, "dim_institucion", DDL_DIM_INSTITUCION, insert_cols, dim
+            )
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_institucion")
     logger.info("[dim_institucion] Tabla creada: %d instituciones unicas", row_count)
     return row_count
 
 
-def create_dim_geografia() -> int:
+def create_dim_geografia(sources: list[pd.DataFrame]) -> int:
     logger.info("[dim_geografia] Extrayendo ubicaciones geograficas unicas...")
 
     frames: list[pd.DataFrame] = []
 
-    for table_name in ALL_UNIFIED_TABLES:
-        if not unified_table_exists(table_name):
-            continue
-
-        df = read_table(table_name)
-
-        geo_ies = pd.DataFrame(
+    for df in sources:
+        geo = pd.DataFrame(
             {
-                "codigo_departamento": get_col(df, "codigo_del_departamento_ies").apply(
-                    safe_int
-                ),
-                "nombre_departamento": get_col(
-                    df, "departamento_de_domicilio_de_la_ies"
-                ).apply(normalize_text),
-                "codigo_municipio": get_col(
-                    df, "codigo_del_municipio_ies", "codigo_del_municipio"
-                ).apply(safe_int),
-                "nombre_municipio": get_col(
-                    df, "municipio_de_domicilio_de_la_ies"
-                ).apply(normalize_text),
+                "codigo_departamento": safe_int_series(df["codigo_departamento"]),
+                "nombre_departamento": normalize_text_series(df["nombre_departamento"]),
+                "codigo_municipio": safe_int_series(df["codigo_municipio"]),
+                "nombre_municipio": normalize_text_series(df["nombre_municipio"]),
             }
         )
-        geo_ies = geo_ies.dropna(
+        geo = geo.dropna(
             subset=["codigo_municipio", "nombre_departamento", "nombre_municipio"]
         )
-        frames.append(geo_ies)
-
-        if table_name in STUDENT_TABLES:
-            if "codigo_del_departamento_programa" in df.columns:
-                geo_prog = pd.DataFrame(
-                    {
-                        "codigo_departamento": get_col(
-                            df, "codigo_del_departamento_programa"
-                        ).apply(safe_int),
-                        "nombre_departamento": get_col(
-                            df, "departamento_de_oferta_del_programa"
-                        ).apply(normalize_text),
-                        "codigo_municipio": get_col(
-                            df, "codigo_del_municipio_programa"
-                        ).apply(safe_int),
-                        "nombre_municipio": get_col(
-                            df, "municipio_de_oferta_del_programa"
-                        ).apply(normalize_text),
-                    }
-                )
-                geo_prog = geo_prog.dropna(
-                    subset=[
-                        "codigo_municipio",
-                        "nombre_departamento",
-                        "nombre_municipio",
-                    ]
-                )
-                frames.append(geo_prog)
+        frames.append(geo)
 
     if not frames:
         logger.error("[dim_geografia] Sin datos geograficos")
@@ -413,59 +567,33 @@ def create_dim_geografia() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(cur, "dim_geografia", DDL_DIM_GEOGRAFIA)
-            _bulk_insert(cur, "dim_geografia", insert_cols, dim)
-            _create_indexes(cur, "dim_geografia")
+            _upsert_dimension(cur, "dim_geografia", DDL_DIM_GEOGRAFIA, insert_cols, dim)
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_geografia")
     logger.info("[dim_geografia] Tabla creada: %d municipios unicos", row_count)
     return row_count
 
 
-def create_dim_programa() -> int:
+def create_dim_programa(sources: list[pd.DataFrame]) -> int:
     logger.info("[dim_programa] Extrayendo programas academicos unicos...")
 
     frames: list[pd.DataFrame] = []
 
-    for table_name in STUDENT_TABLES:
-        if not unified_table_exists(table_name):
-            continue
-
-        df = read_table(table_name)
-
-        if "codigo_snies_del_programa" not in df.columns:
-            logger.warning(
-                "[dim_programa] Tabla %s sin columna codigo_snies_del_programa",
-                table_name,
-            )
-            continue
-
+    for df in sources:
         chunk = pd.DataFrame(
             {
-                "codigo_snies_programa": get_col(df, "codigo_snies_del_programa").apply(
-                    safe_int
-                ),
-                "nombre_programa": get_col(df, "programa_academico").apply(
-                    normalize_text
-                ),
-                "id_nivel_academico": get_col(df, "id_nivel_academico").apply(safe_int),
-                "nivel_academico": get_col(df, "nivel_academico").apply(normalize_text),
-                "id_nivel_formacion": get_col(df, "id_nivel_de_formacion").apply(
-                    safe_int
-                ),
-                "nivel_formacion": get_col(df, "nivel_de_formacion").apply(
-                    normalize_text
-                ),
-                "id_metodologia": get_col(df, "id_metodologia").apply(safe_int),
-                "metodologia": get_col(df, "metodologia").apply(normalize_text),
-                "id_area": get_col(df, "id_area").apply(safe_int),
-                "area_conocimiento": get_col(df, "area_de_conocimiento").apply(
-                    normalize_text
-                ),
-                "id_nucleo": get_col(df, "id_nucleo").apply(safe_int),
-                "nucleo_basico": get_col(
-                    df, "nucleo_basico_del_conocimiento_nbc"
-                ).apply(normalize_text),
+                "codigo_snies_programa": safe_int_series(df["codigo_snies_programa"]),
+                "nombre_programa": normalize_text_series(df["nombre_programa"]),
+                "id_nivel_academico": safe_int_series(df["id_nivel_academico"]),
+                "nivel_academico": normalize_text_series(df["nivel_academico"]),
+                "id_nivel_formacion": safe_int_series(df["id_nivel_formacion"]),
+                "nivel_formacion": normalize_text_series(df["nivel_formacion"]),
+                "id_metodologia": safe_int_series(df["id_metodologia"]),
+                "metodologia": normalize_text_series(df["metodologia"]),
+                "id_area": safe_int_series(df["id_area"]),
+                "area_conocimiento": normalize_text_series(df["area_conocimiento"]),
+                "id_nucleo": safe_int_series(df["id_nucleo"]),
+                "nucleo_basico": normalize_text_series(df["nucleo_basico"]),
             }
         )
 
@@ -506,38 +634,22 @@ def create_dim_programa() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(cur, "dim_programa", DDL_DIM_PROGRAMA)
-            _bulk_insert(cur, "dim_programa", insert_cols, dim)
-            _create_indexes(cur, "dim_programa")
+            _upsert_dimension(cur, "dim_programa", DDL_DIM_PROGRAMA, insert_cols, dim)
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_programa")
     logger.info("[dim_programa] Tabla creada: %d programas unicos", row_count)
     return row_count
 
 
-def create_dim_tiempo() -> int:
+def create_dim_tiempo(sources: list[pd.DataFrame]) -> int:
     logger.info("[dim_tiempo] Extrayendo periodos temporales unicos...")
 
     periods: set[tuple[int, int]] = set()
 
-    for table_name in ALL_UNIFIED_TABLES:
-        if not unified_table_exists(table_name):
-            continue
-
-        try:
-            with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        f'SELECT DISTINCT ano, semestre FROM "{table_name}" '
-                        "WHERE ano IS NOT NULL AND semestre IS NOT NULL"
-                    )
-                    rows = cur.fetchall()
-        except Exception:
-            continue
-
-        for row in rows:
-            ano = safe_int(row[0])
-            semestre = safe_int(row[1])
+    for df in sources:
+        for ano_raw, semestre_raw in zip(df["ano"], df["semestre"]):
+            ano = safe_int(ano_raw)
+            semestre = safe_int(semestre_raw)
             if ano is not None and semestre is not None and semestre in (1, 2):
                 periods.add((ano, semestre))
 
@@ -564,49 +676,22 @@ def create_dim_tiempo() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(cur, "dim_tiempo", DDL_DIM_TIEMPO)
-            _bulk_insert(cur, "dim_tiempo", insert_cols, dim)
-            _create_indexes(cur, "dim_tiempo")
+            _upsert_dimension(cur, "dim_tiempo", DDL_DIM_TIEMPO, insert_cols, dim)
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_tiempo")
     logger.info("[dim_tiempo] Tabla creada: %d periodos unicos", row_count)
     return row_count
 
 
-def create_dim_sexo() -> int:
+def create_dim_sexo(sources: list[pd.DataFrame]) -> int:
     logger.info("[dim_sexo] Extrayendo valores de sexo unicos...")
 
     id_sexo_map: dict[int, str] = {}
 
-    for table_name in ALL_UNIFIED_TABLES:
-        if not unified_table_exists(table_name):
-            continue
-
-        col_names = set(get_column_names(PG_SCHEMA_UNIFIED, table_name))
-
-        id_col_name = "id_sexo" if "id_sexo" in col_names else None
-        sexo_col_name = None
-        for candidate in ("sexo", "sexo_del_docente"):
-            if candidate in col_names:
-                sexo_col_name = candidate
-                break
-
-        if id_col_name is None or sexo_col_name is None:
-            continue
-
-        with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    f'SELECT DISTINCT "{id_col_name}", "{sexo_col_name}" '
-                    f'FROM "{table_name}" '
-                    f'WHERE "{id_col_name}" IS NOT NULL '
-                    f'AND "{sexo_col_name}" IS NOT NULL'
-                )
-                rows = cur.fetchall()
-
-        for row in rows:
-            id_s = safe_int(row[0])
-            sexo_raw = safe_str(row[1])
+    for df in sources:
+        for id_raw, sexo_value in zip(df["id_sexo"], df["sexo"]):
+            id_s = safe_int(id_raw)
+            sexo_raw = safe_str(sexo_value)
             if id_s is None or sexo_raw is None:
                 continue
 
@@ -635,44 +720,32 @@ def create_dim_sexo() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(cur, "dim_sexo", DDL_DIM_SEXO)
-            _bulk_insert(cur, "dim_sexo", insert_cols, dim)
-            _create_indexes(cur, "dim_sexo")
+            _upsert_dimension(cur, "dim_sexo", DDL_DIM_SEXO, insert_cols, dim)
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_sexo")
     logger.info("[dim_sexo] Tabla creada: %d valores de sexo", row_count)
     return row_count
 
 
-def create_dim_nivel_formacion_docente() -> int:
+def create_dim_nivel_formacion_docente(sources: list[pd.DataFrame]) -> int:
     logger.info("[dim_nivel_formacion_docente] Extrayendo niveles de formacion...")
 
-    table_name = "docentes_unified"
-    if not unified_table_exists(table_name):
-        logger.error("[dim_nivel_formacion_docente] Tabla %s no encontrada", table_name)
-        return 0
-
-    with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                f"SELECT DISTINCT id_maximo_nivel_de_formacion_del_docente, "
-                f'maximo_nivel_de_formacion_del_docente FROM "{table_name}" '
-                f"WHERE id_maximo_nivel_de_formacion_del_docente IS NOT NULL "
-                f"AND maximo_nivel_de_formacion_del_docente IS NOT NULL"
-            )
-            rows = cur.fetchall()
-
     id_nivel_map: dict[int, str] = {}
-    for row in rows:
-        id_n = safe_int(row[0])
-        nivel_raw = safe_str(row[1])
-        if id_n is None or nivel_raw is None:
-            continue
+    for df in sources:
+        for id_raw, nivel_value in zip(
+            df["id_nivel_formacion_docente"], df["nivel_formacion_docente"]
+        ):
+            id_n = safe_int(id_raw)
+            nivel_raw = safe_str(nivel_value)
+            if id_n is None or nivel_raw is None:
+                continue
 
-        nivel_normalized = NIVEL_FORMACION_CANONICAL.get(nivel_raw.lower(), nivel_raw)
+            nivel_normalized = NIVEL_FORMACION_CANONICAL.get(
+                nivel_raw.lower(), nivel_raw
+            )
 
-        if id_n not in id_nivel_map:
-            id_nivel_map[id_n] = nivel_normalized
+            if id_n not in id_nivel_map:
+                id_nivel_map[id_n] = nivel_normalized
 
     if not id_nivel_map:
         logger.error("[dim_nivel_formacion_docente] Sin datos de niveles de formacion")
@@ -699,64 +772,50 @@ def create_dim_nivel_formacion_docente() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(
-                cur, "dim_nivel_formacion_docente", DDL_DIM_NIVEL_FORMACION_DOCENTE
+            _upsert_dimension(
+                cur,
+                "dim_nivel_formacion_docente",
+                DDL_DIM_NIVEL_FORMACION_DOCENTE,
+                insert_cols,
+                dim,
             )
-            _bulk_insert(cur, "dim_nivel_formacion_docente", insert_cols, dim)
-            _create_indexes(cur, "dim_nivel_formacion_docente")
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_nivel_formacion_docente")
     logger.info("[dim_nivel_formacion_docente] Tabla creada: %d niveles", row_count)
     return row_count
 
 
-def create_dim_dedicacion_docente() -> int:
+def create_dim_dedicacion_docente(sources: list[pd.DataFrame]) -> int:
     logger.info("[dim_dedicacion_docente] Extrayendo dedicaciones unicas...")
 
-    table_name = "docentes_unified"
-    if not unified_table_exists(table_name):
-        logger.error("[dim_dedicacion_docente] Tabla %s no encontrada", table_name)
-        return 0
-
-    col_names = set(get_column_names(PG_SCHEMA_UNIFIED, table_name))
-    con_col_name = (
-        "tipo_de_contrato_del_docente"
-        if "tipo_de_contrato_del_docente" in col_names
-        else "tipo_de_contrato"
-    )
-
-    with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                f"SELECT DISTINCT id_tiempo_de_dedicacion, "
-                f"tiempo_de_dedicacion_del_docente, "
-                f'id_tipo_de_contrato, "{con_col_name}" '
-                f'FROM "{table_name}" '
-                f"WHERE id_tiempo_de_dedicacion IS NOT NULL "
-                f"AND id_tipo_de_contrato IS NOT NULL"
-            )
-            rows = cur.fetchall()
-
     combos: dict[tuple[int, int], tuple[str, str]] = {}
-    for row in rows:
-        id_d = safe_int(row[0])
-        ded_raw = safe_str(row[1])
-        id_c = safe_int(row[2])
-        con_raw = safe_str(row[3])
-
-        if id_d is None or id_c is None:
-            continue
+    for df in sources:
+        for row in df[
+            [
+                "id_tiempo_dedicacion",
+                "tiempo_dedicacion",
+                "id_tipo_contrato",
+                "tipo_contrato",
+            ]
+        ].itertuples(index=False):
+            id_d = safe_int(row[0])
+            ded_raw = safe_str(row[1])
+            id_c = safe_int(row[2])
+            con_raw = safe_str(row[3])
+
+            if id_d is None or id_c is None:
+                continue
 
-        ded_normalized = DEDICACION_CANONICAL.get(
-            ded_raw.lower() if ded_raw else "", ded_raw or "Sin informacion"
-        )
-        con_normalized = CONTRATO_CANONICAL.get(
-            con_raw.lower() if con_raw else "", con_raw or "Sin informacion"
-        )
+            ded_normalized = DEDICACION_CANONICAL.get(
+                ded_raw.lower() if ded_raw else "", ded_raw or "Sin informacion"
+            )
+            con_normalized = CONTRATO_CANONICAL.get(
+                con_raw.lower() if con_raw else "", con_raw or "Sin informacion"
+            )
 
-        key = (id_d, id_c)
-        if key not in combos:
-            combos[key] = (ded_normalized, con_normalized)
+            key = (id_d, id_c)
+            if key not in combos:
+                combos[key] = (ded_normalized, con_normalized)
 
     if not combos:
         logger.error("[dim_dedicacion_docente] Sin datos de dedicacion")
@@ -787,11 +846,13 @@ def create_dim_dedicacion_docente() -> int:
 
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            _ensure_table_and_truncate(
-                cur, "dim_dedicacion_docente", DDL_DIM_DEDICACION_DOCENTE
+            _upsert_dimension(
+                cur,
+                "dim_dedicacion_docente",
+                DDL_DIM_DEDICACION_DOCENTE,
+                insert_cols,
+                dim,
             )
-            _bulk_insert(cur, "dim_dedicacion_docente", insert_cols, dim)
-            _create_indexes(cur, "dim_dedicacion_docente")
 
     row_count = db_get_row_count(PG_SCHEMA_FACTS, "dim_dedicacion_docente")
     logger.info("[dim_dedicacion_docente] Tabla creada: %d combinaciones", row_count)
@@ -805,15 +866,25 @@ def main():
     logger.info("Destino: PostgreSQL schema '%s'", PG_SCHEMA_FACTS)
     logger.info("=" * 60)
 
+    sources = extract_dimension_sources()
+
     results: dict[str, int] = {}
 
-    results["dim_institucion"] = create_dim_institucion()
-    results["dim_geografia"] = create_dim_geografia()
-    results["dim_programa"] = create_dim_programa()
-    results["dim_tiempo"] = create_dim_tiempo()
-    results["dim_sexo"] = create_dim_sexo()
-    results["dim_nivel_formacion_docente"] = create_dim_nivel_formacion_docente()
-    results["dim_dedicacion_docente"] = create_dim_dedicacion_docente()
+    results["dim_institucion"] = create_dim_institucion(sources["institucion"])
+    results["dim_geografia"] = create_dim_geografia(
+        sources["geografia_ies"] + sources["geografia_programa"]
+    )
+    results["dim_programa"] = create_dim_programa(sources["programa"])
+    results["dim_tiempo"] = create_dim_tiempo(sources["tiempo"])
+    results["dim_sexo"] = create_dim_sexo(sources["sexo"])
+    results["dim_nivel_formacion_docente"] = create_dim_nivel_formacion_docente(
+        sources["nivel_formacion_docente"]
+    )
+    results["dim_dedicacion_docente"] = create_dim_dedicacion_docente(
+        sources["dedicacion_docente"]
+    )
+
+    build_indexes_after_load(PG_SCHEMA_FACTS, secondary_indexes_by_table(list(results)))
 
     logger.info("=" * 60)
     logger.info("Resumen de dimensiones creadas")
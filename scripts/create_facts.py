@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import re
 import sys
 import time
 from datetime import datetime, timezone
@@ -7,15 +9,27 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from psycopg2.extras import execute_values
-
-from config.globals import PG_SCHEMA_UNIFIED, PG_SCHEMA_FACTS
-from utils.db import get_column_names, managed_connection
+from config.globals import (
+    FACTS_REFRESH_MODE,
+    INDEX_BUILD_WORKERS,
+    PG_SCHEMA_FACTS,
+    PG_SCHEMA_RAW,
+    PG_SCHEMA_UNIFIED,
+)
+from scripts.create_indexes import IndexDef, build_indexes_after_load
+from utils.db import get_column_names, managed_connection, table_exists
 from utils.logger import logger
-from utils.schema_helpers import safe_int, unified_table_exists
+from utils.schema_helpers import (
+    create_pg_safe_int_function,
+    unified_table_exists,
+)
 
 NOW = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-BATCH_SIZE = 5000
+
+REFRESH_MODES = ("incremental", "full")
+_IMPORT_LOG_TABLE = "_import_log"
+_TRANSFORM_LOG_TABLE = "_transform_log"
+_BUILD_LOG_TABLE = "_fact_build_log"
 
 COLUMN_ALIASES = {
     "codigo_del_municipio_programa": [
@@ -67,34 +81,39 @@ STUDENT_CATEGORIES: dict[str, dict] = {
 
 MUNICIPIO_IES_COLS = ["codigo_del_municipio_ies", "codigo_del_municipio"]
 
+# Particionado por LIST (tipo_evento) y, dentro de cada tipo, por LIST (ano).
+# ano se guarda en la fila (copia de dim_tiempo.ano): los ids seriales de
+# dim_tiempo no garantizan rangos contiguos por año.
 DDL_FACT_ESTUDIANTES = """
 CREATE TABLE IF NOT EXISTS fact_estudiantes (
-    id                      SERIAL PRIMARY KEY,
+    id                      SERIAL,
     tipo_evento             TEXT    NOT NULL
         CHECK (tipo_evento IN (
             'inscritos', 'admitidos', 'matriculados',
             'primer_curso', 'graduados'
         )),
-    institucion_id          INTEGER NOT NULL REFERENCES dim_institucion(id),
-    programa_id             INTEGER NOT NULL REFERENCES dim_programa(id),
-    geografia_ies_id        INTEGER NOT NULL REFERENCES dim_geografia(id),
-    geografia_programa_id   INTEGER NOT NULL REFERENCES dim_geografia(id),
-    sexo_id                 INTEGER NOT NULL REFERENCES dim_sexo(id),
-    tiempo_id               INTEGER NOT NULL REFERENCES dim_tiempo(id),
+    institucion_id          INTEGER NOT NULL,
+    programa_id             INTEGER NOT NULL,
+    geografia_ies_id        INTEGER NOT NULL,
+    geografia_programa_id   INTEGER NOT NULL,
+    sexo_id                 INTEGER NOT NULL,
+    tiempo_id               INTEGER NOT NULL,
+    ano                     INTEGER NOT NULL,
     cantidad                INTEGER NOT NULL DEFAULT 0,
-    created_at              TEXT    NOT NULL
-)
+    created_at              TEXT    NOT NULL,
+    PRIMARY KEY (id, tipo_evento, ano)
+) PARTITION BY LIST (tipo_evento)
 """
 
 DDL_FACT_DOCENTES = """
 CREATE TABLE IF NOT EXISTS fact_docentes (
     id                              SERIAL PRIMARY KEY,
-    institucion_id                  INTEGER NOT NULL REFERENCES dim_institucion(id),
-    geografia_ies_id                INTEGER NOT NULL REFERENCES dim_geografia(id),
-    sexo_id                         INTEGER NOT NULL REFERENCES dim_sexo(id),
-    nivel_formacion_docente_id      INTEGER NOT NULL REFERENCES dim_nivel_formacion_docente(id),
-    dedicacion_docente_id           INTEGER NOT NULL REFERENCES dim_dedicacion_docente(id),
-    tiempo_id                       INTEGER NOT NULL REFERENCES dim_tiempo(id),
+    institucion_id                  INTEGER NOT NULL,
+    geografia_ies_id                INTEGER NOT NULL,
+    sexo_id                         INTEGER NOT NULL,
+    nivel_formacion_docente_id      INTEGER NOT NULL,
+    dedicacion_docente_id           INTEGER NOT NULL,
+    tiempo_id                       INTEGER NOT NULL,
     cantidad_docentes               INTEGER NOT NULL DEFAULT 0,
     created_at                      TEXT    NOT NULL
 )
@@ -103,9 +122,9 @@ CREATE TABLE IF NOT EXISTS fact_docentes (
 DDL_FACT_ADMINISTRATIVOS = """
 CREATE TABLE IF NOT EXISTS fact_administrativos (
     id                      SERIAL PRIMARY KEY,
-    institucion_id          INTEGER NOT NULL REFERENCES dim_institucion(id),
-    geografia_ies_id        INTEGER NOT NULL REFERENCES dim_geografia(id),
-    tiempo_id               INTEGER NOT NULL REFERENCES dim_tiempo(id),
+    institucion_id          INTEGER NOT NULL,
+    geografia_ies_id        INTEGER NOT NULL,
+    tiempo_id               INTEGER NOT NULL,
     auxiliar                INTEGER NOT NULL DEFAULT 0,
     tecnico                 INTEGER NOT NULL DEFAULT 0,
     profesional             INTEGER NOT NULL DEFAULT 0,
@@ -138,100 +157,357 @@ FACT_INDEXES = [
 ]
 
 
-def _insert_batch(cur, insert_sql: str, batch: list[tuple]) -> None:
-    for i in range(0, len(batch), BATCH_SIZE):
-        chunk = batch[i : i + BATCH_SIZE]
-        execute_values(cur, insert_sql, chunk, page_size=BATCH_SIZE)
+FACT_CATEGORIES: dict[str, list[str]] = {
+    "fact_estudiantes": list(STUDENT_CATEGORIES),
+    "fact_docentes": ["docentes"],
+    "fact_administrativos": ["administrativos"],
+}
 
+# (tabla de hechos, columna FK, dimensión, PK); las FKs se crean desde aquí
+# después de la carga (ver ensure_fact_foreign_keys) y también lo usa
+# etl/quality_rules
+FACT_FOREIGN_KEYS: list[tuple[str, str, str, str]] = [
+    ("fact_estudiantes", "institucion_id", "dim_institucion", "id"),
+    ("fact_estudiantes", "programa_id", "dim_programa", "id"),
+    ("fact_estudiantes", "geografia_ies_id", "dim_geografia", "id"),
+    ("fact_estudiantes", "geografia_programa_id", "dim_geografia", "id"),
+    ("fact_estudiantes", "sexo_id", "dim_sexo", "id"),
+    ("fact_estudiantes", "tiempo_id", "dim_tiempo", "id"),
+    ("fact_docentes", "institucion_id", "dim_institucion", "id"),
+    ("fact_docentes", "geografia_ies_id", "dim_geografia", "id"),
+    ("fact_docentes", "sexo_id", "dim_sexo", "id"),
+    (
+        "fact_docentes",
+        "nivel_formacion_docente_id",
+        "dim_nivel_formacion_docente",
+        "id",
+    ),
+    (
+        "fact_docentes",
+        "dedicacion_docente_id",
+        "dim_dedicacion_docente",
+        "id",
+    ),
+    ("fact_docentes", "tiempo_id", "dim_tiempo", "id"),
+    ("fact_administrativos", "institucion_id", "dim_institucion", "id"),
+    ("fact_administrativos", "geografia_ies_id", "dim_geografia", "id"),
+    ("fact_administrativos", "tiempo_id", "dim_tiempo", "id"),
+]
 
-def load_dim_institucion_mapping() -> dict[int, int]:
-    logger.info("[dim_institucion] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT codigo_ies, id FROM dim_institucion")
-            mapping = {row[0]: row[1] for row in cur.fetchall()}
-    logger.info("[dim_institucion] %d entradas en mapping", len(mapping))
-    return mapping
+_FACT_INDEX_RE = re.compile(
+    r"CREATE\s+(UNIQUE\s+)?INDEX\s+IF\s+NOT\s+EXISTS\s+(\w+)\s+ON\s+(\w+)\s*\(([^)]+)\)",
+    re.IGNORECASE,
+)
 
+DDL_BUILD_LOG = f"""
+CREATE TABLE IF NOT EXISTS {_BUILD_LOG_TABLE} (
+    category    TEXT      NOT NULL,
+    ano         INTEGER   NOT NULL,
+    signature   TEXT      NOT NULL,
+    built_at    TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (category, ano)
+)
+"""
 
-def load_dim_geografia_mapping() -> dict[int, int]:
-    logger.info("[dim_geografia] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT codigo_municipio, id FROM dim_geografia")
-            mapping = {row[0]: row[1] for row in cur.fetchall()}
-    logger.info("[dim_geografia] %d entradas en mapping", len(mapping))
-    return mapping
+# Plan de refresco: categoría -> años a reconstruir (None = todos los años)
+RefreshPlan = dict[str, set[int] | None]
+
+
+def _upstream_columns(cur) -> dict[str, str]:
+    # Columnas de cada tabla raw tras transform/normalize. Solo la forma de la
+    # tabla: el conteo de filas cambia con cada importación y no afecta a los
+    # años ya cargados. Las dimensiones no entran: los upserts ON CONFLICT
+    # mantienen estables sus ids.
+    if not table_exists(PG_SCHEMA_RAW, _TRANSFORM_LOG_TABLE):
+        return {}
+    cur.execute(
+        "SELECT table_name, string_agg(stage || ':' || array_to_string(columns, ','), "
+        "'|' ORDER BY stage) "
+        f'FROM {PG_SCHEMA_RAW}."{_TRANSFORM_LOG_TABLE}" GROUP BY 1'
+    )
+    return {r[0]: r[1] for r in cur.fetchall()}
+
+
+def _slice_signatures(
+    import_rows: list[tuple[str, str, str, datetime]], upstream: dict[str, str]
+) -> dict[tuple[str, int], str]:
+    # Firma por (categoría, año): hashes de los archivos del año (sale del
+    # nombre, <categoria>-<año>.xlsx) más las columnas de su tabla raw
+    files: dict[tuple[str, int], list[tuple[str, datetime]]] = {}
+    for category, file_name, file_hash, imported_at in import_rows:
+        match = re.search(r"[0-9]{4}", file_name)
+        if match:
+            key = (category, int(match.group()))
+            files.setdefault(key, []).append((file_hash, imported_at))
+    signatures = {}
+    for (category, ano), entries in files.items():
+        hashes = ",".join(sorted(h for h, _ in entries))
+        latest = max(t for _, t in entries)
+        payload = f"{hashes}|{latest}|{upstream.get(category, '')}"
+        signatures[(category, ano)] = hashlib.md5(payload.encode()).hexdigest()
+    return signatures
+
+
+def _import_signatures(cur) -> dict[tuple[str, int], str]:
+    if not table_exists(PG_SCHEMA_RAW, _IMPORT_LOG_TABLE):
+        return {}
+    cur.execute(
+        "SELECT category, file_name, file_hash, imported_at "
+        f'FROM {PG_SCHEMA_RAW}."{_IMPORT_LOG_TABLE}"'
+    )
+    return _slice_signatures(cur.fetchall(), _upstream_columns(cur))
 
 
-def load_dim_programa_mapping() -> dict[int, int]:
-    logger.info("[dim_programa] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT codigo_snies_programa, id FROM dim_programa")
-            mapping = {row[0]: row[1] for row in cur.fetchall()}
-    logger.info("[dim_programa] %d entradas en mapping", len(mapping))
-    return mapping
+def _built_signatures(cur) -> dict[tuple[str, int], str]:
+    cur.execute(f"SELECT category, ano, signature FROM {_BUILD_LOG_TABLE}")
+    return {(r[0], r[1]): r[2] for r in cur.fetchall()}
 
 
-def load_dim_tiempo_mapping() -> dict[str, int]:
-    logger.info("[dim_tiempo] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT ano, semestre, id FROM dim_tiempo")
-            mapping = {}
-            for row in cur.fetchall():
-                key = f"{int(row[0])}-{int(row[1])}"
-                mapping[key] = row[2]
-    logger.info("[dim_tiempo] %d entradas en mapping", len(mapping))
-    return mapping
+def _fact_has_rows(cur, fact_table: str, category: str) -> bool:
+    if fact_table == "fact_estudiantes":
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM fact_estudiantes WHERE tipo_evento = %s)",
+            (STUDENT_CATEGORIES[category]["tipo_evento"],),
+        )
+    else:
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {fact_table})")
+    return bool(cur.fetchone()[0])
+
+
+def plan_refresh(cur) -> RefreshPlan:
+    # Categorías sin historial o sin filas (TRUNCATE manual) van completas
+    current = _import_signatures(cur)
+    built = _built_signatures(cur)
+    plan: RefreshPlan = {}
+    for fact_table, categories in FACT_CATEGORIES.items():
+        for category in categories:
+            built_years = {y for c, y in built if c == category}
+            if not built_years or not _fact_has_rows(cur, fact_table, category):
+                plan[category] = None
+                continue
+            current_years = {y for c, y in current if c == category}
+            changed = {
+                y
+                for y in current_years | built_years
+                if current.get((category, y)) != built.get((category, y))
+            }
+            if changed:
+                plan[category] = changed
+    return plan
+
+
+def _record_build(cur) -> None:
+    cur.execute(f"DELETE FROM {_BUILD_LOG_TABLE}")
+    for (category, ano), signature in _import_signatures(cur).items():
+        cur.execute(
+            f"INSERT INTO {_BUILD_LOG_TABLE} (category, ano, signature) "
+            "VALUES (%s, %s, %s)",
+            (category, ano, signature),
+        )
 
 
-def load_dim_sexo_mapping() -> dict[int, int]:
-    logger.info("[dim_sexo] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id_sexo, id FROM dim_sexo")
-            mapping = {row[0]: row[1] for row in cur.fetchall()}
-    logger.info("[dim_sexo] %d entradas en mapping", len(mapping))
-    return mapping
+def _year_filter_sql(years: set[int] | None) -> str:
+    if years is None:
+        return ""
+    return "AND CAST(CAST(ano AS NUMERIC) AS INTEGER) = ANY(%(years)s)"
 
 
-def load_dim_nivel_formacion_docente_mapping() -> dict[int, int]:
-    logger.info("[dim_nivel_formacion_docente] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id_nivel_formacion_docente, id FROM dim_nivel_formacion_docente"
-            )
-            mapping = {row[0]: row[1] for row in cur.fetchall()}
-    logger.info("[dim_nivel_formacion_docente] %d entradas en mapping", len(mapping))
-    return mapping
+def _delete_slice(cur, fact_table: str, years: set[int] | None) -> int:
+    if years is None:
+        cur.execute(f"DELETE FROM {fact_table}")
+    else:
+        cur.execute(
+            f"DELETE FROM {fact_table} "
+            "WHERE tiempo_id IN (SELECT id FROM dim_tiempo WHERE ano = ANY(%s))",
+            (sorted(years),),
+        )
+    return cur.rowcount
 
 
-def load_dim_dedicacion_docente_mapping() -> dict[str, int]:
-    logger.info("[dim_dedicacion_docente] Construyendo mapping...")
-    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id_tiempo_dedicacion, id_tipo_contrato, id "
-                "FROM dim_dedicacion_docente"
+def _estudiantes_partition(tipo_evento: str, ano: int | None = None) -> str:
+    name = f"fact_estudiantes_{tipo_evento}"
+    return name if ano is None else f"{name}_{ano}"
+
+
+def _partition_bounds(cur, parent: str) -> dict[str, str]:
+    cur.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        (parent,),
+    )
+    return {r[0]: r[1] for r in cur.fetchall()}
+
+
+def _attach_year_partition(cur, parent: str, name: str, ano: int) -> None:
+    # Se crea como tabla independiente, se le mueven las filas que estaban en
+    # DEFAULT para ese año y luego se adjunta: ATTACH sólo valida la tabla
+    # nueva y DEFAULT ya no contiene filas del año.
+    cur.execute(
+        f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cur.execute(
+        f"""
+        WITH moved AS (
+            DELETE FROM {parent}_default WHERE ano = %s RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+        """,
+        (ano,),
+    )
+    cur.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES IN ({ano})")
+
+
+def _estudiantes_needs_rebuild(cur) -> bool:
+    # Tabla sin particionar o particionada por el esquema anterior (sin ano)
+    cur.execute(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('fact_estudiantes')"
+    )
+    row = cur.fetchone()
+    if row is None:
+        return False
+    if row[0] == "r":
+        return True
+    cur.execute(
+        "SELECT NOT EXISTS (SELECT 1 FROM pg_attribute "
+        "WHERE attrelid = to_regclass('fact_estudiantes') AND attname = 'ano')"
+    )
+    return cur.fetchone()[0]
+
+
+def ensure_estudiantes_partitions(cur) -> None:
+    # Las particiones de año sólo se agregan: la llave (ano) no cambia aunque
+    # dim_tiempo reciba periodos nuevos o sus ids tengan huecos
+    if _estudiantes_needs_rebuild(cur):
+        logger.warning(
+            "[fact_estudiantes] Esquema de particiones anterior: se recrea "
+            "particionada por tipo_evento y ano"
+        )
+        cur.execute("DROP TABLE fact_estudiantes CASCADE")
+    cur.execute(DDL_FACT_ESTUDIANTES)
+
+    cur.execute("SELECT DISTINCT ano::INTEGER FROM dim_tiempo ORDER BY 1")
+    years = [r[0] for r in cur.fetchall()]
+    for config in STUDENT_CATEGORIES.values():
+        tipo_evento = config["tipo_evento"]
+        parent = _estudiantes_partition(tipo_evento)
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {parent} PARTITION OF fact_estudiantes "
+            "FOR VALUES IN (%s) PARTITION BY LIST (ano)",
+            (tipo_evento,),
+        )
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {parent}_default PARTITION OF {parent} DEFAULT"
+        )
+
+        existing = _partition_bounds(cur, parent)
+        created = [
+            ano
+            for ano in years
+            if _estudiantes_partition(tipo_evento, ano) not in existing
+        ]
+        for ano in created:
+            _attach_year_partition(
+                cur, parent, _estudiantes_partition(tipo_evento, ano), ano
+            )
+        if created:
+            logger.info(
+                "[fact_estudiantes][%s] Particiones de año creadas: %s",
+                tipo_evento,
+                created,
             )
-            mapping = {}
-            for row in cur.fetchall():
-                key = f"{row[0]}-{row[1]}"
-                mapping[key] = row[2]
-    logger.info("[dim_dedicacion_docente] %d entradas en mapping", len(mapping))
-    return mapping
-
-
-def load_fact_estudiantes(
-    inst_map: dict[int, int],
-    geo_map: dict[int, int],
-    prog_map: dict[int, int],
-    tiempo_map: dict[str, int],
-    sexo_map: dict[int, int],
-) -> int:
+
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {parent}_default)")
+        if cur.fetchone()[0]:
+            logger.warning(
+                "[fact_estudiantes][%s] Hay filas en la partición DEFAULT "
+                "(años sin partición propia)",
+                tipo_evento,
+            )
+
+
+def _truncate_estudiantes_slice(cur, tipo_evento: str, years: set[int] | None) -> None:
+    parent = _estudiantes_partition(tipo_evento)
+    if years is None:
+        cur.execute(f"TRUNCATE TABLE {parent}")
+        return
+    existing = _partition_bounds(cur, parent)
+    for ano in sorted(years):
+        name = _estudiantes_partition(tipo_evento, ano)
+        if name in existing:
+            cur.execute(f"TRUNCATE TABLE {name}")
+    cur.execute(f"DELETE FROM {parent}_default WHERE ano = ANY(%s)", (sorted(years),))
+
+
+def _safe_int_sql(column: str) -> str:
+    return f'pg_safe_int("{column}"::text)'
+
+
+def _coalesce_sql(columns: list[str]) -> str:
+    if len(columns) == 1:
+        return f'"{columns[0]}"'
+    return "COALESCE(" + ", ".join(f'"{c}"' for c in columns) + ")"
+
+
+# Resolución de llaves subrogadas compartida por las tres tablas de hechos.
+# Replica la semántica del loop anterior: códigos en 0 se tratan como
+# ausentes y dim_tiempo sólo se busca si año y semestre son distintos de 0.
+_JOIN_INSTITUCION = (
+    "LEFT JOIN dim_institucion di ON di.codigo_ies = NULLIF(src.codigo_ies, 0)"
+)
+_JOIN_GEOGRAFIA_IES = (
+    "LEFT JOIN dim_geografia dg ON dg.codigo_municipio = NULLIF(src.codigo_mun_ies, 0)"
+)
+_JOIN_SEXO = "LEFT JOIN dim_sexo ds ON ds.id_sexo = NULLIF(src.id_sexo, 0)"
+_JOIN_TIEMPO = (
+    "LEFT JOIN dim_tiempo dt ON dt.ano = NULLIF(src.ano, 0) "
+    "AND dt.semestre = NULLIF(src.semestre, 0)"
+)
+
+
+def _insert_resolved(
+    cur,
+    fact_table: str,
+    columns: list[str],
+    source_sql: str,
+    resolved_sql: str,
+    metric: str,
+    required: list[str],
+    params: dict | None = None,
+) -> tuple[int, int, int, int]:
+    # Retorna (leidas, insertadas, sin_metrica, sin_dimension)
+    ok_expr = " AND ".join(
+        [f"COALESCE({metric}, 0) <> 0"] + [f"{c} IS NOT NULL" for c in required]
+    )
+    col_list = ", ".join(columns)
+    query = f"""
+        WITH src AS ({source_sql}),
+        resolved AS (
+            SELECT *, ({ok_expr}) AS ok
+            FROM ({resolved_sql}) r
+        ),
+        ins AS (
+            INSERT INTO {fact_table} ({col_list})
+            SELECT {col_list}
+            FROM resolved
+            WHERE ok
+        )
+        SELECT
+            COUNT(*),
+            COUNT(*) FILTER (WHERE ok),
+            COUNT(*) FILTER (WHERE COALESCE({metric}, 0) = 0),
+            COUNT(*) FILTER (WHERE NOT ok AND COALESCE({metric}, 0) <> 0)
+        FROM resolved
+    """
+    cur.execute(query, {"created_at": NOW, **(params or {})})
+    read, inserted, no_metric, no_dim = cur.fetchone()
+    return read, inserted, no_metric, no_dim
+
+
+def load_fact_estudiantes(plan: RefreshPlan | None = None) -> int:
     logger.info("=" * 50)
     logger.info("[fact_estudiantes] Iniciando carga...")
 
@@ -243,6 +519,11 @@ def load_fact_estudiantes(
         tipo_evento = config["tipo_evento"]
         metric_cols = config["metric_cols"]
 
+        if plan is not None and category not in plan:
+            logger.info("[fact_estudiantes][%s] Sin cambios, saltando", category)
+            continue
+        years = plan[category] if plan is not None else None
+
         logger.info("[fact_estudiantes][%s] Procesando...", category)
 
         if not unified_table_exists(table_name):
@@ -286,112 +567,108 @@ def load_fact_estudiantes(
             )
             continue
 
-        if len(available_metrics) == 1:
-            coalesce_expr = f'"{available_metrics[0]}"'
-        else:
-            coalesce_expr = (
-                "COALESCE(" + ", ".join(f'"{c}"' for c in available_metrics) + ")"
-            )
+        coalesce_expr = _coalesce_sql(available_metrics)
 
-        query = f"""
+        source_sql = f"""
             SELECT
-                codigo_de_la_institucion,
-                codigo_snies_del_programa,
-                {mun_ies_col} as codigo_municipio_ies,
-                {mun_prog_col} as codigo_municipio_programa,
-                id_sexo,
-                CAST(CAST(ano AS NUMERIC) AS INTEGER) as ano,
-                CAST(CAST(semestre AS NUMERIC) AS INTEGER) as semestre,
-                {coalesce_expr} as cantidad
-            FROM "{table_name}"
+                {_safe_int_sql("codigo_de_la_institucion")} AS codigo_ies,
+                {_safe_int_sql("codigo_snies_del_programa")} AS codigo_prog,
+                {_safe_int_sql(mun_ies_col)} AS codigo_mun_ies,
+                {_safe_int_sql(mun_prog_col)} AS codigo_mun_prog,
+                {_safe_int_sql("id_sexo")} AS id_sexo,
+                CAST(CAST(ano AS NUMERIC) AS INTEGER) AS ano,
+                CAST(CAST(semestre AS NUMERIC) AS INTEGER) AS semestre,
+                pg_safe_int(({coalesce_expr})::text) AS cantidad
+            FROM {PG_SCHEMA_UNIFIED}."{table_name}"
             WHERE codigo_de_la_institucion IS NOT NULL
               AND codigo_snies_del_programa IS NOT NULL
-              AND {mun_ies_col} IS NOT NULL
+              AND "{mun_ies_col}" IS NOT NULL
               AND id_sexo IS NOT NULL
               AND ano IS NOT NULL
               AND semestre IS NOT NULL
               AND {coalesce_expr} IS NOT NULL
+              {_year_filter_sql(years)}
         """
 
-        with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-            with conn.cursor() as cur:
-                cur.execute(query)
-                rows = cur.fetchall()
-
-        logger.info(
-            "[fact_estudiantes][%s] %d filas leidas de la fuente",
-            category,
-            len(rows),
-        )
-
-        batch: list[tuple] = []
-        skipped = 0
-
-        for r in rows:
-            codigo_ies = safe_int(r[0])
-            codigo_prog = safe_int(r[1])
-            codigo_mun_ies = safe_int(r[2])
-            codigo_mun_prog = safe_int(r[3])
-            id_sexo = safe_int(r[4])
-            ano = safe_int(r[5])
-            semestre = safe_int(r[6])
-            cantidad = safe_int(r[7])
-
-            if cantidad is None or cantidad == 0:
-                skipped += 1
-                continue
-
-            inst_id = inst_map.get(codigo_ies) if codigo_ies else None
-            prog_id = prog_map.get(codigo_prog) if codigo_prog else None
-            geo_ies_id = geo_map.get(codigo_mun_ies) if codigo_mun_ies else None
-            geo_prog_id = (
-                geo_map.get(codigo_mun_prog) if codigo_mun_prog else geo_ies_id
-            )
-            sexo_id = sexo_map.get(id_sexo) if id_sexo else None
-            tiempo_key = f"{ano}-{semestre}" if ano and semestre else None
-            tiempo_id = tiempo_map.get(tiempo_key) if tiempo_key else None
-
-            if not all([inst_id, prog_id, geo_ies_id, geo_prog_id, sexo_id, tiempo_id]):
-                skipped += 1
-                continue
-
-            batch.append(
-                (
-                    tipo_evento,
-                    inst_id,
-                    prog_id,
-                    geo_ies_id,
-                    geo_prog_id,
-                    sexo_id,
-                    tiempo_id,
-                    cantidad,
-                    NOW,
-                )
-            )
+        resolved_sql = f"""
+            SELECT
+                %(tipo_evento)s AS tipo_evento,
+                di.id AS institucion_id,
+                dp.id AS programa_id,
+                dg.id AS geografia_ies_id,
+                CASE
+                    WHEN NULLIF(src.codigo_mun_prog, 0) IS NULL THEN dg.id
+                    ELSE dgp.id
+                END AS geografia_programa_id,
+                ds.id AS sexo_id,
+                dt.id AS tiempo_id,
+                dt.ano::INTEGER AS ano,
+                src.cantidad,
+                %(created_at)s AS created_at
+            FROM src
+            {_JOIN_INSTITUCION}
+            LEFT JOIN dim_programa dp
+                ON dp.codigo_snies_programa = NULLIF(src.codigo_prog, 0)
+            {_JOIN_GEOGRAFIA_IES}
+            LEFT JOIN dim_geografia dgp
+                ON dgp.codigo_municipio = NULLIF(src.codigo_mun_prog, 0)
+            {_JOIN_SEXO}
+            {_JOIN_TIEMPO}
+        """
 
-        if batch:
-            with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-                with conn.cursor() as cur:
-                    _insert_batch(
-                        cur,
-                        """
-                        INSERT INTO fact_estudiantes
-                            (tipo_evento, institucion_id, programa_id,
-                             geografia_ies_id, geografia_programa_id,
-                             sexo_id, tiempo_id, cantidad, created_at)
-                        VALUES %s
-                        """,
-                        batch,
+        with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
+            with conn.cursor() as cur:
+                if plan is not None:
+                    _truncate_estudiantes_slice(cur, tipo_evento, years)
+                    logger.info(
+                        "[fact_estudiantes][%s] Particiones vaciadas (años: %s)",
+                        category,
+                        sorted(years) if years is not None else "todos",
                     )
+                read, inserted, no_metric, no_dim = _insert_resolved(
+                    cur,
+                    _estudiantes_partition(tipo_evento),
+                    [
+                        "tipo_evento",
+                        "institucion_id",
+                        "programa_id",
+                        "geografia_ies_id",
+                        "geografia_programa_id",
+                        "sexo_id",
+                        "tiempo_id",
+                        "ano",
+                        "cantidad",
+                        "created_at",
+                    ],
+                    source_sql,
+                    resolved_sql,
+                    metric="cantidad",
+                    required=[
+                        "institucion_id",
+                        "programa_id",
+                        "geografia_ies_id",
+                        "geografia_programa_id",
+                        "sexo_id",
+                        "tiempo_id",
+                    ],
+                    params={
+                        "tipo_evento": tipo_evento,
+                        "years": sorted(years or ()),
+                    },
+                )
 
-        inserted = len(batch)
+        skipped = read - inserted
         total_inserted += inserted
         total_skipped += skipped
         logger.info(
-            "[fact_estudiantes][%s] %d filas insertadas, %d saltadas",
+            "[fact_estudiantes][%s] %d filas leidas, %d insertadas, "
+            "%d saltadas (%d sin metrica, %d sin dimension)",
             category,
+            read,
             inserted,
             skipped,
+            no_metric,
+            no_dim,
         )
 
     logger.info(
@@ -402,17 +679,15 @@ def load_fact_estudiantes(
     return total_inserted
 
 
-def load_fact_docentes(
-    inst_map: dict[int, int],
-    geo_map: dict[int, int],
-    sexo_map: dict[int, int],
-    nivel_form_map: dict[int, int],
-    dedicacion_map: dict[str, int],
-    tiempo_map: dict[str, int],
-) -> int:
+def load_fact_docentes(plan: RefreshPlan | None = None) -> int:
     logger.info("=" * 50)
     logger.info("[fact_docentes] Iniciando carga...")
 
+    if plan is not None and "docentes" not in plan:
+        logger.info("[fact_docentes] Sin cambios, saltando")
+        return 0
+    years = plan["docentes"] if plan is not None else None
+
     table_name = "docentes_unified"
     if not unified_table_exists(table_name):
         logger.error("[fact_docentes] Tabla %s no encontrada", table_name)
@@ -430,22 +705,22 @@ def load_fact_docentes(
     if not metric_cols:
         logger.error("[fact_docentes] No se encontro columna de metrica")
         return 0
-    coalesce_expr = "COALESCE(" + ", ".join(f'"{c}"' for c in metric_cols) + ")"
+    coalesce_expr = _coalesce_sql(metric_cols)
 
-    query = f"""
+    source_sql = f"""
         SELECT
-            codigo_de_la_institucion,
-            {mun_ies_col} as codigo_municipio_ies,
-            id_sexo,
-            id_maximo_nivel_de_formacion_del_docente,
-            id_tiempo_de_dedicacion,
-            id_tipo_de_contrato,
-            CAST(CAST(ano AS NUMERIC) AS INTEGER) as ano,
-            CAST(CAST(semestre AS NUMERIC) AS INTEGER) as semestre,
-            {coalesce_expr} as cantidad
-        FROM "{table_name}"
+            {_safe_int_sql("codigo_de_la_institucion")} AS codigo_ies,
+            {_safe_int_sql(mun_ies_col)} AS codigo_mun_ies,
+            {_safe_int_sql("id_sexo")} AS id_sexo,
+            {_safe_int_sql("id_maximo_nivel_de_formacion_del_docente")} AS id_nivel_form,
+            {_safe_int_sql("id_tiempo_de_dedicacion")} AS id_dedicacion,
+            {_safe_int_sql("id_tipo_de_contrato")} AS id_contrato,
+            CAST(CAST(ano AS NUMERIC) AS INTEGER) AS ano,
+            CAST(CAST(semestre AS NUMERIC) AS INTEGER) AS semestre,
+            pg_safe_int(({coalesce_expr})::text) AS cantidad
+        FROM {PG_SCHEMA_UNIFIED}."{table_name}"
         WHERE codigo_de_la_institucion IS NOT NULL
-          AND {mun_ies_col} IS NOT NULL
+          AND "{mun_ies_col}" IS NOT NULL
           AND id_sexo IS NOT NULL
           AND id_maximo_nivel_de_formacion_del_docente IS NOT NULL
           AND id_tiempo_de_dedicacion IS NOT NULL
@@ -453,91 +728,88 @@ def load_fact_docentes(
           AND ano IS NOT NULL
           AND semestre IS NOT NULL
           AND {coalesce_expr} IS NOT NULL
+          {_year_filter_sql(years)}
     """
 
-    with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-        with conn.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-
-    logger.info("[fact_docentes] %d filas leidas de la fuente", len(rows))
-
-    batch: list[tuple] = []
-    skipped = 0
-
-    for r in rows:
-        codigo_ies = safe_int(r[0])
-        codigo_mun_ies = safe_int(r[1])
-        id_sexo = safe_int(r[2])
-        id_nivel_form = safe_int(r[3])
-        id_dedicacion = safe_int(r[4])
-        id_contrato = safe_int(r[5])
-        ano = safe_int(r[6])
-        semestre = safe_int(r[7])
-        cantidad = safe_int(r[8])
-
-        if cantidad is None or cantidad == 0:
-            skipped += 1
-            continue
-
-        inst_id = inst_map.get(codigo_ies) if codigo_ies else None
-        geo_ies_id = geo_map.get(codigo_mun_ies) if codigo_mun_ies else None
-        sexo_id = sexo_map.get(id_sexo) if id_sexo else None
-        nivel_form_id = nivel_form_map.get(id_nivel_form) if id_nivel_form else None
-        ded_key = (
-            f"{id_dedicacion}-{id_contrato}" if id_dedicacion and id_contrato else None
-        )
-        dedicacion_id = dedicacion_map.get(ded_key) if ded_key else None
-        tiempo_key = f"{ano}-{semestre}" if ano and semestre else None
-        tiempo_id = tiempo_map.get(tiempo_key) if tiempo_key else None
-
-        if not all(
-            [inst_id, geo_ies_id, sexo_id, nivel_form_id, dedicacion_id, tiempo_id]
-        ):
-            skipped += 1
-            continue
-
-        batch.append(
-            (
-                inst_id,
-                geo_ies_id,
-                sexo_id,
-                nivel_form_id,
-                dedicacion_id,
-                tiempo_id,
-                cantidad,
-                NOW,
-            )
-        )
+    resolved_sql = f"""
+        SELECT
+            di.id AS institucion_id,
+            dg.id AS geografia_ies_id,
+            ds.id AS sexo_id,
+            dn.id AS nivel_formacion_docente_id,
+            dd.id AS dedicacion_docente_id,
+            dt.id AS tiempo_id,
+            src.cantidad AS cantidad_docentes,
+            %(created_at)s AS created_at
+        FROM src
+        {_JOIN_INSTITUCION}
+        {_JOIN_GEOGRAFIA_IES}
+        {_JOIN_SEXO}
+        LEFT JOIN dim_nivel_formacion_docente dn
+            ON dn.id_nivel_formacion_docente = NULLIF(src.id_nivel_form, 0)
+        LEFT JOIN dim_dedicacion_docente dd
+            ON dd.id_tiempo_dedicacion = NULLIF(src.id_dedicacion, 0)
+           AND dd.id_tipo_contrato = NULLIF(src.id_contrato, 0)
+        {_JOIN_TIEMPO}
+    """
 
-    if batch:
-        with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-            with conn.cursor() as cur:
-                _insert_batch(
-                    cur,
-                    """
-                    INSERT INTO fact_docentes
-                        (institucion_id, geografia_ies_id, sexo_id,
-                         nivel_formacion_docente_id, dedicacion_docente_id,
-                         tiempo_id, cantidad_docentes, created_at)
-                    VALUES %s
-                    """,
-                    batch,
+    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
+        with conn.cursor() as cur:
+            if plan is not None:
+                deleted = _delete_slice(cur, "fact_docentes", years)
+                logger.info(
+                    "[fact_docentes] %d filas eliminadas (años: %s)",
+                    deleted,
+                    sorted(years) if years is not None else "todos",
                 )
+            read, inserted, no_metric, no_dim = _insert_resolved(
+                cur,
+                "fact_docentes",
+                [
+                    "institucion_id",
+                    "geografia_ies_id",
+                    "sexo_id",
+                    "nivel_formacion_docente_id",
+                    "dedicacion_docente_id",
+                    "tiempo_id",
+                    "cantidad_docentes",
+                    "created_at",
+                ],
+                source_sql,
+                resolved_sql,
+                metric="cantidad_docentes",
+                required=[
+                    "institucion_id",
+                    "geografia_ies_id",
+                    "sexo_id",
+                    "nivel_formacion_docente_id",
+                    "dedicacion_docente_id",
+                    "tiempo_id",
+                ],
+                params={"years": sorted(years or ())},
+            )
 
-    inserted = len(batch)
-    logger.info("[fact_docentes] %d filas insertadas, %d saltadas", inserted, skipped)
+    logger.info(
+        "[fact_docentes] %d filas leidas, %d insertadas, "
+        "%d saltadas (%d sin metrica, %d sin dimension)",
+        read,
+        inserted,
+        read - inserted,
+        no_metric,
+        no_dim,
+    )
     return inserted
 
 
-def load_fact_administrativos(
-    inst_map: dict[int, int],
-    geo_map: dict[int, int],
-    tiempo_map: dict[str, int],
-) -> int:
+def load_fact_administrativos(plan: RefreshPlan | None = None) -> int:
     logger.info("=" * 50)
     logger.info("[fact_administrativos] Iniciando carga...")
 
+    if plan is not None and "administrativos" not in plan:
+        logger.info("[fact_administrativos] Sin cambios, saltando")
+        return 0
+    years = plan["administrativos"] if plan is not None else None
+
     table_name = "administrativos_unified"
     if not unified_table_exists(table_name):
         logger.error("[fact_administrativos] Tabla %s no encontrada", table_name)
@@ -551,93 +823,81 @@ def load_fact_administrativos(
         else "codigo_del_municipio"
     )
 
-    query = f"""
+    source_sql = f"""
         SELECT
-            codigo_de_la_institucion,
-            {mun_ies_col} as codigo_municipio_ies,
-            CAST(CAST(ano AS NUMERIC) AS INTEGER) as ano,
-            CAST(CAST(semestre AS NUMERIC) AS INTEGER) as semestre,
-            auxiliar,
-            tecnico,
-            profesional,
-            directivo,
-            total
-        FROM "{table_name}"
+            {_safe_int_sql("codigo_de_la_institucion")} AS codigo_ies,
+            {_safe_int_sql(mun_ies_col)} AS codigo_mun_ies,
+            CAST(CAST(ano AS NUMERIC) AS INTEGER) AS ano,
+            CAST(CAST(semestre AS NUMERIC) AS INTEGER) AS semestre,
+            COALESCE({_safe_int_sql("auxiliar")}, 0) AS auxiliar,
+            COALESCE({_safe_int_sql("tecnico")}, 0) AS tecnico,
+            COALESCE({_safe_int_sql("profesional")}, 0) AS profesional,
+            COALESCE({_safe_int_sql("directivo")}, 0) AS directivo,
+            {_safe_int_sql("total")} AS total
+        FROM {PG_SCHEMA_UNIFIED}."{table_name}"
         WHERE codigo_de_la_institucion IS NOT NULL
-          AND {mun_ies_col} IS NOT NULL
+          AND "{mun_ies_col}" IS NOT NULL
           AND ano IS NOT NULL
           AND semestre IS NOT NULL
           AND total IS NOT NULL
+          {_year_filter_sql(years)}
     """
 
-    with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
-        with conn.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-
-    logger.info("[fact_administrativos] %d filas leidas de la fuente", len(rows))
-
-    batch: list[tuple] = []
-    skipped = 0
-
-    for r in rows:
-        codigo_ies = safe_int(r[0])
-        codigo_mun_ies = safe_int(r[1])
-        ano = safe_int(r[2])
-        semestre = safe_int(r[3])
-        auxiliar = safe_int(r[4]) or 0
-        tecnico = safe_int(r[5]) or 0
-        profesional = safe_int(r[6]) or 0
-        directivo = safe_int(r[7]) or 0
-        total_val = safe_int(r[8])
-
-        if total_val is None or total_val == 0:
-            skipped += 1
-            continue
-
-        inst_id = inst_map.get(codigo_ies) if codigo_ies else None
-        geo_ies_id = geo_map.get(codigo_mun_ies) if codigo_mun_ies else None
-        tiempo_key = f"{ano}-{semestre}" if ano and semestre else None
-        tiempo_id = tiempo_map.get(tiempo_key) if tiempo_key else None
-
-        if not all([inst_id, geo_ies_id, tiempo_id]):
-            skipped += 1
-            continue
-
-        batch.append(
-            (
-                inst_id,
-                geo_ies_id,
-                tiempo_id,
-                auxiliar,
-                tecnico,
-                profesional,
-                directivo,
-                total_val,
-                NOW,
-            )
-        )
+    resolved_sql = f"""
+        SELECT
+            di.id AS institucion_id,
+            dg.id AS geografia_ies_id,
+            dt.id AS tiempo_id,
+            src.auxiliar,
+            src.tecnico,
+            src.profesional,
+            src.directivo,
+            src.total,
+            %(created_at)s AS created_at
+        FROM src
+        {_JOIN_INSTITUCION}
+        {_JOIN_GEOGRAFIA_IES}
+        {_JOIN_TIEMPO}
+    """
 
-    if batch:
-        with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
-            with conn.cursor() as cur:
-                _insert_batch(
-                    cur,
-                    """
-                    INSERT INTO fact_administrativos
-                        (institucion_id, geografia_ies_id, tiempo_id,
-                         auxiliar, tecnico, profesional, directivo, total,
-                         created_at)
-                    VALUES %s
-                    """,
-                    batch,
+    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
+        with conn.cursor() as cur:
+            if plan is not None:
+                deleted = _delete_slice(cur, "fact_administrativos", years)
+                logger.info(
+                    "[fact_administrativos] %d filas eliminadas (años: %s)",
+                    deleted,
+                    sorted(years) if years is not None else "todos",
                 )
+            read, inserted, no_metric, no_dim = _insert_resolved(
+                cur,
+                "fact_administrativos",
+                [
+                    "institucion_id",
+                    "geografia_ies_id",
+                    "tiempo_id",
+                    "auxiliar",
+                    "tecnico",
+                    "profesional",
+                    "directivo",
+                    "total",
+                    "created_at",
+                ],
+                source_sql,
+                resolved_sql,
+                metric="total",
+                required=["institucion_id", "geografia_ies_id", "tiempo_id"],
+                params={"years": sorted(years or ())},
+            )
 
-    inserted = len(batch)
     logger.info(
-        "[fact_administrativos] %d filas insertadas, %d saltadas",
+        "[fact_administrativos] %d filas leidas, %d insertadas, "
+        "%d saltadas (%d sin metrica, %d sin dimension)",
+        read,
         inserted,
-        skipped,
+        read - inserted,
+        no_metric,
+        no_dim,
     )
     return inserted
 
@@ -690,36 +950,8 @@ def validate_star_schema():
             logger.info("")
             logger.info("  Validacion de integridad referencial:")
 
-            fk_checks = [
-                ("fact_estudiantes", "institucion_id", "dim_institucion", "id"),
-                ("fact_estudiantes", "programa_id", "dim_programa", "id"),
-                ("fact_estudiantes", "geografia_ies_id", "dim_geografia", "id"),
-                ("fact_estudiantes", "geografia_programa_id", "dim_geografia", "id"),
-                ("fact_estudiantes", "sexo_id", "dim_sexo", "id"),
-                ("fact_estudiantes", "tiempo_id", "dim_tiempo", "id"),
-                ("fact_docentes", "institucion_id", "dim_institucion", "id"),
-                ("fact_docentes", "geografia_ies_id", "dim_geografia", "id"),
-                ("fact_docentes", "sexo_id", "dim_sexo", "id"),
-                (
-                    "fact_docentes",
-                    "nivel_formacion_docente_id",
-                    "dim_nivel_formacion_docente",
-                    "id",
-                ),
-                (
-                    "fact_docentes",
-                    "dedicacion_docente_id",
-                    "dim_dedicacion_docente",
-                    "id",
-                ),
-                ("fact_docentes", "tiempo_id", "dim_tiempo", "id"),
-                ("fact_administrativos", "institucion_id", "dim_institucion", "id"),
-                ("fact_administrativos", "geografia_ies_id", "dim_geografia", "id"),
-                ("fact_administrativos", "tiempo_id", "dim_tiempo", "id"),
-            ]
-
             all_ok = True
-            for fact, fk_col, dim, dim_pk in fk_checks:
+            for fact, fk_col, dim, dim_pk in FACT_FOREIGN_KEYS:
                 cur.execute(
                     f"""
                     SELECT COUNT(*)
@@ -763,52 +995,146 @@ def validate_star_schema():
                 )
 
 
-def main():
+def _fact_fk_name(fact: str, fk_col: str) -> str:
+    # Mismo nombre que PostgreSQL asignaba a los REFERENCES en línea
+    return f"{fact}_{fk_col}_fkey"
+
+
+def parse_fact_index(idx_sql: str) -> IndexDef:
+    match = _FACT_INDEX_RE.search(idx_sql)
+    if not match:
+        raise ValueError(f"Índice no reconocido: {idx_sql!r}")
+    unique, name, table, cols = match.groups()
+    return IndexDef(
+        name=name,
+        table=table,
+        columns=[c.strip().strip('"') for c in cols.split(",")],
+        unique=bool(unique),
+    )
+
+
+def fact_indexes_by_table() -> dict[str, list[str]]:
+    grouped: dict[str, list[str]] = {table: [] for table in FACT_CATEGORIES}
+    for idx_sql in FACT_INDEXES:
+        grouped[parse_fact_index(idx_sql).table].append(idx_sql)
+    return grouped
+
+
+def drop_fact_indexes_and_fks(cur) -> None:
+    # Se reconstruyen de una vez al final de la recarga completa
+    for idx_sql in FACT_INDEXES:
+        cur.execute(f"DROP INDEX IF EXISTS {parse_fact_index(idx_sql).name}")
+    for fact, fk_col, _, _ in FACT_FOREIGN_KEYS:
+        cur.execute(
+            f"ALTER TABLE {fact} DROP CONSTRAINT IF EXISTS "
+            f"{_fact_fk_name(fact, fk_col)}"
+        )
+    logger.info(
+        "Índices secundarios (%d) y FKs (%d) eliminados hasta terminar la carga",
+        len(FACT_INDEXES),
+        len(FACT_FOREIGN_KEYS),
+    )
+
+
+def ensure_fact_foreign_keys() -> None:
+    # NOT VALID + VALIDATE; las tablas particionadas no admiten NOT VALID
+    with managed_connection(schema=PG_SCHEMA_FACTS, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT conname, convalidated FROM pg_constraint "
+                "WHERE contype = 'f' AND conparentid = 0 "
+                "AND connamespace = %s::regnamespace",
+                (PG_SCHEMA_FACTS,),
+            )
+            validated: dict[str, bool] = dict(cur.fetchall())
+            cur.execute(
+                "SELECT relname FROM pg_class "
+                "WHERE relkind = 'p' AND relnamespace = %s::regnamespace",
+                (PG_SCHEMA_FACTS,),
+            )
+            partitioned = {row[0] for row in cur.fetchall()}
+
+            start = time.perf_counter()
+            for fact, fk_col, dim, dim_pk in FACT_FOREIGN_KEYS:
+                name = _fact_fk_name(fact, fk_col)
+                if name not in validated:
+                    not_valid = "" if fact in partitioned else " NOT VALID"
+                    cur.execute(
+                        f"ALTER TABLE {fact} ADD CONSTRAINT {name} "
+                        f"FOREIGN KEY ({fk_col}) REFERENCES {dim}({dim_pk})"
+                        f"{not_valid}"
+                    )
+                    validated[name] = fact in partitioned
+                if not validated[name]:
+                    cur.execute(f"ALTER TABLE {fact} VALIDATE CONSTRAINT {name}")
+    logger.info(
+        "FKs de hechos verificadas: %d (%.2fs)",
+        len(FACT_FOREIGN_KEYS),
+        time.perf_counter() - start,
+    )
+
+
+def create_facts(
+    mode: str = FACTS_REFRESH_MODE, workers: int = INDEX_BUILD_WORKERS
+) -> None:
+    if mode not in REFRESH_MODES:
+        raise ValueError(f"Modo de refresco desconocido: {mode!r}")
     logger.info("=" * 60)
-    logger.info("CREACION DE TABLAS DE HECHOS — Star Schema SNIES")
+    logger.info("CREACION DE TABLAS DE HECHOS — Star Schema SNIES (modo: %s)", mode)
     logger.info("Fuente: PostgreSQL schema '%s'", PG_SCHEMA_UNIFIED)
     logger.info("Destino: PostgreSQL schema '%s'", PG_SCHEMA_FACTS)
     logger.info("=" * 60)
 
     start_time = time.time()
 
-    logger.info("Preparando tablas de hechos (CREATE IF NOT EXISTS + TRUNCATE)...")
+    logger.info("Preparando tablas de hechos (CREATE IF NOT EXISTS)...")
+    plan: RefreshPlan | None = None
     with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
         with conn.cursor() as cur:
-            cur.execute(DDL_FACT_ESTUDIANTES)
+            ensure_estudiantes_partitions(cur)
             cur.execute(DDL_FACT_DOCENTES)
             cur.execute(DDL_FACT_ADMINISTRATIVOS)
-            for idx_sql in FACT_INDEXES:
-                cur.execute(idx_sql)
-            for table in [
-                "fact_estudiantes",
-                "fact_docentes",
-                "fact_administrativos",
-            ]:
-                cur.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY CASCADE")
-    logger.info("Estructura DDL de hechos verificada y tablas truncadas")
+            cur.execute(DDL_BUILD_LOG)
+            if mode == "full":
+                drop_fact_indexes_and_fks(cur)
+                for table in FACT_CATEGORIES:
+                    cur.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY CASCADE")
+                logger.info("Tablas de hechos truncadas")
+            else:
+                plan = plan_refresh(cur)
+        create_pg_safe_int_function(conn)
+    logger.info("Estructura DDL de hechos verificada")
+
+    if plan is not None:
+        if not plan:
+            logger.info(
+                "Sin cambios en %s._import_log desde el último build", PG_SCHEMA_RAW
+            )
+        for category, years in sorted(plan.items()):
+            logger.info(
+                "  %-30s años a reconstruir: %s",
+                category,
+                sorted(years) if years is not None else "todos",
+            )
 
     logger.info("")
-    logger.info("CONSTRUYENDO MAPPINGS DE DIMENSIONES...")
+    logger.info("CARGANDO TABLAS DE HECHOS...")
     logger.info("-" * 50)
 
-    inst_map = load_dim_institucion_mapping()
-    geo_map = load_dim_geografia_mapping()
-    prog_map = load_dim_programa_mapping()
-    tiempo_map = load_dim_tiempo_mapping()
-    sexo_map = load_dim_sexo_mapping()
-    nivel_form_map = load_dim_nivel_formacion_docente_mapping()
-    dedicacion_map = load_dim_dedicacion_docente_mapping()
+    n_est = load_fact_estudiantes(plan)
+    n_doc = load_fact_docentes(plan)
+    n_adm = load_fact_administrativos(plan)
 
+    # En modo incremental los índices ya existen y esto solo analiza; en una
+    # recarga completa (o la primera carga) los construye tras insertar
     logger.info("")
-    logger.info("CARGANDO TABLAS DE HECHOS...")
-    logger.info("-" * 50)
+    logger.info("CONSTRUYENDO ÍNDICES Y FKs DE HECHOS...")
+    build_indexes_after_load(PG_SCHEMA_FACTS, fact_indexes_by_table(), workers)
+    ensure_fact_foreign_keys()
 
-    n_est = load_fact_estudiantes(inst_map, geo_map, prog_map, tiempo_map, sexo_map)
-    n_doc = load_fact_docentes(
-        inst_map, geo_map, sexo_map, nivel_form_map, dedicacion_map, tiempo_map
-    )
-    n_adm = load_fact_administrativos(inst_map, geo_map, tiempo_map)
+    with managed_connection(schema=PG_SCHEMA_FACTS) as conn:
+        with conn.cursor() as cur:
+            _record_build(cur)
 
     validate_star_schema()
 
@@ -817,13 +1143,37 @@ def main():
     logger.info("")
     logger.info("=" * 60)
     logger.info("STAR SCHEMA CREADO EXITOSAMENTE")
-    logger.info("  fact_estudiantes:     %8d filas", n_est)
-    logger.info("  fact_docentes:        %8d filas", n_doc)
-    logger.info("  fact_administrativos: %8d filas", n_adm)
+    logger.info("  fact_estudiantes:     %8d filas insertadas", n_est)
+    logger.info("  fact_docentes:        %8d filas insertadas", n_doc)
+    logger.info("  fact_administrativos: %8d filas insertadas", n_adm)
     logger.info("  Tiempo total:         %.1f segundos", elapsed)
     logger.info("  Destino: PostgreSQL schema '%s'", PG_SCHEMA_FACTS)
     logger.info("=" * 60)
 
 
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Construye las tablas de hechos del star schema."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=REFRESH_MODES,
+        default=FACTS_REFRESH_MODE,
+        help="incremental: sólo reconstruye los slices (categoría, año) cuyos "
+        "archivos en _import_log o columnas tras transform/normalize "
+        "cambiaron; full: TRUNCATE y recarga completa (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=INDEX_BUILD_WORKERS,
+        help="Tablas indexadas en paralelo tras la carga (default: %(default)s).",
+    )
+    args = parser.parse_args()
+    create_facts(mode=args.mode, workers=args.workers)
+
+
 if __name__ == "__main__":
     main()
@@ -7,13 +7,20 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from config.globals import PG_SCHEMA_RAW, PG_SCHEMA_UNIFIED
+from config.globals import (
+    INDEX_BUILD_WORKERS,
+    INDEX_MAINTENANCE_WORK_MEM,
+    INDEX_PARALLEL_MAINTENANCE_WORKERS,
+    PG_SCHEMA_RAW,
+    PG_SCHEMA_UNIFIED,
+)
 from utils.db import (
     get_column_names,
     list_tables,
     managed_connection,
 )
 from utils.logger import logger
+from utils.parallel import effective_workers, run_per_table
 
 
 @dataclass(frozen=True)
@@ -24,16 +31,27 @@ class IndexDef:
     unique: bool = False
     where: str | None = None
 
-    def sql(self, schema: str) -> str:
+    def sql(self, schema: str, concurrently: bool = False) -> str:
         unique = "UNIQUE " if self.unique else ""
+        concurrent = "CONCURRENTLY " if concurrently else ""
         cols = ", ".join(f'"{c}"' for c in self.columns)
         where = f" WHERE {self.where}" if self.where else ""
         return (
-            f'CREATE {unique}INDEX IF NOT EXISTS "{self.name}" '
+            f'CREATE {unique}INDEX {concurrent}IF NOT EXISTS "{self.name}" '
             f'ON "{schema}"."{self.table}" ({cols}){where}'
         )
 
 
+@dataclass
+class IndexBuild:
+    name: str
+    table: str
+    status: str
+    elapsed_s: float = 0.0
+    size_bytes: int = 0
+    error: str | None = None
+
+
 STUDENT_TABLES = [
     "admitidos",
     "graduados",
@@ -187,9 +205,10 @@ def _get_existing_columns(schema: str, table: str) -> set[str]:
     return set(get_column_names(schema, table))
 
 
-def _get_existing_index_names(schema: str) -> set[str]:
+def _get_index_names(schema: str) -> tuple[set[str], set[str]]:
+    # Un CREATE INDEX CONCURRENTLY interrumpido deja el índice inválido
     query = (
-        "SELECT i.relname "
+        "SELECT i.relname, ix.indisvalid "
         "FROM pg_index ix "
         "JOIN pg_class i ON i.oid = ix.indexrelid "
         "JOIN pg_class t ON t.oid = ix.indrelid "
@@ -200,15 +219,100 @@ def _get_existing_index_names(schema: str) -> set[str]:
         with managed_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(query, (schema,))
-                return {row[0] for row in cur.fetchall()}
+                rows = cur.fetchall()
     except Exception as e:
         logger.warning("[%s] Error obteniendo índices existentes: %s", schema, e)
-        return set()
+        return set(), set()
+    return {r[0] for r in rows if r[1]}, {r[0] for r in rows if not r[1]}
+
+
+def tune_maintenance_session(cur) -> None:
+    # Solo afecta a esta sesión; el pool hace RESET ALL en el siguiente checkout
+    cur.execute("SET maintenance_work_mem = %s", (INDEX_MAINTENANCE_WORK_MEM,))
+    cur.execute(
+        "SET max_parallel_maintenance_workers = %s",
+        (INDEX_PARALLEL_MAINTENANCE_WORKERS,),
+    )
+
+
+def _drop_invalid_index(cur, schema: str, name: str) -> None:
+    try:
+        cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{schema}"."{name}"')
+    except Exception as e:
+        logger.warning(
+            "[%s] No se pudo eliminar índice inválido '%s': %s", schema, name, e
+        )
+
+
+def _build_table_indexes(
+    schema: str, index_defs: list[IndexDef], invalid: set[str]
+) -> list[IndexBuild]:
+    # Los índices de una misma tabla se construyen en serie: dos CREATE INDEX
+    # CONCURRENTLY sobre la misma tabla se bloquean entre sí
+    builds: list[IndexBuild] = []
+    with managed_connection(schema=schema, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            tune_maintenance_session(cur)
+            for idx_def in index_defs:
+                t0 = time.perf_counter()
+                try:
+                    if idx_def.name in invalid:
+                        _drop_invalid_index(cur, schema, idx_def.name)
+                    cur.execute(idx_def.sql(schema, concurrently=True))
+                    cur.execute(
+                        "SELECT pg_relation_size(to_regclass(%s))",
+                        (f'"{schema}"."{idx_def.name}"',),
+                    )
+                    size = cur.fetchone()[0] or 0
+                    builds.append(
+                        IndexBuild(
+                            idx_def.name,
+                            idx_def.table,
+                            "created",
+                            time.perf_counter() - t0,
+                            size,
+                        )
+                    )
+                except Exception as exc:
+                    error_msg = str(exc).strip()
+                    logger.warning(
+                        "[%s] Error creando índice '%s': %s",
+                        schema,
+                        idx_def.name,
+                        error_msg,
+                    )
+                    _drop_invalid_index(cur, schema, idx_def.name)
+                    builds.append(
+                        IndexBuild(
+                            idx_def.name,
+                            idx_def.table,
+                            "error",
+                            time.perf_counter() - t0,
+                            error=error_msg,
+                        )
+                    )
+    return builds
+
+
+def _log_builds(schema: str, builds: list[IndexBuild]) -> None:
+    created = [b for b in builds if b.status == "created"]
+    if not created:
+        return
+    logger.info("[%s] %-50s %10s %10s", schema, "índice", "tiempo(s)", "tamaño(MB)")
+    for b in sorted(created, key=lambda b: b.elapsed_s, reverse=True):
+        logger.info(
+            "[%s] %-50s %10.2f %10.2f",
+            schema,
+            b.name,
+            b.elapsed_s,
+            b.size_bytes / 1024 / 1024,
+        )
 
 
 def create_indexes_for_schema(
     schema: str,
     index_defs: list[IndexDef],
+    workers: int = INDEX_BUILD_WORKERS,
 ) -> dict[str, int]:
     stats = {
         "created": 0,
@@ -219,8 +323,9 @@ def create_indexes_for_schema(
     }
 
     existing_tables = _get_existing_tables(schema)
-    existing_indexes = _get_existing_index_names(schema)
+    existing_indexes, invalid_indexes = _get_index_names(schema)
     column_cache: dict[str, set[str]] = {}
+    pending: dict[str, list[IndexDef]] = {}
 
     for idx_def in index_defs:
         if idx_def.table not in existing_tables:
@@ -249,26 +354,33 @@ def create_indexes_for_schema(
             stats["skipped_column"] += 1
             continue
 
-        sql = idx_def.sql(schema)
-        try:
-            with managed_connection(schema=schema, autocommit=True) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(sql)
-            stats["created"] += 1
-            logger.debug("[%s] Índice creado: %s", schema, idx_def.name)
-        except Exception as exc:
-            error_msg = str(exc).strip()
-            if "already exists" in error_msg.lower():
-                stats["already_exists"] += 1
-                logger.debug("[%s] Índice ya existe: %s", schema, idx_def.name)
-            else:
-                stats["errors"] += 1
-                logger.warning(
-                    "[%s] Error creando índice '%s': %s",
-                    schema,
-                    idx_def.name,
-                    error_msg,
-                )
+        pending.setdefault(idx_def.table, []).append(idx_def)
+
+    if not pending:
+        return stats
+
+    logger.info(
+        "[%s] Construyendo %d índices (CONCURRENTLY) en %d tablas con %d hilo(s)",
+        schema,
+        sum(len(defs) for defs in pending.values()),
+        len(pending),
+        effective_workers(workers, len(pending)),
+    )
+    runs = run_per_table(
+        list(pending),
+        lambda table: _build_table_indexes(schema, pending[table], invalid_indexes),
+        workers=workers,
+    )
+
+    builds: list[IndexBuild] = []
+    for run in runs:
+        if run.error:
+            stats["errors"] += len(pending[run.table])
+            continue
+        builds.extend(run.result)
+    for b in builds:
+        stats["created" if b.status == "created" else "errors"] += 1
+    _log_builds(schema, builds)
 
     return stats
 
@@ -289,7 +401,41 @@ def run_analyze(schema: str) -> None:
         logger.warning("[%s] Error durante ANALYZE: %s", schema, e)
 
 
-def create_indexes(target: str = "all") -> None:
+def build_indexes_after_load(
+    schema: str,
+    index_sql_by_table: dict[str, list[str]],
+    workers: int = INDEX_BUILD_WORKERS,
+) -> None:
+    # Tras una carga masiva: índices en serie por tabla y sin CONCURRENTLY
+    # (no aplica a tablas particionadas)
+
+    def build(table: str) -> int:
+        with managed_connection(schema=schema, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                tune_maintenance_session(cur)
+                for idx_sql in index_sql_by_table[table]:
+                    cur.execute(idx_sql)
+                cur.execute(f'ANALYZE "{schema}"."{table}"')
+        return len(index_sql_by_table[table])
+
+    runs = run_per_table(list(index_sql_by_table), build, workers=workers)
+    for run in runs:
+        if run.error is None:
+            logger.info(
+                "[%s] %s: %d índices + ANALYZE (%.2fs)",
+                schema,
+                run.table,
+                run.result,
+                run.elapsed_s,
+            )
+    failed = [run.table for run in runs if run.error]
+    if failed:
+        raise RuntimeError(
+            f"Falló la construcción de índices en {schema}: {', '.join(failed)}"
+        )
+
+
+def create_indexes(target: str = "all", workers: int = INDEX_BUILD_WORKERS) -> None:
     logger.info("=" * 60)
     logger.info("CREACIÓN DE ÍNDICES PARA OPTIMIZACIÓN DE QUERIES")
     logger.info("=" * 60)
@@ -317,7 +463,7 @@ def create_indexes(target: str = "all") -> None:
             len({d.table for d in raw_defs}),
         )
 
-        stats = create_indexes_for_schema(PG_SCHEMA_RAW, raw_defs)
+        stats = create_indexes_for_schema(PG_SCHEMA_RAW, raw_defs, workers)
         _log_stats(PG_SCHEMA_RAW, stats)
         _merge_stats(total_stats, stats)
 
@@ -337,7 +483,7 @@ def create_indexes(target: str = "all") -> None:
             len({d.table for d in unified_defs}),
         )
 
-        stats = create_indexes_for_schema(PG_SCHEMA_UNIFIED, unified_defs)
+        stats = create_indexes_for_schema(PG_SCHEMA_UNIFIED, unified_defs, workers)
         _log_stats(PG_SCHEMA_UNIFIED, stats)
         _merge_stats(total_stats, stats)
 
@@ -443,6 +589,12 @@ def main():
         action="store_true",
         help="Solo mostrar índices existentes (no crear nuevos).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=INDEX_BUILD_WORKERS,
+        help=f"Tablas indexadas en paralelo (default: {INDEX_BUILD_WORKERS}).",
+    )
     args = parser.parse_args()
 
     if args.report:
@@ -455,7 +607,7 @@ def main():
             print_index_report(PG_SCHEMA_UNIFIED)
         return
 
-    create_indexes(target=args.schema)
+    create_indexes(target=args.schema, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,499 @@
+import json
+import re
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import psycopg2
+
+from config.globals import (
+    INDEX_ADVISOR_REPORT_PATH,
+    PG_SCHEMA_FACTS,
+    PG_SCHEMA_RAW,
+    PG_SCHEMA_UNIFIED,
+)
+from scripts.create_facts import FACT_INDEXES, parse_fact_index
+from scripts.create_indexes import (
+    IndexDef,
+    build_all_index_defs,
+    build_unified_index_defs,
+)
+from utils.db import managed_connection
+from utils.logger import logger
+
+ADVISOR_SCHEMAS = [PG_SCHEMA_RAW, PG_SCHEMA_UNIFIED, PG_SCHEMA_FACTS]
+
+# Tablas más chicas que esto se recorren completas más rápido que por índice
+MIN_ROWS_FOR_INDEX = 10_000
+# Cuántas columnas sugerir como máximo por tabla con seq scans costosos
+MAX_SUGGESTIONS_PER_TABLE = 2
+# Consultas de pg_stat_statements a analizar (las de mayor tiempo total)
+TOP_STATEMENTS = 500
+
+# Tamaño aproximado de una tupla btree: header (8) + line pointer (4) + datos,
+# alineado a 8 bytes; el fillfactor por defecto deja 10% libre en las hojas
+_BTREE_TUPLE_OVERHEAD = 12
+_BTREE_FILLFACTOR = 0.9
+
+# Solo se buscan predicados dentro de WHERE/ON/USING: los SET de un UPDATE y
+# las listas de columnas de un INSERT son escrituras, no filtros
+_CLAUSE_START_RE = re.compile(r"\b(WHERE|ON|USING)\b", re.IGNORECASE)
+_CLAUSE_END_RE = re.compile(
+    r"\b(?:WHERE|ON|USING|JOIN|LEFT|RIGHT|FULL|INNER|CROSS|GROUP\s+BY|ORDER\s+BY|"
+    r"HAVING|LIMIT|OFFSET|RETURNING|WINDOW|UNION|INTERSECT|EXCEPT|SET|VALUES|DO)\b",
+    re.IGNORECASE,
+)
+# Lo que sigue a ON CONFLICT es la acción del upsert (DO UPDATE SET ...)
+_ON_CONFLICT_RE = re.compile(r"\bON\s+CONFLICT\b", re.IGNORECASE)
+_USING_COLUMNS_RE = re.compile(r"^\s*\(([^)]*)\)")
+# Columnas usadas como predicado: col = ..., col IN (...), col BETWEEN ...,
+# col < ... y también el lado derecho de un JOIN (... = alias.col)
+_PREDICATE_RES = (
+    re.compile(
+        r'"?(\w+)"?\s*(?:=|<>|!=|<=|>=|<|>|\bIN\s*\(|\bBETWEEN\b)',
+        re.IGNORECASE,
+    ),
+    re.compile(r'(?:=|<=|>=|<|>)\s*\w+\."?(\w+)"?'),
+)
+
+
+@dataclass
+class IndexUsage:
+    schema: str
+    table: str
+    name: str
+    definition: str
+    scans: int
+    size_bytes: int
+    heap_bytes: int
+    writes: int
+    unique: bool = False
+
+
+@dataclass
+class MissingIndex:
+    schema: str
+    table: str
+    column: str
+    seq_scans: int
+    seq_tup_read: int
+    live_rows: int
+    heap_bytes: int
+    est_size_bytes: int
+    statements: int
+    exec_time_ms: float
+
+    def index_def(self) -> IndexDef:
+        return IndexDef(
+            name=f"idx_{self.table}_{self.column}",
+            table=self.table,
+            columns=[self.column],
+        )
+
+
+@dataclass
+class SchemaAdvice:
+    schema: str
+    observed: bool
+    unused: list[IndexUsage] = field(default_factory=list)
+    missing: list[MissingIndex] = field(default_factory=list)
+    seq_scan_tables: list[dict] = field(default_factory=list)
+
+
+def parse_fact_indexes(statements: list[str]) -> list[IndexDef]:
+    defs = []
+    for sql in statements:
+        try:
+            defs.append(parse_fact_index(sql))
+        except ValueError as e:
+            logger.warning("No se pudo interpretar el índice: %s", e)
+    return defs
+
+
+def current_index_defs(schema: str) -> list[IndexDef]:
+    if schema == PG_SCHEMA_RAW:
+        return build_all_index_defs()
+    if schema == PG_SCHEMA_UNIFIED:
+        return build_unified_index_defs()
+    if schema == PG_SCHEMA_FACTS:
+        return parse_fact_indexes(FACT_INDEXES)
+    return []
+
+
+def _predicate_clauses(query: str) -> list[tuple[str, str]]:
+    query = _ON_CONFLICT_RE.split(query, maxsplit=1)[0]
+    clauses = []
+    for start in _CLAUSE_START_RE.finditer(query):
+        end = _CLAUSE_END_RE.search(query, start.end())
+        clause = query[start.end() : end.start() if end else len(query)]
+        clauses.append((start.group(1).upper(), clause))
+    return clauses
+
+
+def predicate_columns(query: str, columns: set[str]) -> set[str]:
+    found = set()
+    for keyword, clause in _predicate_clauses(query):
+        if keyword == "USING":
+            # JOIN ... USING (a, b): igualdad implícita sobre cada columna
+            match = _USING_COLUMNS_RE.match(clause)
+            names = match.group(1).split(",") if match else []
+        else:
+            names = [
+                name for pattern in _PREDICATE_RES for name in pattern.findall(clause)
+            ]
+        for name in names:
+            name = name.strip().strip('"').lower()
+            if name in columns:
+                found.add(name)
+    return found
+
+
+def estimate_btree_size(rows: int, avg_width: int) -> int:
+    tuple_bytes = _BTREE_TUPLE_OVERHEAD + ((avg_width + 7) // 8) * 8
+    return int(rows * tuple_bytes / _BTREE_FILLFACTOR)
+
+
+def _stats_since(cur) -> datetime | None:
+    cur.execute(
+        "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _index_usage(cur, schema: str) -> list[IndexUsage]:
+    # Las particiones tienen un índice por hoja: se agregan al índice raíz
+    # para que fact_estudiantes se evalúe como una sola tabla
+    cur.execute(
+        """
+        WITH leaf AS (
+            SELECT
+                COALESCE(pg_partition_root(s.indexrelid), s.indexrelid) AS root_idx,
+                s.idx_scan,
+                pg_relation_size(s.indexrelid) AS size_bytes,
+                pg_relation_size(s.relid) AS heap_bytes,
+                t.n_tup_ins + t.n_tup_upd + t.n_tup_del AS writes
+            FROM pg_stat_user_indexes s
+            JOIN pg_stat_user_tables t ON t.relid = s.relid
+        )
+        SELECT
+            rt.relname,
+            ri.relname,
+            pg_get_indexdef(leaf.root_idx),
+            SUM(leaf.idx_scan)::BIGINT,
+            SUM(leaf.size_bytes)::BIGINT,
+            SUM(leaf.heap_bytes)::BIGINT,
+            SUM(leaf.writes)::BIGINT,
+            ix.indisunique
+        FROM leaf
+        JOIN pg_index ix ON ix.indexrelid = leaf.root_idx
+        JOIN pg_class ri ON ri.oid = leaf.root_idx
+        JOIN pg_class rt ON rt.oid = ix.indrelid
+        JOIN pg_namespace n ON n.oid = rt.relnamespace
+        WHERE n.nspname = %s
+          AND NOT ix.indisprimary
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c WHERE c.conindid = leaf.root_idx
+          )
+        GROUP BY rt.relname, ri.relname, leaf.root_idx, ix.indisunique
+        ORDER BY rt.relname, ri.relname
+        """,
+        (schema,),
+    )
+    return [
+        IndexUsage(schema, table, name, definition, scans, size, heap, writes, unique)
+        for table, name, definition, scans, size, heap, writes, unique in cur.fetchall()
+    ]
+
+
+def _table_scans(cur, schema: str) -> list[dict]:
+    cur.execute(
+        """
+        SELECT
+            rt.relname,
+            SUM(t.seq_scan)::BIGINT,
+            SUM(t.seq_tup_read)::BIGINT,
+            SUM(COALESCE(t.idx_scan, 0))::BIGINT,
+            SUM(t.n_live_tup)::BIGINT,
+            SUM(pg_relation_size(t.relid))::BIGINT
+        FROM pg_stat_user_tables t
+        JOIN pg_class rt ON rt.oid = COALESCE(pg_partition_root(t.relid), t.relid)
+        JOIN pg_namespace n ON n.oid = rt.relnamespace
+        WHERE n.nspname = %s
+        GROUP BY rt.relname
+        """,
+        (schema,),
+    )
+    keys = ("table", "seq_scan", "seq_tup_read", "idx_scan", "live_rows", "heap_bytes")
+    return [dict(zip(keys, row)) for row in cur.fetchall()]
+
+
+def _column_widths(cur, schema: str, table: str) -> dict[str, int]:
+    cur.execute(
+        """
+        SELECT a.attname, COALESCE(s.avg_width, 8)
+        FROM pg_attribute a
+        LEFT JOIN pg_stats s
+            ON s.schemaname = %s AND s.tablename = %s AND s.attname = a.attname
+        WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped
+        """,
+        (schema, table, f'"{schema}"."{table}"'),
+    )
+    return {name.lower(): width for name, width in cur.fetchall()}
+
+
+def _leading_columns(cur, schema: str, table: str) -> set[str]:
+    cur.execute(
+        """
+        SELECT a.attname
+        FROM pg_index ix
+        JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = ix.indkey[0]
+        WHERE ix.indrelid = to_regclass(%s)
+        """,
+        (f'"{schema}"."{table}"',),
+    )
+    return {row[0].lower() for row in cur.fetchall()}
+
+
+def _top_statements(cur) -> list[tuple[str, int, float]] | None:
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    if cur.fetchone() is None:
+        return None
+    try:
+        cur.execute(
+            """
+            SELECT query, calls, total_exec_time
+            FROM pg_stat_statements
+            WHERE dbid = (
+                SELECT oid FROM pg_database WHERE datname = current_database()
+            )
+            ORDER BY total_exec_time DESC
+            LIMIT %s
+            """,
+            (TOP_STATEMENTS,),
+        )
+    except psycopg2.Error as e:
+        # Extensión creada pero sin shared_preload_libraries
+        logger.warning("pg_stat_statements no disponible: %s", str(e).strip())
+        return None
+    return cur.fetchall()
+
+
+def _missing_for_table(
+    cur,
+    schema: str,
+    scans: dict,
+    statements: list[tuple[str, int, float]],
+) -> list[MissingIndex]:
+    table = scans["table"]
+    widths = _column_widths(cur, schema, table)
+    indexed = _leading_columns(cur, schema, table)
+    table_re = re.compile(rf'\b"?{re.escape(table)}"?\b', re.IGNORECASE)
+
+    weight: dict[str, float] = defaultdict(float)
+    hits: dict[str, int] = defaultdict(int)
+    for query, _calls, exec_time in statements:
+        if not table_re.search(query):
+            continue
+        for column in predicate_columns(query, set(widths)) - indexed:
+            weight[column] += exec_time
+            hits[column] += 1
+
+    ranked = sorted(weight, key=weight.get, reverse=True)[:MAX_SUGGESTIONS_PER_TABLE]
+    return [
+        MissingIndex(
+            schema=schema,
+            table=table,
+            column=column,
+            seq_scans=scans["seq_scan"],
+            seq_tup_read=scans["seq_tup_read"],
+            live_rows=scans["live_rows"],
+            heap_bytes=scans["heap_bytes"],
+            est_size_bytes=estimate_btree_size(scans["live_rows"], widths[column]),
+            statements=hits[column],
+            exec_time_ms=round(weight[column], 1),
+        )
+        for column in ranked
+    ]
+
+
+def analyze_schema(
+    cur, schema: str, statements: list[tuple[str, int, float]] | None
+) -> SchemaAdvice:
+    usage = _index_usage(cur, schema)
+    tables = _table_scans(cur, schema)
+
+    observed = any(t["seq_scan"] or t["idx_scan"] for t in tables)
+    advice = SchemaAdvice(schema=schema, observed=observed)
+    if not observed:
+        # Sin lecturas registradas no hay forma de distinguir un índice inútil
+        # de uno que aún no se ejercitó
+        return advice
+
+    advice.unused = [u for u in usage if u.scans == 0 and not u.unique]
+
+    for scans in tables:
+        if scans["live_rows"] < MIN_ROWS_FOR_INDEX or not scans["seq_scan"]:
+            continue
+        rows_per_scan = scans["seq_tup_read"] / scans["seq_scan"]
+        if rows_per_scan < MIN_ROWS_FOR_INDEX or scans["seq_scan"] <= scans["idx_scan"]:
+            continue
+        advice.seq_scan_tables.append(scans)
+        if statements:
+            advice.missing.extend(_missing_for_table(cur, schema, scans, statements))
+
+    return advice
+
+
+def advise_index_defs(
+    index_defs: list[IndexDef], advice: SchemaAdvice
+) -> list[IndexDef]:
+    unused = {u.name for u in advice.unused}
+    kept = [d for d in index_defs if d.name not in unused]
+    names = {d.name for d in kept}
+    for missing in advice.missing:
+        idx_def = missing.index_def()
+        if idx_def.name not in names:
+            kept.append(idx_def)
+            names.add(idx_def.name)
+    return kept
+
+
+def run_advisor(schemas: list[str] = ADVISOR_SCHEMAS) -> dict[str, SchemaAdvice]:
+    results: dict[str, SchemaAdvice] = {}
+    with managed_connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            since = _stats_since(cur)
+            statements = _top_statements(cur)
+            logger.info(
+                "Estadísticas acumuladas desde: %s", since or "inicio del servidor"
+            )
+            if statements is None:
+                logger.info(
+                    "Sin pg_stat_statements: solo se reportarán índices sin uso "
+                    "y tablas con seq scans costosos"
+                )
+            for schema in schemas:
+                results[schema] = analyze_schema(cur, schema, statements)
+    return results
+
+
+def _mb(n_bytes: int) -> float:
+    return n_bytes / 1024 / 1024
+
+
+def log_advice(advice: SchemaAdvice) -> None:
+    logger.info("")
+    logger.info("─" * 40)
+    logger.info("Schema: %s", advice.schema)
+    logger.info("─" * 40)
+    if not advice.observed:
+        logger.info(
+            "[%s] Sin lecturas registradas; ejecutar el pipeline antes", advice.schema
+        )
+        return
+
+    unused_mb = sum(_mb(u.size_bytes) for u in advice.unused)
+    logger.info(
+        "[%s] %d índices sin uso (%.1f MB)",
+        advice.schema,
+        len(advice.unused),
+        unused_mb,
+    )
+    for u in sorted(advice.unused, key=lambda u: u.size_bytes, reverse=True):
+        # Costo de build: un recorrido completo del heap más el sort del índice;
+        # costo de escritura: cada insert/update mantiene también este índice
+        logger.info(
+            "  %-50s %-30s %8.1f MB  heap %8.1f MB  escrituras %d",
+            u.name,
+            u.table,
+            _mb(u.size_bytes),
+            _mb(u.heap_bytes),
+            u.writes,
+        )
+
+    for scans in advice.seq_scan_tables:
+        logger.info(
+            "[%s] %s: %d seq scans, %.0f filas/scan (%d filas)",
+            advice.schema,
+            scans["table"],
+            scans["seq_scan"],
+            scans["seq_tup_read"] / scans["seq_scan"],
+            scans["live_rows"],
+        )
+    for m in advice.missing:
+        logger.info(
+            "  + %-48s %-30s ~%7.1f MB  heap %8.1f MB  %d consultas, %.0f ms",
+            m.index_def().name,
+            m.table,
+            _mb(m.est_size_bytes),
+            _mb(m.heap_bytes),
+            m.statements,
+            m.exec_time_ms,
+        )
+
+
+def format_index_defs(index_defs: list[IndexDef]) -> str:
+    return "\n".join(f"    {d!r}," for d in index_defs)
+
+
+def write_report(results: dict[str, SchemaAdvice]) -> Path:
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "schemas": {schema: asdict(advice) for schema, advice in results.items()},
+    }
+    INDEX_ADVISOR_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    INDEX_ADVISOR_REPORT_PATH.write_text(
+        json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    )
+    return INDEX_ADVISOR_REPORT_PATH
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Analiza pg_stat_user_indexes y pg_stat_statements para reportar "
+            "índices sin uso y columnas candidatas a indexar."
+        )
+    )
+    parser.add_argument(
+        "--schema",
+        choices=[*ADVISOR_SCHEMAS, "all"],
+        default="all",
+        help="Schema a analizar (default: all).",
+    )
+    parser.add_argument(
+        "--emit",
+        action="store_true",
+        help="Imprimir el conjunto de IndexDef actualizado por schema.",
+    )
+    args = parser.parse_args()
+
+    schemas = ADVISOR_SCHEMAS if args.schema == "all" else [args.schema]
+
+    logger.info("=" * 60)
+    logger.info("ASESOR DE ÍNDICES")
+    logger.info("=" * 60)
+    results = run_advisor(schemas)
+    for advice in results.values():
+        log_advice(advice)
+    path = write_report(results)
+    logger.info("Reporte guardado en %s", path)
+
+    if args.emit:
+        for schema, advice in results.items():
+            defs = advise_index_defs(current_index_defs(schema), advice)
+            print(f"# {schema}: {len(defs)} índices")
+            print("[")
+            print(format_index_defs(defs))
+            print("]")
+
+
+if __name__ == "__main__":
+    main()
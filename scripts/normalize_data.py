@@ -4,7 +4,14 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from config.globals import PG_SCHEMA_RAW
+from config.globals import PG_SCHEMA_RAW, TABLE_WORKERS
+from etl.transform import (
+    INTERNAL_TABLES,
+    ensure_fingerprint_table,
+    record_fingerprint,
+    stored_fingerprint,
+    table_fingerprint,
+)
 from utils.db import (
     get_columns,
     get_row_count,
@@ -12,15 +19,17 @@ from utils.db import (
     managed_connection,
 )
 from utils.logger import logger
+from utils.parallel import effective_workers, run_per_table
 from utils.text import create_pg_normalize_function
 
 EXCLUDED_COLUMNS = {"created_at", "updated_at"}
 NULL_THRESHOLD_PCT = 90.0
 TARGET_SCHEMA: str = PG_SCHEMA_RAW
+FINGERPRINT_STAGE = "normalize"
 
 
 def get_all_tables(schema: str) -> list[str]:
-    return list_tables(schema)
+    return [t for t in list_tables(schema) if t not in INTERNAL_TABLES]
 
 
 def get_text_columns(schema: str, table_name: str) -> list[str]:
@@ -247,7 +256,41 @@ def verify_normalization(schema: str, tables: list[str]) -> bool:
     return True
 
 
-def process_schema(schema: str) -> dict:
+def _is_unchanged(schema: str, table_name: str) -> bool:
+    with managed_connection(schema=schema) as conn, conn.cursor() as cur:
+        current = table_fingerprint(cur, schema, table_name)
+        stored = stored_fingerprint(cur, schema, FINGERPRINT_STAGE, table_name)
+    return current["fingerprint"] == stored
+
+
+def _record_normalized(schema: str, table_name: str) -> None:
+    with managed_connection(schema=schema) as conn, conn.cursor() as cur:
+        fp = table_fingerprint(cur, schema, table_name)
+        record_fingerprint(cur, schema, FINGERPRINT_STAGE, table_name, fp)
+
+
+def _process_table(schema: str, table_name: str, force: bool = False) -> dict:
+    if not force and _is_unchanged(schema, table_name):
+        logger.info("[%s] Sin cambios desde la ultima corrida, omitiendo", table_name)
+        return {
+            "table": table_name,
+            "status": "skipped",
+            "reason": "sin cambios",
+            "rows": 0,
+            "text_cols": 0,
+            "nullified": 0,
+            "dropped": [],
+        }
+    dropped = drop_high_null_columns(schema, table_name)
+    result = normalize_table(schema, table_name)
+    result["dropped"] = dropped
+    _record_normalized(schema, table_name)
+    return result
+
+
+def process_schema(
+    schema: str, workers: int = TABLE_WORKERS, force: bool = False
+) -> dict:
     logger.info("-" * 60)
     logger.info("Procesando schema: %s", schema)
     logger.info("-" * 60)
@@ -258,6 +301,7 @@ def process_schema(schema: str) -> dict:
         return {"db": schema, "status": "empty", "results": []}
 
     _create_normalize_function(schema)
+    ensure_fingerprint_table(schema)
 
     dim_tables = sorted(t for t in all_tables if t.startswith("dim_"))
     fact_tables = sorted(t for t in all_tables if t.startswith("fact_"))
@@ -272,11 +316,37 @@ def process_schema(schema: str) -> dict:
 
     tables_to_process = dim_tables + fact_tables + other_tables
 
+    logger.info(
+        "Normalizando con %d hilo(s)",
+        effective_workers(workers, len(tables_to_process)),
+    )
+    runs = run_per_table(
+        tables_to_process,
+        lambda table_name: _process_table(schema, table_name, force=force),
+        workers=workers,
+    )
+
+    results: list[dict] = []
     total_dropped: dict[str, list[str]] = {}
-    for table_name in tables_to_process:
-        dropped = drop_high_null_columns(schema, table_name)
+    for run in runs:
+        if run.error:
+            results.append(
+                {
+                    "table": run.table,
+                    "status": "error",
+                    "reason": run.error,
+                    "rows": 0,
+                    "text_cols": 0,
+                    "nullified": 0,
+                }
+            )
+            continue
+        result = run.result
+        dropped = result.pop("dropped")
         if dropped:
-            total_dropped[table_name] = dropped
+            total_dropped[run.table] = dropped
+        result["elapsed_s"] = round(run.elapsed_s, 2)
+        results.append(result)
 
     if total_dropped:
         logger.info(
@@ -287,16 +357,16 @@ def process_schema(schema: str) -> dict:
         for tbl, cols in total_dropped.items():
             logger.info("  %s: %s", tbl, cols)
 
-    results: list[dict] = []
-    for table_name in tables_to_process:
-        t0 = time.time()
-        result = normalize_table(schema, table_name)
-        result["elapsed_s"] = round(time.time() - t0, 2)
-        results.append(result)
-
     processed_tables = [r["table"] for r in results if r["status"] == "ok"]
     verify_normalization(schema, processed_tables)
 
+    failed = [r["table"] for r in results if r["status"] == "error"]
+    if failed:
+        print_summary(
+            {"db": schema, "status": "ok", "results": results, "dropped_columns": {}}
+        )
+        raise RuntimeError(f"Tablas con error en la normalizacion: {failed}")
+
     return {
         "db": schema,
         "status": "ok",
@@ -331,6 +401,8 @@ def print_summary(db_result: dict) -> None:
                 r["nullified"],
                 r.get("elapsed_s", 0),
             )
+        elif r["status"] == "error":
+            logger.info("  %-40s ERROR: %s", r["table"], r["reason"])
         else:
             skipped += 1
             logger.info("  %-40s SALTADA (%s)", r["table"], r["reason"])
@@ -350,14 +422,14 @@ def print_summary(db_result: dict) -> None:
     )
 
 
-def main():
+def main(workers: int = TABLE_WORKERS, force: bool = False):
     logger.info("=" * 60)
     logger.info("Normalizacion de datos de texto - PostgreSQL")
     logger.info("Schema objetivo: %s", TARGET_SCHEMA)
     logger.info("=" * 60)
 
     pipeline_start = time.time()
-    db_result = process_schema(TARGET_SCHEMA)
+    db_result = process_schema(TARGET_SCHEMA, workers=workers, force=force)
     total_elapsed = time.time() - pipeline_start
 
     logger.info("=" * 60)
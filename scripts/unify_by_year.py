@@ -3,12 +3,12 @@ import sys
 from pathlib import Path
 
 import pandas as pd
-from psycopg2.extras import execute_values
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from config.globals import PG_SCHEMA_RAW, PG_SCHEMA_UNIFIED
+from config.globals import PG_SCHEMA_RAW, PG_SCHEMA_UNIFIED, UNIFY_MODE
 from utils.db import (
+    copy_rows,
     ensure_schemas,
     get_column_names,
     get_engine,
@@ -18,10 +18,14 @@ from utils.db import (
     table_exists,
 )
 from utils.logger import logger
+from utils.schema_helpers import pg_trunc_float_sql
 
 YEAR_PATTERN = re.compile(r"^(.+)[_\-](\d{4})$")
 READ_CHUNK_SIZE = 50_000
-INSERT_PAGE_SIZE = 5_000
+UNIFY_MODES = ("sql", "pandas")
+
+# Equivalente SQL de normalize_year: quita BOM/espacios y trunca int(float(x))
+_SQL_YEAR_TEXT = "btrim(replace({expr}::text, chr(65279), ''), E' \\t\\n\\r\\f\\x0B')"
 
 def get_all_tables(schema: str) -> list[str]:
     return list_tables(schema)
@@ -141,20 +145,9 @@ def _truncate_table(table_name: str) -> None:
             cur.execute(f'TRUNCATE TABLE {PG_SCHEMA_UNIFIED}."{table_name}"')
 
 def _bulk_insert(df: pd.DataFrame, table_name: str) -> None:
-    columns = list(df.columns)
-    quoted_cols = ", ".join(f'"{c}"' for c in columns)
-    insert_sql = (
-        f'INSERT INTO {PG_SCHEMA_UNIFIED}."{table_name}" ({quoted_cols}) VALUES %s'
-    )
-    records = [
-        tuple(None if pd.isna(v) else v for v in row)
-        for row in df.itertuples(index=False, name=None)
-    ]
     with managed_connection(schema=PG_SCHEMA_UNIFIED) as conn:
         with conn.cursor() as cur:
-            for offset in range(0, len(records), INSERT_PAGE_SIZE):
-                batch = records[offset : offset + INSERT_PAGE_SIZE]
-                execute_values(cur, insert_sql, batch, page_size=INSERT_PAGE_SIZE)
+            copy_rows(cur, table_name, list(df.columns), df, schema=PG_SCHEMA_UNIFIED)
 
 def save_unified_table(category: str, df: pd.DataFrame) -> None:
     table_name = f"{category}_unified"
@@ -175,9 +168,136 @@ def save_unified_table(category: str, df: pd.DataFrame) -> None:
         col_count,
     )
 
-def main():
+def _table_column_types(cur, schema: str, table_name: str) -> dict[str, str]:
+    cur.execute(
+        "SELECT a.attname, format_type(a.atttypid, a.atttypmod) "
+        "FROM pg_attribute a "
+        "JOIN pg_class c ON c.oid = a.attrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = %s AND c.relname = %s "
+        "AND a.attnum > 0 AND NOT a.attisdropped "
+        "ORDER BY a.attnum",
+        (schema, table_name),
+    )
+    return dict(cur.fetchall())
+
+def _sql_year_expr(column: str | None, year_from_name: int | None) -> str:
+    fallback = str(year_from_name) if year_from_name is not None else "NULL"
+    if column is None:
+        return f"{fallback}::bigint"
+    text = _SQL_YEAR_TEXT.format(expr=f'"{column}"')
+    number = pg_trunc_float_sql(text)
+    coerced = f"CASE WHEN abs({number}) < 9.2e18 THEN ({number})::bigint END"
+    if year_from_name is None:
+        return coerced
+    return f"COALESCE({coerced}, {fallback})"
+
+def _build_union_sql(
+    schema: str,
+    table_entries: list[tuple[str, int | None]],
+    table_columns: dict[str, list[str]],
+    columns: list[str],
+) -> str:
+    selects = []
+    for table_name, year_from_name in table_entries:
+        available = set(table_columns[table_name])
+        exprs = []
+        for col in columns:
+            if col == "ano":
+                source = "ano" if "ano" in available else None
+                exprs.append(f'{_sql_year_expr(source, year_from_name)} AS "ano"')
+            elif col in available:
+                exprs.append(f'"{col}"::text AS "{col}"')
+            else:
+                exprs.append(f'NULL::text AS "{col}"')
+        selects.append(f'SELECT {", ".join(exprs)} FROM {schema}."{table_name}"')
+    return "\nUNION ALL\n".join(selects)
+
+def unify_category_sql(
+    schema: str,
+    category: str,
+    table_entries: list[tuple[str, int | None]],
+) -> int:
+    table_name = f"{category}_unified"
+    logger.info(
+        "[%s] Iniciando unificación en servidor (%d tablas)",
+        category,
+        len(table_entries),
+    )
+    with managed_connection() as conn:
+        with conn.cursor() as cur:
+            table_columns: dict[str, list[str]] = {}
+            columns: list[str] = []
+            rows_before = 0
+            for source_table, year_from_name in table_entries:
+                source_cols = [
+                    c for c in _table_column_types(cur, schema, source_table) if c != "id"
+                ]
+                table_columns[source_table] = source_cols
+                cur.execute(f'SELECT COUNT(*) FROM {schema}."{source_table}"')
+                count = cur.fetchone()[0]
+                rows_before += count
+                logger.info(
+                    "[%s] Tabla '%s': %d filas", category, source_table, count
+                )
+                if year_from_name is not None and "ano" not in source_cols:
+                    source_cols = source_cols + ["ano"]
+                columns.extend(c for c in source_cols if c not in columns)
+
+            if not columns:
+                logger.warning("[%s] Sin columnas para unificar", category)
+                return 0
+
+            target_types = _table_column_types(cur, PG_SCHEMA_UNIFIED, table_name)
+            if not target_types:
+                logger.info("[%s] Tabla '%s' no existe, creándola", category, table_name)
+                cols_sql = ", ".join(
+                    f'"{c}" {"BIGINT" if c == "ano" else "TEXT"}' for c in columns
+                )
+                cur.execute(f'CREATE TABLE {PG_SCHEMA_UNIFIED}."{table_name}" ({cols_sql})')
+                target_types = {c: "bigint" if c == "ano" else "text" for c in columns}
+            else:
+                for col in columns:
+                    if col not in target_types:
+                        cur.execute(
+                            f'ALTER TABLE {PG_SCHEMA_UNIFIED}."{table_name}" '
+                            f'ADD COLUMN "{col}" TEXT'
+                        )
+                        target_types[col] = "text"
+
+            union_sql = _build_union_sql(schema, table_entries, table_columns, columns)
+            cols_quoted = ", ".join(f'"{c}"' for c in columns)
+            casts = ", ".join(f'src."{c}"::{target_types[c]}' for c in columns)
+            cur.execute(f'TRUNCATE TABLE {PG_SCHEMA_UNIFIED}."{table_name}"')
+            cur.execute(
+                f'INSERT INTO {PG_SCHEMA_UNIFIED}."{table_name}" ({cols_quoted}) '
+                f"SELECT DISTINCT {casts} FROM ({union_sql}) AS src"
+            )
+            rows_after = cur.rowcount
+
+    duplicates_removed = rows_before - rows_after
+    if duplicates_removed > 0:
+        logger.info(
+            "[%s] Duplicados eliminados: %d (%d → %d filas)",
+            category,
+            duplicates_removed,
+            rows_before,
+            rows_after,
+        )
+    logger.info(
+        "[%s] Tabla '%s' guardada: %d filas, %d columnas",
+        category,
+        table_name,
+        rows_after,
+        len(columns),
+    )
+    return rows_after
+
+def unify_all(mode: str = UNIFY_MODE):
+    if mode not in UNIFY_MODES:
+        raise ValueError(f"Modo de unificación desconocido: {mode!r}")
     logger.info("=" * 60)
-    logger.info("Unificación de tablas por año")
+    logger.info("Unificación de tablas por año (modo: %s)", mode)
     logger.info("Fuente: schema '%s'", PG_SCHEMA_RAW)
     logger.info("Destino: schema '%s'", PG_SCHEMA_UNIFIED)
     logger.info("=" * 60)
@@ -193,6 +313,12 @@ def main():
     for category, table_entries in sorted(categories.items()):
         table_names = [t[0] for t in table_entries]
         logger.info("[%s] Tablas a unificar: %s", category, table_names)
+        if mode == "sql":
+            if unify_category_sql(PG_SCHEMA_RAW, category, table_entries) > 0:
+                unified_count += 1
+            else:
+                logger.warning("[%s] Sin datos en tabla unificada", category)
+            continue
         unified_df = unify_category(PG_SCHEMA_RAW, category, table_entries)
         if unified_df is not None and not unified_df.empty:
             save_unified_table(category, unified_df)
@@ -230,5 +356,21 @@ def main():
         PG_SCHEMA_UNIFIED,
     )
 
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Unifica las tablas raw por año en el schema unified."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=UNIFY_MODES,
+        default=UNIFY_MODE,
+        help="sql: INSERT ... SELECT DISTINCT en PostgreSQL; "
+        "pandas: lectura y deduplicación en memoria (default: %(default)s).",
+    )
+    args = parser.parse_args()
+    unify_all(mode=args.mode)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+# Cursor sobre una transacción que se descarta al terminar el test, con
+# search_path en pg_temp. Cada módulo agrega su preparación redefiniendo
+# pg_cursor sobre este.
+@pytest.fixture
+def pg_cursor():
+    from utils.db import get_connection
+
+    try:
+        conn = get_connection()
+    except psycopg2.OperationalError as exc:
+        pytest.skip(f"PostgreSQL no disponible: {exc}")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL search_path TO pg_temp")
+            yield cur
+    finally:
+        conn.rollback()
+        conn.close()
@@ -0,0 +1,42 @@
+import re
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from scripts.create_db import open_workbook_stream  # noqa: E402
+
+HEADER = ["codigo", "ies", "institucion", "ano", "semestre", "cantidad"]
+
+
+def _stale_dimension_workbook(path: Path, rows: int) -> None:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for i in range(rows):
+        ws.append([i, "ies", "institucion", 2020, 1, i])
+    wb.save(path)
+
+    # <dimension> que declara solo el header y una fila de datos
+    with zipfile.ZipFile(path) as src:
+        entries = {name: src.read(name) for name in src.namelist()}
+    sheet = "xl/worksheets/sheet1.xml"
+    entries[sheet] = re.sub(
+        rb'<dimension ref="[^"]*"', b'<dimension ref="A1:F2"', entries[sheet]
+    )
+    with zipfile.ZipFile(path, "w") as dst:
+        for name, data in entries.items():
+            dst.writestr(name, data)
+
+
+def test_open_workbook_stream_ignores_stale_dimension(tmp_path):
+    path = tmp_path / "admitidos-2020.xlsx"
+    _stale_dimension_workbook(path, rows=10)
+    with open_workbook_stream(path) as stream:
+        assert stream.columns == HEADER
+        assert len(list(stream.rows)) == 10
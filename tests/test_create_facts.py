@@ -0,0 +1,41 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.create_facts import _slice_signatures
+
+IMPORTS = [
+    ("admitidos", "admitidos-2020.xlsx", "a20", datetime(2024, 1, 1)),
+    ("admitidos", "admitidos-2021.xlsx", "a21", datetime(2024, 1, 1)),
+    ("graduados", "graduados-2021.xlsx", "g21", datetime(2024, 1, 1)),
+]
+UPSTREAM = {"admitidos": "transform:ano,admitidos", "graduados": "transform:ano"}
+
+
+def test_new_year_keeps_other_slice_signatures():
+    before = _slice_signatures(IMPORTS, UPSTREAM)
+    after = _slice_signatures(
+        IMPORTS + [("admitidos", "admitidos-2022.xlsx", "a22", datetime(2025, 1, 1))],
+        UPSTREAM,
+    )
+    assert set(after) == set(before) | {("admitidos", 2022)}
+    assert {k: after[k] for k in before} == before
+
+
+def test_slice_signature_changes_with_its_own_inputs():
+    before = _slice_signatures(IMPORTS, UPSTREAM)
+
+    reimported = list(IMPORTS)
+    reimported[1] = ("admitidos", "admitidos-2021.xlsx", "b21", datetime(2025, 1, 1))
+    after = _slice_signatures(reimported, UPSTREAM)
+    assert [k for k in before if after[k] != before[k]] == [("admitidos", 2021)]
+
+    # Columnas nuevas en la tabla raw: cambian todos los años de esa categoría
+    columns = {**UPSTREAM, "admitidos": "transform:ano,admitidos,sexo"}
+    after = _slice_signatures(IMPORTS, columns)
+    assert [k for k in before if after[k] != before[k]] == [
+        ("admitidos", 2020),
+        ("admitidos", 2021),
+    ]
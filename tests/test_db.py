@@ -0,0 +1,200 @@
+import os
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psycopg2
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils import db
+from utils.db import ConnectionPool, CopyStats, _copy_value, _CopyPipe, copy_rows
+
+COPY_ROWS = [
+    (1, "texto simple", 1.5, True),
+    (2, "tab\tnueva\nlinea\rcr", 2.0, False),
+    (3, "back\\slash \\N literal", None, None),
+    (4, None, float("nan"), pd.NA),
+    (5, "", np.float64(7.0), np.bool_(True)),
+]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, "\\N"),
+        (float("nan"), "\\N"),
+        (np.nan, "\\N"),
+        (float("inf"), "\\N"),
+        (-np.inf, "\\N"),
+        (pd.NA, "\\N"),
+        (pd.NaT, "\\N"),
+        (True, "True"),
+        (False, "False"),
+        (123.0, "123"),
+        (np.float64(45.0), "45"),
+        (1.5, "1.5"),
+        (np.int64(7), "7"),
+        (Decimal("3.25"), "3.25"),
+        ("", ""),
+        ("a\tb", "a\\tb"),
+        ("a\nb\r", "a\\nb\\r"),
+        ("c:\\ruta", "c:\\\\ruta"),
+        ("\\N", "\\\\N"),
+        ("Bogotá", "Bogotá"),
+    ],
+)
+def test_copy_value(value, expected):
+    assert _copy_value(value) == expected
+
+
+def test_copy_pipe_chunks_rows():
+    rows = [(i, f"fila {i}") for i in range(100)]
+    pipe = _CopyPipe(iter(rows), CopyStats())
+    chunks = []
+    while chunk := pipe.read(17):
+        assert len(chunk) <= 17
+        chunks.append(chunk)
+    data = "".join(chunks)
+    assert data.splitlines() == [f"{i}\tfila {i}" for i in range(100)]
+    assert pipe._stats.rows == 100
+
+
+def test_get_pool_is_per_process():
+    parent_pool = db.get_pool()
+    assert db.get_pool() is parent_pool
+    if not hasattr(os, "fork"):
+        pytest.skip("os.fork no disponible")
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if db.get_pool() is not parent_pool else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+@pytest.fixture(scope="module")
+def pg_available():
+    try:
+        conn = db.get_connection()
+    except psycopg2.OperationalError as exc:
+        pytest.skip(f"PostgreSQL no disponible: {exc}")
+    conn.close()
+
+
+@pytest.fixture
+def pool(pg_available):
+    pool = ConnectionPool(max_size=1, timeout_s=1, healthcheck_idle_s=0)
+    yield pool
+    pool.close_all()
+
+
+def _setting(conn, name: str) -> str:
+    with conn.cursor() as cur:
+        cur.execute("SELECT current_setting(%s)", (name,))
+        return cur.fetchone()[0]
+
+
+def test_pool_resets_session_on_checkout(pool):
+    conn = pool.acquire(schema="pg_temp", autocommit=True)
+    default_mem = _setting(conn, "work_mem")
+    with conn.cursor() as cur:
+        cur.execute("SET work_mem = '7MB'")
+    pid = conn.get_backend_pid()
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert conn.get_backend_pid() == pid
+    assert _setting(conn, "work_mem") == default_mem
+    assert not _setting(conn, "search_path").startswith("pg_temp")
+    assert conn.autocommit is False
+    pool.release(conn)
+    assert pool.stats.hits == 1
+    assert pool.stats.misses == 1
+
+
+def test_pool_rolls_back_open_transaction_on_release(pool):
+    conn = pool.acquire()
+    with conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE _pool_tx (x INT)")
+    pool.release(conn)
+
+    conn = pool.acquire()
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('pg_temp._pool_tx')")
+        assert cur.fetchone()[0] is None
+    pool.release(conn)
+
+
+def test_pool_discards_broken_connection(pool):
+    conn = pool.acquire()
+    pid = conn.get_backend_pid()
+    pool.release(conn, broken=True)
+    assert conn.closed
+    assert pool.stats.discarded == 1
+
+    conn = pool.acquire()
+    assert conn.get_backend_pid() != pid
+    pool.release(conn)
+
+
+def test_pool_times_out_when_exhausted(pool):
+    conn = pool.acquire()
+    try:
+        with pytest.raises(db.PoolTimeoutError):
+            pool.acquire()
+    finally:
+        pool.release(conn)
+    assert pool.stats.waits == 1
+
+
+def test_copy_rows_round_trip(pg_available):
+    conn = db.get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TEMP TABLE _copy_rt "
+                "(id INT, txt TEXT, num NUMERIC, flag BOOLEAN) ON COMMIT DROP"
+            )
+            stats = copy_rows(cur, "_copy_rt", ["id", "txt", "num", "flag"], COPY_ROWS)
+            cur.execute("SELECT id, txt, num, flag FROM _copy_rt ORDER BY id")
+            result = cur.fetchall()
+    finally:
+        conn.rollback()
+        conn.close()
+
+    assert stats.rows == len(COPY_ROWS)
+    assert result == [
+        (1, "texto simple", Decimal("1.5"), True),
+        (2, "tab\tnueva\nlinea\rcr", Decimal("2"), False),
+        (3, "back\\slash \\N literal", None, None),
+        (4, None, None, None),
+        (5, "", Decimal("7"), True),
+    ]
+
+
+def test_copy_rows_from_dataframe(pg_available):
+    df = pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "cantidad": [10.0, np.nan, 30.0],
+            "fecha": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+        }
+    )
+    conn = db.get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TEMP TABLE _copy_df "
+                "(id INT, cantidad INT, fecha TIMESTAMP) ON COMMIT DROP"
+            )
+            copy_rows(cur, "_copy_df", ["id", "cantidad", "fecha"], df)
+            cur.execute("SELECT id, cantidad, fecha IS NULL FROM _copy_df ORDER BY id")
+            result = cur.fetchall()
+    finally:
+        conn.rollback()
+        conn.close()
+
+    assert result == [(1, 10, False), (2, None, True), (3, 30, False)]
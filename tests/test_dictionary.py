@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from etl.dictionary import _profile_columns_sql
+
+COL_INFO = [("id", "integer"), ("nombre", "text"), ("grande", "numeric")]
+
+
+@pytest.fixture
+def pg_cursor(pg_cursor):
+    pg_cursor.execute(
+        "CREATE TEMP TABLE _dict (id INTEGER, nombre TEXT, grande NUMERIC)"
+    )
+    pg_cursor.execute("INSERT INTO _dict VALUES (1, 'a', 1), (2, 'a', 2), (3, 'b', 3)")
+    return pg_cursor
+
+
+def test_profile_columns_sql(pg_cursor):
+    total_rows, profiles = _profile_columns_sql(pg_cursor, "_dict", COL_INFO)
+    assert total_rows == 3
+    assert profiles["grande"]["median"] == 2.0
+    assert profiles["nombre"]["unique_count"] == 2
+    assert profiles["nombre"]["top_values"] == {"a": 2, "b": 1}
+
+
+def test_profile_columns_sql_isolates_failing_column(pg_cursor):
+    # MIN(grande)::float desborda double precision
+    pg_cursor.execute("INSERT INTO _dict VALUES (4, 'c', 1e400)")
+    total_rows, profiles = _profile_columns_sql(pg_cursor, "_dict", COL_INFO)
+    assert total_rows == 4
+    assert "out of range" in profiles["grande"]["error"]
+    assert profiles["id"]["max"] == 4.0
+    assert profiles["nombre"]["unique_count"] == 3
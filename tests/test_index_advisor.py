@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.create_facts import FACT_INDEXES
+from scripts.create_indexes import IndexDef
+from scripts.index_advisor import (
+    IndexUsage,
+    MissingIndex,
+    SchemaAdvice,
+    advise_index_defs,
+    estimate_btree_size,
+    parse_fact_indexes,
+    predicate_columns,
+)
+
+
+def test_parse_fact_indexes_covers_all_statements():
+    defs = parse_fact_indexes(FACT_INDEXES)
+    assert len(defs) == len(FACT_INDEXES)
+    by_name = {d.name: d for d in defs}
+    assert by_name["idx_fact_est_tipo_inst_tiempo"] == IndexDef(
+        name="idx_fact_est_tipo_inst_tiempo",
+        table="fact_estudiantes",
+        columns=["tipo_evento", "institucion_id", "tiempo_id"],
+    )
+
+
+def test_predicate_columns():
+    query = (
+        "SELECT count(*) FROM fact_estudiantes f "
+        "JOIN dim_tiempo t ON t.id = f.tiempo_id "
+        'WHERE f."tipo_evento" = $1 AND sexo_id IN ($2, $3) '
+        "AND cantidad BETWEEN $4 AND $5 GROUP BY programa_id"
+    )
+    columns = {"tiempo_id", "tipo_evento", "sexo_id", "cantidad", "programa_id"}
+    assert predicate_columns(query, columns) == {
+        "tiempo_id",
+        "tipo_evento",
+        "sexo_id",
+        "cantidad",
+    }
+
+
+def test_predicate_columns_ignore_written_columns():
+    columns = {"nombre_ies", "codigo", "cantidad"}
+    update = (
+        'UPDATE raw."admitidos" SET "nombre_ies" = pg_normalize_text("nombre_ies"), '
+        '"cantidad" = $1 WHERE "nombre_ies" IS NOT NULL'
+    )
+    assert predicate_columns(update, columns) == set()
+    assert predicate_columns(update + " AND codigo = $2", columns) == {"codigo"}
+
+    upsert = (
+        'INSERT INTO dim_institucion ("codigo", "nombre_ies") '
+        "SELECT codigo, nombre_ies FROM staging WHERE cantidad > $1 "
+        'ON CONFLICT ("codigo") DO UPDATE SET "nombre_ies" = EXCLUDED."nombre_ies" '
+        'WHERE (d."nombre_ies") IS DISTINCT FROM (EXCLUDED."nombre_ies")'
+    )
+    assert predicate_columns(upsert, columns) == {"cantidad"}
+
+
+def test_predicate_columns_join_using():
+    query = "SELECT * FROM a JOIN b USING (codigo, cantidad) WHERE a.x IS NULL"
+    assert predicate_columns(query, {"codigo", "cantidad", "x"}) == {
+        "codigo",
+        "cantidad",
+    }
+
+
+def test_estimate_btree_size():
+    # 4 bytes de datos se alinean a 8: 20 bytes por tupla al 90% de llenado
+    assert estimate_btree_size(900, 4) == 20_000
+    assert estimate_btree_size(0, 32) == 0
+
+
+def test_advise_index_defs_drops_unused_and_adds_missing():
+    current = [
+        IndexDef("idx_a_x", "a", ["x"]),
+        IndexDef("idx_a_y", "a", ["y"]),
+    ]
+    advice = SchemaAdvice(
+        schema="raw",
+        observed=True,
+        unused=[IndexUsage("raw", "a", "idx_a_y", "", 0, 8192, 81920, 10)],
+        missing=[
+            MissingIndex("raw", "a", "z", 5, 50_000, 10_000, 81920, 8192, 3, 12.5),
+            MissingIndex("raw", "a", "x", 5, 50_000, 10_000, 81920, 8192, 1, 1.0),
+        ],
+    )
+    result = advise_index_defs(current, advice)
+    assert [d.name for d in result] == ["idx_a_x", "idx_a_z"]
+    assert result[1].columns == ["z"]
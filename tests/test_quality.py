@@ -0,0 +1,86 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from etl.quality import (
+    _HLL_PRECISION,
+    _approx_profile,
+    _hll_estimate,
+    _sql_checks_from_profile,
+)
+
+_REST_BITS = 64 - _HLL_PRECISION
+
+
+def _register_rows(hashes: list[int]) -> list[tuple[int, int, int]]:
+    # Misma agrupación que la consulta SQL de _sql_table_profile_approx
+    registers: dict[int, list[int]] = {}
+    for h in hashes:
+        rest = h & ((1 << _REST_BITS) - 1)
+        rank = _REST_BITS - rest.bit_length() + 1
+        entry = registers.setdefault(h >> _REST_BITS, [0, 0])
+        entry[0] = max(entry[0], rank)
+        entry[1] += 1
+    return [(reg, rank, n) for reg, (rank, n) in registers.items()]
+
+
+def _profile(distinct: int, duplicated: int = 0, sample: tuple = (1000, 0, 0)) -> dict:
+    rng = random.Random(distinct)
+    hashes = [rng.getrandbits(64) for _ in range(distinct)]
+    rows = _register_rows(hashes + hashes[:duplicated])
+    return _approx_profile(["a", "b"], sample, rows, 1.0)
+
+
+def _check(checks, name):
+    return next(c for c in checks if c.name == name)
+
+
+def test_hll_estimate_is_within_its_error():
+    for distinct in (500, 20_000, 200_000):
+        rng = random.Random(distinct)
+        rows = _register_rows([rng.getrandbits(64) for _ in range(distinct)])
+        estimate = _hll_estimate({reg: rank for reg, rank, _ in rows})
+        assert abs(estimate - distinct) / distinct < 0.05
+
+
+def test_exact_duplicates_respect_threshold():
+    profile = {"columns": ["a", "b"], "total": 1000, "distinct": 995, "nulls": {}}
+    assert not _check(
+        _sql_checks_from_profile(profile, "t"), "no_duplicate_rows"
+    ).passed
+    checks = _sql_checks_from_profile(profile, "t", max_dupes_pct=1.0)
+    assert _check(checks, "no_duplicate_rows").passed
+
+
+def test_approx_duplicates_come_from_the_full_table_sketch():
+    clean = _profile(100_000)
+    assert clean["total"] == 100_000
+    assert _check(_sql_checks_from_profile(clean, "t"), "no_duplicate_rows").passed
+
+    # 20% de filas repetidas: una muestra del 1% vería ~1 de cada 10⁴ pares
+    dirty = _profile(80_000, duplicated=20_000)
+    check = _check(_sql_checks_from_profile(dirty, "t"), "no_duplicate_rows")
+    assert not check.passed
+    assert check.estimate["method"] == "hyperloglog(m=4096)"
+    assert check.estimate["lower"] <= 20_000 <= check.estimate["upper"]
+    assert check.estimate["lower"] > 0
+
+
+def test_approx_nulls_scale_sample_to_exact_total():
+    profile = _profile(100_000, sample=(1000, 250, 0))
+    assert profile["total"] == 100_000
+    assert profile["nulls"] == {"a": 25_000, "b": 0}
+    low, high = profile["null_bounds"]["a"]
+    assert low < 0.25 < high
+
+    nulls = _check(
+        _sql_checks_from_profile(profile, "t", threshold=20.0), "null_threshold"
+    )
+    assert not nulls.passed
+    assert nulls.estimate["null_pct"]["a"]["value"] == 25.0
+
+
+def test_empty_sample_falls_back_to_exact_profile():
+    assert _approx_profile(["a"], (0, 0), [(1, 1, 10)], 1.0) is None
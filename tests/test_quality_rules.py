@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from etl.quality import _evaluate_rules
+from etl.quality_rules import FACT_RULES
+
+
+@pytest.fixture
+def pg_cursor(pg_cursor):
+    pg_cursor.execute("CREATE TABLE dim_sexo (id INTEGER PRIMARY KEY)")
+    pg_cursor.execute("INSERT INTO dim_sexo VALUES (1), (2)")
+    pg_cursor.execute("CREATE TABLE fact_docentes (sexo_id INTEGER)")
+    pg_cursor.execute("INSERT INTO fact_docentes VALUES (1), (2), (2), (3), (NULL)")
+    return pg_cursor
+
+
+def test_fk_rule_counts_orphans_like_validate_star_schema(pg_cursor):
+    rule = next(
+        r for r in FACT_RULES if r.table == "fact_docentes" and r.name == "fk_sexo_id"
+    )
+    [check] = _evaluate_rules(pg_cursor, "pg_temp", "fact_docentes", [rule])
+    assert not check.passed
+    assert check.details.startswith("2 filas")
+
+    pg_cursor.execute(
+        "SELECT COUNT(*) FROM fact_docentes f "
+        "LEFT JOIN dim_sexo d ON f.sexo_id = d.id WHERE d.id IS NULL"
+    )
+    assert pg_cursor.fetchone()[0] == 2
@@ -0,0 +1,203 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.schema_helpers import (
+    _PG_SAFE_INT_FUNCTION_SQL,
+    safe_int,
+    safe_int_series,
+    safe_str,
+    safe_str_series,
+)
+
+EDGE_VALUES = [
+    None,
+    np.nan,
+    pd.NA,
+    pd.NaT,
+    "",
+    "   ",
+    "nan",
+    "NaN",
+    "None",
+    "NONE",
+    "12",
+    " 12 ",
+    "﻿12",
+    "﻿ 12",
+    "12.9",
+    "-12.9",
+    "+7",
+    "1e3",
+    "1E-2",
+    ".5",
+    "5.",
+    "  -0  ",
+    "inf",
+    "-Infinity",
+    "1e400",
+    "1_000",
+    "١٢",
+    "abc",
+    "12abc",
+    "0x10",
+    "9007199254740993",
+    "9223372036854775807",
+    "9223372036854775808",
+    "-9223372036854775808",
+    5,
+    5.7,
+    -3.2,
+    float("inf"),
+    2**70,
+    -(2**63),
+    True,
+    False,
+]
+
+
+def _as_list(series: pd.Series) -> list:
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def test_safe_int_series_matches_scalar_on_edge_values():
+    values = pd.Series(EDGE_VALUES, dtype=object)
+    assert _as_list(safe_int_series(values)) == [safe_int(v) for v in EDGE_VALUES]
+
+
+def test_safe_str_series_matches_scalar_on_edge_values():
+    values = pd.Series(EDGE_VALUES, dtype=object)
+    assert safe_str_series(values).tolist() == [safe_str(v) for v in EDGE_VALUES]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        pd.Series([1.5, np.nan, 2.0**63, -3.2, -(2.0**63)]),
+        pd.Series([1, 2, -3]),
+        pd.Series([1, None], dtype="Int64"),
+        pd.Series([1.5, None], dtype="Float64"),
+        pd.Series([1.5, None], dtype="float32"),
+        pd.Series([True, False]),
+        pd.Series(["1", "x", None, " 2.5 "], dtype="str"),
+        pd.Series(pd.to_datetime(["2020-01-01", None])),
+    ],
+    ids=["float64", "int64", "Int64", "Float64", "float32", "bool", "str", "datetime"],
+)
+def test_series_helpers_match_scalar_by_dtype(values):
+    assert _as_list(safe_int_series(values)) == [safe_int(v) for v in values]
+    assert safe_str_series(values).tolist() == [safe_str(v) for v in values]
+
+
+def test_safe_int_series_matches_scalar_on_random_text():
+    rng = np.random.default_rng(42)
+    numbers = rng.normal(0, 1e6, 5_000)
+    tokens = np.array(["", " ", "nan", "None", "x", "﻿", "e5", ".", "-"])
+    values = [
+        f"{n:.{rng.integers(0, 4)}f}"
+        if rng.random() < 0.7
+        else str(rng.choice(tokens)) + str(int(n))
+        for n in numbers
+    ]
+    series = pd.Series(values, dtype=object)
+    assert _as_list(safe_int_series(series)) == [safe_int(v) for v in values]
+    assert safe_str_series(series).tolist() == [safe_str(v) for v in values]
+
+
+def test_series_helpers_preserve_index_and_name():
+    values = pd.Series(["1", None], index=[10, 20], name="codigo")
+    for result in (safe_int_series(values), safe_str_series(values)):
+        assert result.index.tolist() == [10, 20]
+        assert result.name == "codigo"
+    assert str(safe_int_series(values).dtype) == "Int64"
+
+
+# Textos donde pg_safe_int debe coincidir con safe_int. Quedan fuera los
+# dígitos y espacios no ASCII, que float() acepta y la regex SQL no.
+PG_PARITY_VALUES = [
+    "",
+    "   ",
+    "nan",
+    "NaN",
+    "None",
+    "inf",
+    "-Infinity",
+    "12",
+    " 12 ",
+    "\t12\n",
+    "\x0b12\x0c",
+    "\r\n12",
+    "\ufeff12",
+    "\ufeff 12",
+    "v12",
+    "12v",
+    "v",
+    "12.9",
+    "-12.9",
+    "+7",
+    "1e3",
+    "1E-2",
+    ".5",
+    "5.",
+    "  -0  ",
+    "1e400",
+    "1e999",
+    "1e999999",
+    "-1e999999",
+    "1e-999999",
+    "0e999999",
+    "0.0E+99999",
+    "1" * 2000,
+    "1e19",
+    "-1e19",
+    "9.3e18",
+    "-9.2e18",
+    "abc",
+    "12abc",
+    "0x10",
+    "1 2",
+    "1_000",
+    "1_000.5_5",
+    "1e1_0",
+    "1__000",
+    "_1",
+    "1_",
+    "1_.5",
+    "1._5",
+    "9007199254740993",
+    "0.99999999999999999999",
+    "0.49999999999999999999",
+    "9223372036854774784",
+    "9223372036854775295",
+    "9223372036854775296",
+    "9223372036854775807",
+    "-9223372036854775808",
+    "-9223372036854775809",
+    "18446744073709551616",
+]
+
+
+@pytest.fixture
+def pg_cursor(pg_cursor):
+    pg_cursor.execute(_PG_SAFE_INT_FUNCTION_SQL)
+    return pg_cursor
+
+
+def test_pg_safe_int_matches_python(pg_cursor):
+    pg_cursor.execute(
+        "SELECT pg_temp.pg_safe_int(v) "
+        "FROM unnest(%s::TEXT[]) WITH ORDINALITY AS t(v, i) ORDER BY i",
+        (PG_PARITY_VALUES,),
+    )
+    result = [row[0] for row in pg_cursor.fetchall()]
+    assert result == [safe_int(v) for v in PG_PARITY_VALUES]
+
+
+def test_pg_safe_int_handles_null(pg_cursor):
+    pg_cursor.execute("SELECT pg_temp.pg_safe_int(NULL)")
+    assert pg_cursor.fetchone()[0] is None
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.text import (
+    _PG_NORMALIZE_FUNCTION_SQL,
+    _PG_NORMALIZE_PLPGSQL_FUNCTION_SQL,
+    normalize_text,
+)
+
+PARITY_VALUES = [
+    "",
+    " ",
+    "   ",
+    "\t",
+    "\n \r\n",
+    "Bogotá",
+    "  Bogotá D.C. ",
+    "MEDELLÍN",
+    "Ingeniería   de  Sistemas",
+    "Año  Académico",
+    "ÀÈÌÒÙ àèìòù",
+    "ÄËÏÖÜ äëïöü",
+    "ñandú ÑANDÚ",
+    "\tUniversidad Nacional\n",
+    "uno\t\tdos",
+    "uno \n dos",
+    "uno\tdos",
+    "vaivén\x0b",
+    "\x0c\x0bvalle",
+    "100%",
+    "o'higgins",
+    "back\\slash",
+    "CÚCUTA - Norte de Santander",
+]
+
+
+def test_normalize_text_examples():
+    assert normalize_text("  Bogotá D.C. ") == "bogota d.c."
+    assert normalize_text("Ingeniería   de  Sistemas") == "ingenieria de sistemas"
+    assert normalize_text("ÑANDÚ") == "nandu"
+    assert normalize_text(" \t\n ") is None
+    assert normalize_text("") is None
+
+
+@pytest.fixture
+def pg_cursor(pg_cursor):
+    pg_cursor.execute(_PG_NORMALIZE_FUNCTION_SQL)
+    pg_cursor.execute(_PG_NORMALIZE_PLPGSQL_FUNCTION_SQL)
+    return pg_cursor
+
+
+@pytest.mark.parametrize(
+    "function", ["pg_temp.pg_normalize_text", "pg_temp.pg_normalize_text_plpgsql"]
+)
+def test_pg_normalize_matches_python(pg_cursor, function):
+    pg_cursor.execute(
+        f"SELECT {function}(v) FROM unnest(%s::TEXT[]) WITH ORDINALITY AS t(v, i) "
+        "ORDER BY i",
+        (PARITY_VALUES,),
+    )
+    result = [row[0] for row in pg_cursor.fetchall()]
+    assert result == [normalize_text(v) for v in PARITY_VALUES]
+
+
+def test_pg_normalize_handles_null(pg_cursor):
+    pg_cursor.execute(
+        "SELECT pg_temp.pg_normalize_text(NULL), pg_temp.pg_normalize_text_plpgsql(NULL)"
+    )
+    assert pg_cursor.fetchone() == (None, None)
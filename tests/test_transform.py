@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from etl.transform import _has_dependent_views, _transform_table_ctas
+from utils.text import _PG_NORMALIZE_FUNCTION_SQL
+
+SCHEMA = "_test_transform"
+
+
+@pytest.fixture
+def pg_cursor(pg_cursor):
+    pg_cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    pg_cursor.execute(f"SET LOCAL search_path TO {SCHEMA}")
+    pg_cursor.execute(_PG_NORMALIZE_FUNCTION_SQL)
+    pg_cursor.execute(
+        f'CREATE TABLE {SCHEMA}."admitidos" ('
+        'id SERIAL PRIMARY KEY, "Nombre IES" TEXT, "Unnamed: 3" TEXT, '
+        "vacia TEXT, cantidad INTEGER)"
+    )
+    pg_cursor.execute(f'CREATE INDEX ON {SCHEMA}."admitidos" (cantidad)')
+    pg_cursor.execute(
+        f'CREATE INDEX idx_admitidos_nombre ON {SCHEMA}."admitidos" ("Nombre IES")'
+    )
+    pg_cursor.execute(
+        f'CREATE INDEX idx_admitidos_vacia ON {SCHEMA}."admitidos" (vacia)'
+    )
+    pg_cursor.execute(
+        f'INSERT INTO {SCHEMA}."admitidos" ("Nombre IES", cantidad) '
+        "VALUES ('  Universidad  Nacional ', 10), ('ÚNICA', NULL)"
+    )
+    return pg_cursor
+
+
+def _index_columns(cur, table: str) -> dict[str, str]:
+    cur.execute(
+        "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indrelid = to_regclass(%s)",
+        (table,),
+    )
+    return {name: ddl[ddl.rindex(" (") + 1 :] for name, ddl in cur.fetchall()}
+
+
+def test_transform_ctas_keeps_pk_default_indexes_and_logging(pg_cursor):
+    renamed, dropped, rows = _transform_table_ctas(pg_cursor, SCHEMA, "admitidos")
+    assert renamed == ["Nombre IES -> nombre_ies", "Unnamed: 3 -> unnamed_3"]
+    assert dropped == ["unnamed_3", "vacia"]
+    assert rows == 2
+
+    table = f'{SCHEMA}."admitidos"'
+    pg_cursor.execute(
+        "SELECT relpersistence FROM pg_class WHERE oid = to_regclass(%s)", (table,)
+    )
+    assert pg_cursor.fetchone()[0] == "p"
+    pg_cursor.execute(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+        (table,),
+    )
+    assert pg_cursor.fetchone()[0] == "admitidos_pkey"
+    assert _index_columns(pg_cursor, table) == {
+        "admitidos_cantidad_idx": "(cantidad)",
+        "admitidos_pkey": "(id)",
+        "idx_admitidos_nombre": "(nombre_ies)",
+    }
+
+    # Una segunda corrida no duplica índices
+    _transform_table_ctas(pg_cursor, SCHEMA, "admitidos")
+    assert len(_index_columns(pg_cursor, table)) == 3
+
+    pg_cursor.execute(
+        f"INSERT INTO {table} (nombre_ies) VALUES (%s) RETURNING id", ("nueva",)
+    )
+    assert pg_cursor.fetchone()[0] == 3
+    pg_cursor.execute(f"SELECT id, nombre_ies, cantidad FROM {table} ORDER BY id")
+    assert pg_cursor.fetchall() == [
+        (1, "universidad nacional", 10),
+        (2, "unica", None),
+        (3, "nueva", None),
+    ]
+
+
+def test_dependent_views_are_detected(pg_cursor):
+    assert not _has_dependent_views(pg_cursor, SCHEMA, "admitidos")
+    pg_cursor.execute(
+        f'CREATE VIEW {SCHEMA}.v_admitidos AS SELECT id FROM {SCHEMA}."admitidos"'
+    )
+    assert _has_dependent_views(pg_cursor, SCHEMA, "admitidos")
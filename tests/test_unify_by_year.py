@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.unify_by_year import _sql_year_expr, classify_tables, normalize_year
+
+YEAR_VALUES = [
+    None,
+    "",
+    " ",
+    "2020",
+    " 2021 ",
+    "\t2022\n",
+    "\ufeff2023",
+    "2019.0",
+    "2019.9",
+    "-3",
+    "+7",
+    ".5",
+    "5.",
+    "1e3",
+    "2.02E3",
+    "2_020",
+    "2020.99999999999999999",
+    "1e999",
+    "1e999999",
+    "1e-999999",
+    "0e999999",
+    "9.3e18",
+    "-9.3e18",
+    "abc",
+    "20 20",
+    "nan",
+    "1" * 2000,
+]
+
+
+def test_normalize_year():
+    assert normalize_year(" 2021 ") == 2021
+    assert normalize_year("\ufeff2023") == 2023
+    assert normalize_year("2019.9") == 2019
+    assert normalize_year("1e999999") is None
+    assert normalize_year("abc") is None
+    assert normalize_year(float("nan")) is None
+
+
+def test_classify_tables():
+    categories = classify_tables(
+        ["admitidos_2020", "admitidos-2021", "docentes", "docentes_unified"]
+    )
+    assert categories == {
+        "admitidos": [("admitidos_2020", 2020), ("admitidos-2021", 2021)],
+        "docentes": [("docentes", None)],
+    }
+
+
+def test_sql_year_expr_matches_python(pg_cursor):
+    pg_cursor.execute(
+        f"SELECT {_sql_year_expr('ano', None)} "
+        "FROM unnest(%s::TEXT[]) WITH ORDINALITY AS t(ano, i) ORDER BY i",
+        (YEAR_VALUES,),
+    )
+    result = [row[0] for row in pg_cursor.fetchall()]
+    assert result == [normalize_year(v) for v in YEAR_VALUES]
+
+
+def test_sql_year_expr_falls_back_to_table_year(pg_cursor):
+    pg_cursor.execute(
+        f"SELECT {_sql_year_expr('ano', 2018)} "
+        "FROM unnest(%s::TEXT[]) WITH ORDINALITY AS t(ano, i) ORDER BY i",
+        (["2020", "1e999999", None],),
+    )
+    assert [row[0] for row in pg_cursor.fetchall()] == [2020, 2018, 2018]
+    pg_cursor.execute(f"SELECT {_sql_year_expr(None, 2018)}")
+    assert pg_cursor.fetchone()[0] == 2018
@@ -1,16 +1,26 @@
+import math
+import os
 import threading
 import time
 from contextlib import contextmanager
-from typing import Generator
+from dataclasses import asdict, dataclass
+from typing import Any, Generator, Iterable, Iterator
 
 import psycopg2
-from psycopg2.extensions import connection as PgConnection
-from psycopg2.sql import SQL, Identifier
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_IDLE,
+    TRANSACTION_STATUS_UNKNOWN,
+    connection as PgConnection,
+)
+from psycopg2.sql import SQL, Identifier, Literal
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 
 from config.globals import (
     DATABASE_URL,
+    PG_POOL_HEALTHCHECK_IDLE_S,
+    PG_POOL_MAX_SIZE,
+    PG_POOL_TIMEOUT_S,
     PG_SCHEMAS,
     POSTGRES_DB,
     POSTGRES_HOST,
@@ -26,6 +36,10 @@ _engine_lock = threading.Lock()
 _MAX_RETRIES: int = 3
 _RETRY_BASE_DELAY_S: float = 1.0
 
+COPY_CHUNK_CHARS: int = 1 << 20
+_COPY_NULL = "\\N"
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
 _TCP_KEEPALIVE_OPTS = {
     "keepalives": 1,
     "keepalives_idle": 30,
@@ -82,22 +96,193 @@ def _get_connection_with_retry(
                 )
     raise last_error
 
+class PoolTimeoutError(psycopg2.OperationalError):
+    pass
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    waits: int = 0
+    wait_time_s: float = 0.0
+    discarded: int = 0
+
+class ConnectionPool:
+    def __init__(
+        self,
+        max_size: int = PG_POOL_MAX_SIZE,
+        timeout_s: float = PG_POOL_TIMEOUT_S,
+        healthcheck_idle_s: float = PG_POOL_HEALTHCHECK_IDLE_S,
+    ):
+        self.max_size = max(1, max_size)
+        self.timeout_s = timeout_s
+        self.healthcheck_idle_s = healthcheck_idle_s
+        self.stats = PoolStats()
+        self._idle: list[tuple[PgConnection, float]] = []
+        self._size = 0
+        self._cond = threading.Condition()
+
+    def acquire(
+        self,
+        schema: str | None = None,
+        autocommit: bool = False,
+    ) -> PgConnection:
+        conn = self._checkout()
+        try:
+            self._reset_session(conn, schema, autocommit)
+        except psycopg2.Error:
+            self.release(conn, broken=True)
+            raise
+        return conn
+
+    def release(self, conn: PgConnection, broken: bool = False) -> None:
+        if not broken and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        with self._cond:
+            if broken or conn.closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            conn.close()
+
+    def _checkout(self) -> PgConnection:
+        deadline = time.monotonic() + self.timeout_s
+        wait_start: float | None = None
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    if wait_start is None:
+                        wait_start = time.monotonic()
+                        self.stats.waits += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats.wait_time_s += time.monotonic() - wait_start
+                        raise PoolTimeoutError(
+                            f"Pool agotado: {self.max_size} conexiones en uso "
+                            f"tras {self.timeout_s:.0f}s de espera"
+                        )
+                    self._cond.wait(remaining)
+                if wait_start is not None:
+                    self.stats.wait_time_s += time.monotonic() - wait_start
+                    wait_start = None
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    conn, idle_since = None, 0.0
+                    self._size += 1
+                    self.stats.misses += 1
+
+            if conn is None:
+                try:
+                    return _get_connection_with_retry()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._is_healthy(conn, idle_since):
+                with self._cond:
+                    self.stats.hits += 1
+                return conn
+
+            logger.debug("Conexión del pool descartada (health-check fallido)")
+            with self._cond:
+                self._discard(conn)
+                self._cond.notify()
+
+    def _discard(self, conn: PgConnection) -> None:
+        self._size -= 1
+        self.stats.discarded += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _is_healthy(self, conn: PgConnection, idle_since: float) -> bool:
+        if conn.closed or conn.get_transaction_status() == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - idle_since < self.healthcheck_idle_s:
+            return True
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset_session(
+        conn: PgConnection, schema: str | None, autocommit: bool
+    ) -> None:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("RESET ALL")
+            if schema:
+                cur.execute("SET search_path TO %s, public", (schema,))
+        conn.autocommit = autocommit
+
+_pools: dict[int, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    # Un pool por proceso: las conexiones heredadas tras un fork no se reutilizan.
+    pid = os.getpid()
+    with _pools_lock:
+        pool = _pools.get(pid)
+        if pool is None:
+            pool = ConnectionPool()
+            _pools[pid] = pool
+        return pool
+
+def pool_stats() -> dict:
+    pool = get_pool()
+    with pool._cond:
+        stats = asdict(pool.stats)
+        stats["size"] = pool._size
+        stats["idle"] = len(pool._idle)
+    return stats
+
+def close_pool() -> None:
+    pool = _pools.get(os.getpid())
+    if pool is not None:
+        pool.close_all()
+
 @contextmanager
 def managed_connection(
     schema: str | None = None,
     autocommit: bool = False,
 ) -> Generator[PgConnection, None, None]:
-    conn = _get_connection_with_retry(schema=schema, autocommit=autocommit)
+    pool = get_pool()
+    conn = pool.acquire(schema=schema, autocommit=autocommit)
+    broken = False
     try:
         yield conn
         if not autocommit:
             conn.commit()
-    except Exception:
-        if not autocommit:
-            conn.rollback()
+    except Exception as exc:
+        broken = isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not autocommit and not broken:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
         raise
     finally:
-        conn.close()
+        pool.release(conn, broken=broken)
 
 def get_engine(schema: str | None = None) -> Engine:
     cache_key = schema or "__default__"
@@ -188,6 +373,88 @@ def table_exists(schema: str, table: str) -> bool:
             )
             return cur.fetchone()[0]
 
+@dataclass
+class CopyStats:
+    rows: int = 0
+    source_time_s: float = 0.0
+    elapsed_s: float = 0.0
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return _COPY_NULL
+    if isinstance(value, (str, bool)):
+        return str(value).translate(_COPY_ESCAPES)
+    if type(value).__name__ in ("NAType", "NaTType"):
+        return _COPY_NULL
+    try:
+        if not math.isfinite(value):
+            return _COPY_NULL
+        # 123.0 -> "123": COPY no acepta decimales en columnas enteras
+        if isinstance(value, float) or hasattr(value, "is_integer"):
+            if value.is_integer():
+                return str(int(value))
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return str(value).translate(_COPY_ESCAPES)
+
+def _iter_source_rows(source: Any, columns: list[str]) -> Iterator[tuple]:
+    if hasattr(source, "itertuples"):
+        yield from source[columns].itertuples(index=False, name=None)
+    elif hasattr(source, "to_batches"):
+        for batch in source.select(columns).to_batches():
+            yield from zip(*(col.to_pylist() for col in batch.columns))
+    else:
+        yield from source
+
+# Buffer acotado que serializa filas a formato COPY text bajo demanda
+class _CopyPipe:
+    def __init__(self, rows: Iterator[tuple], stats: CopyStats):
+        self._rows = rows
+        self._stats = stats
+        self._buffer = ""
+        self._exhausted = False
+
+    def read(self, size: int = -1) -> str:
+        target = COPY_CHUNK_CHARS if size is None or size < 0 else size
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while length < target and not self._exhausted:
+            start = time.perf_counter()
+            row = next(self._rows, None)
+            self._stats.source_time_s += time.perf_counter() - start
+            if row is None:
+                self._exhausted = True
+                break
+            line = "\t".join(_copy_value(v) for v in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self._stats.rows += 1
+        data = "".join(parts)
+        self._buffer = data[target:]
+        return data[:target]
+
+def copy_rows(
+    cur,
+    table: str,
+    columns: list[str],
+    rows: Iterable[tuple] | Any,
+    schema: str | None = None,
+) -> CopyStats:
+    # rows: DataFrame, tabla Arrow o iterable de tuplas en el orden de columns.
+    # None, NaN, ±Inf, pd.NA y NaT se escriben como NULL.
+    stats = CopyStats()
+    start = time.perf_counter()
+    target = Identifier(schema, table) if schema else Identifier(table)
+    statement = SQL("COPY {} ({}) FROM STDIN WITH (FORMAT text, NULL {})").format(
+        target,
+        SQL(", ").join(Identifier(c) for c in columns),
+        Literal(_COPY_NULL),
+    )
+    pipe = _CopyPipe(iter(_iter_source_rows(rows, columns)), stats)
+    cur.copy_expert(statement.as_string(cur), pipe, size=COPY_CHUNK_CHARS)
+    stats.elapsed_s = time.perf_counter() - start
+    return stats
+
 def dispose_engines() -> None:
     with _engine_lock:
         for key, engine in _engine_cache.items():
@@ -0,0 +1,48 @@
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from config.globals import PG_POOL_MAX_SIZE
+from utils.logger import logger
+
+
+@dataclass
+class TableRun:
+    table: str
+    result: Any = None
+    elapsed_s: float = 0.0
+    error: str | None = None
+
+
+def effective_workers(workers: int, n_tasks: int) -> int:
+    # Cada hilo retiene una conexión del pool: más hilos que conexiones solo
+    # añade esperas en acquire()
+    return max(1, min(workers, n_tasks, PG_POOL_MAX_SIZE))
+
+
+def _run_one(func: Callable[[str], Any], table: str) -> TableRun:
+    t0 = time.perf_counter()
+    try:
+        result = func(table)
+    except Exception as exc:
+        logger.error("[%s] Error: %s", table, exc)
+        return TableRun(table, elapsed_s=time.perf_counter() - t0, error=str(exc))
+    return TableRun(table, result=result, elapsed_s=time.perf_counter() - t0)
+
+
+def run_per_table(
+    tables: Iterable[str],
+    func: Callable[[str], Any],
+    workers: int = 1,
+) -> list[TableRun]:
+    # Hilos con conexión propia del pool; resultados en el orden de `tables`
+    tables = list(tables)
+    workers = effective_workers(workers, len(tables))
+    if workers == 1:
+        return [_run_one(func, table) for table in tables]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_one, func, table) for table in tables]
+        return [future.result() for future in futures]
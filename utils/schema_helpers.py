@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from config.globals import PG_SCHEMA_UNIFIED
@@ -33,6 +34,139 @@ def safe_str(value: object) -> str | None:
     return text
 
 
+# Literales que int(float(text)) acepta sin ambigüedad; el resto de valores
+# no nulos (inf, "1_000", dígitos no ASCII, ...) se resuelve con safe_int.
+_FAST_NUMERIC_RE = r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+
+
+def _int_from_floats(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Trunca a int64 como int(float(x)); retorna (valores, máscara válida)."""
+    valid = (values >= _BIGINT_MIN) & (values < _BIGINT_MAX + 1)
+    result = np.zeros(len(values), dtype=np.int64)
+    result[valid] = np.trunc(values[valid]).astype(np.int64)
+    return result, valid
+
+
+def _nan_only_dtype(dtype) -> bool:
+    """True si los faltantes del dtype sólo pueden ser NaN float."""
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.na_value is np.nan
+    return dtype in (np.float64, np.float32)
+
+
+def safe_int_series(values: pd.Series) -> pd.Series:
+    """Versión vectorizada de safe_int; retorna una serie ``Int64``."""
+    s = pd.Series(values)
+    out = pd.array(np.zeros(len(s), dtype=np.int64), dtype="Int64")
+    out[:] = pd.NA
+
+    dtype = s.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        # safe_int(True) -> int(float("True")) -> None
+        return pd.Series(out, index=s.index, name=s.name)
+    if dtype.kind in "iu" or str(dtype).lower() == "float64":
+        floats = s.astype("float64").to_numpy(na_value=np.nan)
+        ints, valid = _int_from_floats(floats)
+        out[valid] = ints[valid]
+        return pd.Series(out, index=s.index, name=s.name)
+
+    present = ~np.array(s.isna(), dtype=bool)
+    text = s[present].astype(object).astype(str)
+    text = text.str.strip().str.replace("\ufeff", "", regex=False)
+    fast_mask = text.str.fullmatch(_FAST_NUMERIC_RE).to_numpy(dtype=bool)
+
+    positions = np.flatnonzero(present)
+    if fast_mask.any():
+        floats = text[fast_mask].to_numpy(dtype=object).astype(np.float64)
+        ints, valid = _int_from_floats(floats)
+        fast_pos = positions[fast_mask]
+        out[fast_pos[valid]] = ints[valid]
+
+    slow_text = text[~fast_mask].str.lower()
+    empty = ((slow_text == "") | slow_text.isin(["nan", "none"])).to_numpy(dtype=bool)
+    for pos in positions[~fast_mask][~empty]:
+        result = safe_int(s.iat[pos])
+        if result is not None:
+            out[pos] = result
+    return pd.Series(out, index=s.index, name=s.name)
+
+
+def safe_str_series(values: pd.Series) -> pd.Series:
+    """Versión vectorizada de safe_str; retorna una serie ``object`` con None."""
+    s = pd.Series(values)
+    out = np.full(len(s), None, dtype=object)
+
+    missing = np.array(s.isna(), dtype=bool)
+    if missing.any() and not _nan_only_dtype(s.dtype):
+        # safe_str sólo descarta None y NaN float; pd.NA/NaT se convierten a texto
+        for pos in np.flatnonzero(missing):
+            value = s.iat[pos]
+            if value is not None and not isinstance(value, float):
+                out[pos] = str(value).strip()
+
+    present = ~missing
+    text = s[present].astype(object).astype(str).str.strip()
+    keep = ~((text == "") | text.str.lower().isin(["nan", "none"])).to_numpy(dtype=bool)
+    out[np.flatnonzero(present)[keep]] = text.to_numpy(dtype=object)[keep]
+    return pd.Series(out, index=s.index, name=s.name, dtype=object)
+
+
+# Gramática de float(): dígitos con "_" simple entre ellos ("1_000")
+_PG_DIGITS = "[0-9](_?[0-9])*"
+_PG_NUMERIC_RE = (
+    rf"^[+-]?({_PG_DIGITS}(\.({_PG_DIGITS})?)?|\.{_PG_DIGITS})"
+    rf"([eE][+-]?{_PG_DIGITS})?$"
+)
+# Exponentes de más de 3 cifras desbordan ::numeric (y abortarían todo el
+# INSERT ... SELECT); en Python float() los lleva a inf (None) o a 0.0
+_PG_HUGE_EXPONENT_RE = r"[eE][+-]?0*[0-9]{4,}$"
+_PG_ZERO_MANTISSA_RE = r"^[+-]?[0.]*[eE]"
+_PG_NUMERIC_MAX_LEN = 1000
+
+
+# trunc(float(text)) en SQL: FLOAT8 o NULL, nunca error. text debe ser una
+# expresión TEXT ya recortada. El paso por float8 redondea igual que Python
+# sobre 2**53; quedan fuera dígitos no ASCII y mantisas con cientos de ceros
+# antes de un exponente de 4 cifras.
+def pg_trunc_float_sql(text: str) -> str:
+    clean = f"replace({text}, '_', '')"
+    number = f"({clean})::numeric"
+    return (
+        f"CASE WHEN length({text}) <= {_PG_NUMERIC_MAX_LEN} "
+        f"AND {text} ~ '{_PG_NUMERIC_RE}' THEN CASE "
+        f"WHEN {clean} ~ '{_PG_HUGE_EXPONENT_RE}' THEN CASE "
+        f"WHEN {clean} ~ '[eE]-' OR {clean} ~ '{_PG_ZERO_MANTISSA_RE}' "
+        "THEN 0::float8 END "
+        f"WHEN abs({number}) >= 1e19 THEN NULL "
+        f"WHEN abs({number}) < 0.5 THEN 0::float8 "
+        f"ELSE trunc({number}::float8) END END"
+    )
+
+
+# Equivalente SQL de safe_int. Una sola expresión (sin FROM) para que el
+# planner pueda inlinearla en las consultas de hechos. E'' no admite \v: el
+# tab vertical va como \x0B.
+_PG_SAFE_INT_TEXT = "btrim(replace(input_text, chr(65279), ''), E' \\t\\n\\r\\f\\x0B')"
+_PG_SAFE_INT_NUMBER = pg_trunc_float_sql(_PG_SAFE_INT_TEXT)
+
+_PG_SAFE_INT_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION pg_safe_int(input_text TEXT)
+RETURNS BIGINT AS $$
+    SELECT CASE
+        WHEN ({_PG_SAFE_INT_NUMBER}) >= {_BIGINT_MIN}::float8
+        AND ({_PG_SAFE_INT_NUMBER}) < {_BIGINT_MAX + 1}::float8
+        THEN ({_PG_SAFE_INT_NUMBER})::bigint
+    END
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+"""
+
+
+def create_pg_safe_int_function(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(_PG_SAFE_INT_FUNCTION_SQL)
+    conn.commit()
+
+
 def unified_table_exists(table_name: str) -> bool:
     return db_table_exists(PG_SCHEMA_UNIFIED, table_name)
 
@@ -42,14 +42,36 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-_PG_NORMALIZE_FUNCTION_SQL = """
+# Mismos espacios ASCII que str.strip(); E'' no admite \v, de ahí \x0B.
+_PG_TRIM_CHARS = " \\t\\n\\r\\f\\x0B"
+
+_PG_NORMALIZE_FUNCTION_SQL = f"""
 CREATE OR REPLACE FUNCTION pg_normalize_text(input_text TEXT)
+RETURNS TEXT AS $$
+    SELECT NULLIF(
+        REGEXP_REPLACE(
+            TRANSLATE(
+                LOWER(BTRIM(input_text, E'{_PG_TRIM_CHARS}')),
+                'áéíóúÁÉÍÓÚàèìòùÀÈÌÒÙäëïöüÄËÏÖÜñÑ',
+                'aeiouAEIOUaeiouAEIOUaeiouAEIOUnN'
+            ),
+            '\\s{{2,}}', ' ', 'g'
+        ),
+        ''
+    )
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+"""
+
+# Variante PL/pgSQL original: el planner no puede inlinearla. Se conserva
+# con otro nombre para comparar ambas en scripts/bench_normalize_text.py.
+_PG_NORMALIZE_PLPGSQL_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION pg_normalize_text_plpgsql(input_text TEXT)
 RETURNS TEXT AS $$
 BEGIN
     IF input_text IS NULL THEN
         RETURN NULL;
     END IF;
-    input_text := TRIM(input_text);
+    input_text := BTRIM(input_text, E'{_PG_TRIM_CHARS}');
     IF input_text = '' THEN
         RETURN NULL;
     END IF;
@@ -59,10 +81,10 @@ BEGIN
         'áéíóúÁÉÍÓÚàèìòùÀÈÌÒÙäëïöüÄËÏÖÜñÑ',
         'aeiouAEIOUaeiouAEIOUaeiouAEIOUnN'
     );
-    input_text := REGEXP_REPLACE(input_text, '\\s{2,}', ' ', 'g');
+    input_text := REGEXP_REPLACE(input_text, '\\s{{2,}}', ' ', 'g');
     RETURN input_text;
 END;
-$$ LANGUAGE plpgsql IMMUTABLE;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
 """
 
 
@@ -70,3 +92,9 @@ def create_pg_normalize_function(conn) -> None:
     with conn.cursor() as cur:
         cur.execute(_PG_NORMALIZE_FUNCTION_SQL)
     conn.commit()
+
+
+def create_pg_normalize_plpgsql_function(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(_PG_NORMALIZE_PLPGSQL_FUNCTION_SQL)
+    conn.commit()